@@ -0,0 +1,223 @@
+import re
+import mmap
+from operator import itemgetter
+
+try:
+    from re import _parser as _sre_parse   # Python 3.11+
+except ImportError:
+    import sre_parse as _sre_parse
+
+_FIM = itemgetter(1)
+
+# categorias que _primeiros sabe comparar; \D, \S, \W e conjuntos negados ficam indefinidos
+_CATEGORIAS = {'CATEGORY_DIGIT': re.compile(r'\d'), 'CATEGORY_SPACE': re.compile(r'\s'), 'CATEGORY_WORD': re.compile(r'\w')}
+_DISJUNTAS = {frozenset(('CATEGORY_SPACE', 'CATEGORY_DIGIT')), frozenset(('CATEGORY_SPACE', 'CATEGORY_WORD'))}
+
+class _Indefinido(Exception):
+    pass
+
+def _primeiros(padrao): #(caracteres, categorias) que podem abrir um lexema do padrão; None quando a análise não sabe dizer
+    try:
+        arvore = _sre_parse.parse(padrao)
+        if arvore.state.flags & re.IGNORECASE:
+            return None
+        caracteres, categorias = set(), set()
+        if _sequencia(arvore, caracteres, categorias):   # pode casar vazio (p.ex. só lookarounds): qualquer caractere
+            return None
+        return caracteres, categorias
+    except _Indefinido:
+        return None
+
+def _sequencia(itens, caracteres, categorias): #acrescenta os primeiros da sequência; devolve se ela pode casar vazio
+    for op, arg in itens:
+        if not _item(str(op), arg, caracteres, categorias):
+            return False
+    return True
+
+def _item(op, arg, caracteres, categorias): #acrescenta os primeiros do item; devolve se ele pode casar vazio
+    if op == 'LITERAL':
+        caracteres.add(arg)
+        return False
+    if op == 'IN':
+        for sub, valor in arg:
+            sub = str(sub)
+            if sub == 'LITERAL':
+                caracteres.add(valor)
+            elif sub == 'RANGE' and valor[1] - valor[0] < 1024:
+                caracteres.update(range(valor[0], valor[1] + 1))
+            elif sub == 'CATEGORY' and str(valor) in _CATEGORIAS:
+                categorias.add(str(valor))
+            else:
+                raise _Indefinido
+        return False
+    if op == 'SUBPATTERN':
+        if arg[1] & re.IGNORECASE:
+            raise _Indefinido
+        return _sequencia(arg[3], caracteres, categorias)
+    if op == 'ATOMIC_GROUP':
+        return _sequencia(arg, caracteres, categorias)
+    if op == 'BRANCH':
+        vazio = False
+        for ramo in arg[1]:
+            vazio = _sequencia(ramo, caracteres, categorias) or vazio
+        return vazio
+    if op in ('MAX_REPEAT', 'MIN_REPEAT', 'POSSESSIVE_REPEAT'):
+        return _sequencia(arg[2], caracteres, categorias) or arg[0] == 0
+    if op in ('AT', 'ASSERT', 'ASSERT_NOT'):   # largura zero: só restringe o que vem depois
+        return True
+    raise _Indefinido   # ANY, NOT_LITERAL, referência a grupo...
+
+def _usa_referencia(itens): #o padrão tem \1, (?P=nome) ou (?(1)...)? Na mestre os grupos do usuário mudam de número
+    for op, arg in itens:
+        if str(op) in ('GROUPREF', 'GROUPREF_EXISTS'):
+            return True
+        for sub in arg if isinstance(arg, (tuple, list)) else (arg,):
+            for subpadrao in sub if isinstance(sub, list) else (sub,):
+                if isinstance(subpadrao, _sre_parse.SubPattern) and _usa_referencia(subpadrao):
+                    return True
+    return False
+
+def _podem_comecar_juntos(a, b): #algum caractere abre lexemas dos dois padrões? Na dúvida, sim
+    if a is None or b is None:
+        return True
+    (car_a, cat_a), (car_b, cat_b) = a, b
+    if car_a & car_b:
+        return True
+    for caracteres, categorias in ((car_a, cat_b), (car_b, cat_a)):
+        if any(_CATEGORIAS[cat].match(chr(c)) for cat in categorias for c in caracteres):
+            return True
+    return any(frozenset((x, y)) not in _DISJUNTAS for x in cat_a for y in cat_b)
+
+class AnalisadorLexico: #Scanner gerado a partir da lista term = [...]: todos os terminais viram uma única expressão mestre
+    #a mestre é uma alternação comum, que fica com a primeira alternativa que casa. Quando a escolhida divide algum caractere
+    #inicial com outra, a expressão com todas as alternativas em lookahead confere se alguma casa mais: vale o lexema mais longo,
+    #como no lex, e a ordem só desempata lexemas do mesmo tamanho
+    def __init__(self, terminais, definicoes=None, ignorar=(r'\s+',)):
+        #definicoes: {terminal: regex}; terminais sem definição casam literalmente. ignorar: regex de espaços/comentários
+        definicoes = dict(definicoes or {})
+        desconhecidos = [t for t in definicoes if t not in terminais]
+        if desconhecidos:
+            raise ValueError(f"Definições léxicas para símbolos que não são terminais: {desconhecidos}")
+
+        for nome, padrao in list(definicoes.items()) + [('%ignorar', p) for p in ignorar]:
+            try:
+                compilado = re.compile(padrao)
+            except re.error as e:
+                raise ValueError(f"Expressão regular inválida para '{nome}': {padrao} ({e})")
+            if compilado.fullmatch(''):
+                raise ValueError(f"Expressão regular de '{nome}' aceita a cadeia vazia: {padrao}")
+            if _usa_referencia(_sre_parse.parse(padrao)):
+                raise ValueError(f"Expressão regular de '{nome}' usa referência a grupo, que não é suportada: {padrao}")
+
+        expressoes = [t for t in terminais if t in definicoes]
+        literais = [t for t in terminais if t not in definicoes]
+
+        # um literal que uma expressão reconhece inteiro (palavra reservada x identificador) não entra na mestre:
+        # a expressão consome o maior lexema e depois o lexema é reclassificado
+        self.reservadas = {}
+        restantes = []
+        for literal in literais:
+            dono = next((t for t in expressoes if re.fullmatch(definicoes[t], literal)), None)
+            if dono is None:
+                restantes.append(literal)
+            else:
+                self.reservadas[literal] = literal
+
+        # ordem das alternativas, que desempata lexemas do mesmo tamanho: ignorados, expressões na ordem de declaração, literais
+        alternativas = [('i', p, None) for p in ignorar]
+        alternativas += [('e', definicoes[t], t) for t in expressoes]
+        alternativas += [('l', re.escape(t), t) for t in sorted(restantes, key=len, reverse=True)]
+        primeiros = [_primeiros(padrao) for tipo, padrao, terminal in alternativas]
+
+        self.grupos = {}   # nome do grupo -> (terminal ou None se ignorado, reclassifica?, divide caractere inicial com outra?)
+        partes = []
+        for i, (tipo, padrao, terminal) in enumerate(alternativas):
+            nome = f"g{i}"
+            ambigua = any(_podem_comecar_juntos(primeiros[i], primeiros[j]) for j in range(len(alternativas)) if j != i)
+            self.grupos[nome] = (terminal, tipo == 'e' and bool(self.reservadas), ambigua)
+            partes.append(f"(?P<{nome}>{padrao})")
+        fonte = '|'.join(partes)
+        self.mestre = re.compile(fonte)
+        self.mestre_bytes = re.compile(fonte.encode('utf-8'))
+
+        # todas as alternativas de uma vez: cada uma num lookahead opcional, e o grupo dela guarda até onde casou
+        fonte = ''.join(f"(?:(?=(?P<g{i}>{padrao})))?" for i, (tipo, padrao, terminal) in enumerate(alternativas))
+        self.todas = re.compile(fonte)
+        self.todas_bytes = re.compile(fonte.encode('utf-8'))
+        self.grupos_todas = [None] * (self.todas.groups + 1)   # número do grupo -> nome; grupos internos nunca são escolhidos
+        for nome, numero in self.todas.groupindex.items():
+            if nome in self.grupos:
+                self.grupos_todas[numero] = nome
+        self.reservadas_bytes = {p.encode('utf-8'): t for p, t in self.reservadas.items()}
+
+    def _varrer(self, texto, com_lexema):
+        #gera terminais (ou (terminal, lexema, posição)) em uma única passada; texto pode ser str, bytes ou mmap
+        if isinstance(texto, str):
+            mestre, todas, reservadas = self.mestre, self.todas, self.reservadas
+        else:
+            mestre, todas, reservadas = self.mestre_bytes, self.todas_bytes, self.reservadas_bytes
+        grupos = self.grupos
+        grupos_todas = self.grupos_todas
+
+        fim = 0
+        proximo = mestre.scanner(texto).match
+        while True:
+            m = proximo()
+            if m is None:
+                break
+            inicio, fim = m.span()
+            nome = m.lastgroup
+            terminal, reclassificar, ambigua = grupos[nome]
+            if ambigua:
+                spans = todas.match(texto, inicio).regs   # grupos que não casaram ficam em (-1, -1)
+                maior = max(spans, key=_FIM)   # o primeiro entre os de mesmo fim: o de menor índice desempata
+                if maior[1] > fim:   # outra alternativa casa mais: a varredura recomeça depois do lexema mais longo
+                    fim = maior[1]
+                    terminal, reclassificar, _ = grupos[grupos_todas[spans.index(maior)]]
+                    proximo = mestre.scanner(texto, fim).match
+            if terminal is None:
+                continue
+            if reclassificar:
+                terminal = reservadas.get(texto[inicio:fim], terminal)
+            if com_lexema:
+                yield terminal, texto[inicio:fim], inicio
+            else:
+                yield terminal
+
+        if fim < len(texto):
+            anterior = texto[:fim]   # só no caminho de erro; mmap não tem count
+            quebra = '\n' if isinstance(texto, str) else b'\n'
+            linha = anterior.count(quebra) + 1
+            inicio_linha = anterior.rfind(quebra) + 1
+            trecho = texto[fim:fim + 10]
+            raise ValueError(f"Erro léxico na linha {linha}, coluna {fim - inicio_linha + 1}: nenhum terminal reconhece {trecho!r}")
+
+    def tokens(self, texto): #só os nomes dos terminais, no formato que o driver consome
+        return self._varrer(texto, False)
+
+    def tokens_com_lexema(self, texto):
+        return self._varrer(texto, True)
+
+    def tokens_arquivo(self, caminho, com_lexema=False): #varre o arquivo mapeado em memória, sem carregá-lo inteiro como str
+        with open(caminho, 'rb') as f:
+            if f.seek(0, 2) == 0:
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapa:
+                yield from self._varrer(mapa, com_lexema)
+
+def ler_definicoes(texto): #arquivo de definições: "terminal = regex" por linha; "%ignorar = regex" para espaços e comentários
+    definicoes = {}
+    ignorar = []
+    for numero, linha in enumerate(texto.split('\n'), 1):
+        linha = linha.strip()
+        if not linha or linha.startswith('#'):
+            continue
+        if '=' not in linha:
+            raise ValueError(f"Linha {numero} do arquivo léxico deve ter formato: terminal = regex")
+        nome, padrao = linha.split('=', 1)
+        nome, padrao = nome.strip(), padrao.strip()
+        if nome == '%ignorar':
+            ignorar.append(padrao)
+        else:
+            definicoes[nome] = padrao
+    return definicoes, ignorar or [r'\s+']
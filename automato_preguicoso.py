@@ -0,0 +1,104 @@
+from collections import defaultdict
+
+#Autômato LR(0) construído sob demanda: um estado só é fechado, e seus sucessores só ganham número, quando o driver chega
+#nele pela primeira vez. Os estados ficam guardados pelo núcleo (itens inteiros, como em construir_automato_lr0_nucleo) e
+#continuam valendo nas análises seguintes. A linha da tabela sai do FOLLOW já calculado, então só vale para SLR.
+
+class FechosPreguicosos: #fecho_item de EstadosNucleo calculado por não-terminal no primeiro uso, não para a gramática inteira
+    def __init__(self, prod_por_esquerdo, nao_terminais, inicio_prod, simbolo_item):
+        self.prod_por_esquerdo = prod_por_esquerdo
+        self.nao_terminais = nao_terminais
+        self.inicio_prod = inicio_prod
+        self.simbolo_item = simbolo_item
+        self.por_nao_terminal = {}
+
+    def __getitem__(self, item):
+        A = self.simbolo_item[item]
+        if A not in self.nao_terminais:
+            return ()
+        fecho = self.por_nao_terminal.get(A)
+        if fecho is None:
+            vistos = {A}
+            pendentes = [A]
+            itens = []
+            while pendentes:
+                B = pendentes.pop()
+                for idx, direito in self.prod_por_esquerdo.get(B, ()):
+                    itens.append(self.inicio_prod[idx])
+                    if direito and direito[0] in self.nao_terminais and direito[0] not in vistos:
+                        vistos.add(direito[0])
+                        pendentes.append(direito[0])
+            fecho = self.por_nao_terminal[A] = tuple(itens)
+        return fecho
+
+class AutomatoPreguicoso: #Núcleos numerados na ordem em que são descobertos; expandir(estado) fecha o estado e numera os sucessores
+    def __init__(self, gramatica, ordenar_simbolos):
+        self.ordenar_simbolos = ordenar_simbolos   # mesma ordem de numeração dos sucessores do autômato completo
+        self.terminais = set(gramatica.terminais)
+        self.nao_terminais = set(gramatica.nao_terminais)
+
+        self.inicio_prod = []
+        self.prod_item = []
+        self.pos_item = []
+        self.simbolo_item = []
+        for idx, (esquerdo, direito) in enumerate(gramatica.producoes):
+            self.inicio_prod.append(len(self.prod_item))
+            for pos in range(len(direito) + 1):
+                self.prod_item.append(idx)
+                self.pos_item.append(pos)
+                self.simbolo_item.append(direito[pos] if pos < len(direito) else None)
+        self.fecho_item = FechosPreguicosos(gramatica.prod_por_esquerdo, self.nao_terminais, self.inicio_prod, self.simbolo_item)
+
+        nucleo_inicial = (self.inicio_prod[0],)
+        self.nucleos = [nucleo_inicial]   # nucleos[estado - 1]; cresce a cada expansão
+        self.mapa_estado = {nucleo_inicial: 1}
+        self.transicoes = {}   # só os estados já expandidos
+        self.completo = False   # materializar_tudo já expandiu todos os estados alcançáveis
+
+    def itens(self, estado): #itens inteiros do estado fechado
+        nucleo = self.nucleos[estado - 1]
+        itens = set(nucleo)
+        for item in nucleo:
+            itens.update(self.fecho_item[item])
+        return itens
+
+    def expandir(self, estado): #conjunto de itens (produção, ponto) do estado, numerando os sucessores ainda desconhecidos
+        itens = self.itens(estado)
+        if estado not in self.transicoes:
+            avancos = defaultdict(list)
+            for item in itens:
+                sim = self.simbolo_item[item]
+                if sim is not None:
+                    avancos[sim].append(item + 1)
+            saidas = {}
+            for X in self.ordenar_simbolos(avancos, self.terminais, self.nao_terminais):
+                destino_nucleo = tuple(sorted(avancos[X]))
+                destino = self.mapa_estado.get(destino_nucleo)
+                if destino is None:
+                    self.nucleos.append(destino_nucleo)
+                    destino = self.mapa_estado[destino_nucleo] = len(self.nucleos)
+                saidas[X] = destino
+            self.transicoes[estado] = saidas
+        return frozenset((self.prod_item[item], self.pos_item[item]) for item in itens)
+
+    def restaurar(self, nucleos, transicoes): #estados gravados por uma execução anterior da mesma gramática
+        self.nucleos[:] = nucleos
+        self.mapa_estado = {nucleo: estado for estado, nucleo in enumerate(nucleos, 1)}
+        self.transicoes.clear()
+        self.transicoes.update(transicoes)
+
+class LinhaPendente: #lugar de um estado ainda não construído em TabelaDecodificada.linhas: a primeira consulta troca pela linha real
+    __slots__ = ('estado', 'materializar')
+
+    def __init__(self, estado, materializar):
+        self.estado = estado
+        self.materializar = materializar   # materializar(estado) -> linha decodificada, já posta no lugar desta
+
+    def get(self, simbolo, padrao=None):
+        return self.materializar(self.estado).get(simbolo, padrao)
+
+    def __getitem__(self, simbolo):
+        return self.materializar(self.estado)[simbolo]
+
+    def __contains__(self, simbolo):
+        return simbolo in self.materializar(self.estado)
@@ -0,0 +1,8 @@
+from .gramaticas import GERADORES, AMBIGUAS
+from .medicao import fases, medir_gramatica, executar, comparar
+from .driver import gerar_sentenca, contar_passos, medir_driver, executar_driver
+from .glr import sentenca_ambigua, analisar_retrocesso, medir_glr, executar_glr
+from .servidor import medir_servidor, executar_servidor
+from .fluxo import unidade_repeticao, gravar_repeticao, medir_fluxo, executar_fluxo
+from .reducao import medir_reducao, executar_reducao
+from .preguicoso import medir_preguicoso, executar_preguicoso
@@ -0,0 +1,158 @@
+import sys
+import json
+import argparse
+
+from .gramaticas import GERADORES, AMBIGUAS
+from .medicao import executar, comparar
+from .driver import executar_driver
+from .glr import executar_glr
+from .servidor import executar_servidor
+from .fluxo import executar_fluxo
+from .reducao import executar_reducao
+from .preguicoso import executar_preguicoso
+
+def main(): #python -m benchmark --tamanhos 10,50,100 --saida resultados.json [--comparar anterior.json]
+    analisador = argparse.ArgumentParser(description='Mede cada fase de gerar_analisador em gramáticas sintéticas')
+    analisador.add_argument('--gramaticas', help=f"Geradores separados por vírgula: {', '.join(GERADORES)} (com --glr: {', '.join(AMBIGUAS)})")
+    analisador.add_argument('--tamanhos', default='10,50,100', help='Valores de n separados por vírgula')
+    analisador.add_argument('--repeticoes', type=int, default=3, help='Execuções por medida; vale o menor tempo')
+    analisador.add_argument('--driver', type=int, metavar='TOKENS',
+                            help='Mede o driver (reconhecer, arvore, acoes, objetos) numa sentença de ~TOKENS tokens em vez das fases do gerador')
+    analisador.add_argument('--otimizar', action='store_true',
+                            help='Com --driver: aplica otimizar_tabela e informa estados e passos do driver antes e depois')
+    analisador.add_argument('--glr', action='store_true',
+                            help='Mede analisar_glr contra LR com retrocesso nas gramáticas ambíguas; --tamanhos vira o número de operadores da entrada')
+    analisador.add_argument('--limite-passos', type=int, default=1_000_000, help='Passos do LR com retrocesso antes de desistir (--glr)')
+    analisador.add_argument('--servidor', type=int, metavar='REQUISICOES',
+                            help='Sobe gramatica.py --servidor e mede latência (p50/p90/p99) e vazão de REQUISICOES análises, contra a CLI avulsa')
+    analisador.add_argument('--conexoes', type=int, default=4, help='Conexões simultâneas do --servidor')
+    analisador.add_argument('--profundidade', type=int, default=16, help='Requisições em voo por conexão no --servidor (pipelining)')
+    analisador.add_argument('--tokens', type=int, default=200, help='Tokens por requisição do --servidor, ou da sentença do --preguicoso')
+    analisador.add_argument('--fluxo', metavar='TOKENS',
+                            help='Mede o fluxo binário .slrt (mmap + IDs) contra a lista de strings em fluxos de TOKENS tokens '
+                                 '(vários, separados por vírgula); os arquivos vão para TMPDIR')
+    analisador.add_argument('--limite-lista', type=int, default=10_000_000,
+                            help='Maior fluxo em que a lista de strings também é medida (--fluxo)')
+    analisador.add_argument('--preguicoso', action='store_true',
+                            help='Mede o tempo até a primeira análise de ~--tokens tokens com o autômato inteiro e no modo preguiçoso '
+                                 '(sem e com os estados gravados por uma execução anterior), e a fração do autômato construída')
+    analisador.add_argument('--reducao', action='store_true',
+                            help='Gera cada gramática com e sem reduzir_gramatica e informa produções, estados e células economizados')
+    analisador.add_argument('--reduzir', action='store_true', help='Aplica reduzir_gramatica nas demais medidas')
+    analisador.add_argument('--sem-memoria', action='store_true', help='Não faz a execução extra sob tracemalloc')
+    analisador.add_argument('-m', '--modo', choices=['slr', 'lalr'], default='slr')
+    analisador.add_argument('--conjuntos-bitset', action='store_true')
+    analisador.add_argument('--automato-nucleo', action='store_true')
+    analisador.add_argument('--leitor-linear', action='store_true')
+    analisador.add_argument('--saida', metavar='ARQUIVO', help='Grava os resultados em JSON (padrão: saída padrão)')
+    analisador.add_argument('--comparar', metavar='ARQUIVO', help='JSON de uma rodada anterior; sai com código 1 se houver regressão')
+    analisador.add_argument('--tolerancia', type=float, default=0.2, help='Piora relativa aceita no --comparar (0.2 = 20%%)')
+    args = analisador.parse_args()
+
+    disponiveis = AMBIGUAS if args.glr else GERADORES
+    padrao = 'torre,alternancia' if args.fluxo else ','.join(disponiveis)   # --fluxo precisa de sentenças que se repetem
+    nomes = [nome.strip() for nome in (args.gramaticas or padrao).split(',') if nome.strip()]
+    desconhecidos = [nome for nome in nomes if nome not in disponiveis]
+    if desconhecidos:
+        analisador.error(f"Geradores desconhecidos: {desconhecidos}")
+    tamanhos = [int(t) for t in args.tamanhos.split(',') if t.strip()]
+
+    def progresso(resultado):
+        print(f"{resultado['gramatica']:>12} n={resultado['tamanho']:<6} {resultado['producoes']:>7} produções "
+              f"{resultado['estados']:>7} estados {resultado['total_segundos']:>9.4f} s", file=sys.stderr)
+
+    def progresso_driver(resultado):
+        modos = ' '.join(f"{modo}={medida['tokens_por_segundo']:.0f} tok/s" +
+                         (f"/{medida['bytes_por_token']:.1f} B" if medida['bytes_por_token'] is not None else '')
+                         for modo, medida in resultado['modos'].items())
+        passos = resultado['passos']['consultas'] + resultado['passos']['reducoes']
+        print(f"{resultado['gramatica']:>12} n={resultado['tamanho']:<6} {resultado['tokens']:>8} tokens "
+              f"{passos / resultado['tokens']:.2f} passos/token {modos}", file=sys.stderr)
+        if 'otimizacao' in resultado:
+            otimizacao = resultado['otimizacao']
+            antes, depois = [p['consultas'] + p['reducoes'] for p in (resultado['passos'], resultado['passos_otimizados'])]   # cada redução ainda consulta o goto
+            print(f"{'':>12} estados {otimizacao['estados_antes']} -> {otimizacao['estados_depois']}, "
+                  f"linhas {otimizacao['linhas_antes']} -> {otimizacao['linhas_depois']}, "
+                  f"passos {antes} -> {depois} ({100 * (antes - depois) / antes:.1f}% a menos)", file=sys.stderr)
+
+    def progresso_glr(resultado):
+        modos = ' '.join(f"{modo}={medida['segundos']:.4f} s" + ('' if medida.get('concluido', True) else ' (limite)')
+                         for modo, medida in resultado['modos'].items())
+        print(f"{resultado['gramatica']:>14} n={resultado['tamanho']:<6} {resultado['tokens']:>6} tokens "
+              f"{resultado['arvores']:.3g} árvores {modos}", file=sys.stderr)
+
+    def progresso_fluxo(resultado):
+        modos = ' '.join(f"{modo}={medida['tokens_por_segundo']:.0f} tok/s" +
+                         (f"/{medida['bytes_por_token']:.1f} B" if medida['bytes_por_token'] is not None else '')
+                         for modo, medida in resultado['modos'].items())
+        print(f"{resultado['gramatica']:>12} n={resultado['tamanho']:<6} {resultado['tokens']:>11} tokens "
+              f"{resultado['bytes_fluxo'] / 2**20:.1f} MiB (texto {resultado['bytes_texto'] / 2**20:.1f} MiB) {modos}", file=sys.stderr)
+
+    def progresso_preguicoso(resultado):
+        modos = resultado['modos']
+        print(f"{resultado['gramatica']:>12} n={resultado['tamanho']:<6} {resultado['estados']:>7} estados "
+              + ' '.join(f"{modo}={medida['segundos_primeira_analise'] * 1000:.1f} ms" for modo, medida in modos.items())
+              + f" | {modos['preguicoso']['linhas_materializadas']} linhas ({100 * modos['preguicoso']['fracao_materializada']:.1f}%) "
+              f"| {modos['completo']['tokens_por_segundo']:.0f} -> {modos['preguicoso']['tokens_por_segundo']:.0f} tok/s", file=sys.stderr)
+
+    def progresso_reducao(resultado):
+        antes, depois = resultado['antes'], resultado['depois']
+        print(f"{resultado['gramatica']:>12} n={resultado['tamanho']:<6} produções {antes['producoes']} -> {depois['producoes']}, "
+              f"estados {antes['estados']} -> {depois['estados']}, células {antes['celulas']} -> {depois['celulas']} "
+              f"({antes['preenchidas']} -> {depois['preenchidas']} preenchidas), "
+              f"{antes['segundos']:.4f} -> {depois['segundos']:.4f} s", file=sys.stderr)
+
+    def progresso_servidor(resultado):
+        servidor, cli = resultado['modos']['servidor'], resultado['modos']['cli']
+        latencia = servidor['latencia_ms']
+        print(f"{resultado['gramatica']:>12} n={resultado['tamanho']:<6} {servidor['requisicoes_por_segundo']:>8.0f} req/s "
+              f"p50={latencia['p50']:.2f} p90={latencia['p90']:.2f} p99={latencia['p99']:.2f} max={latencia['max']:.2f} ms | "
+              f"cli {cli['segundos'] * 1000:.0f} ms por chamada", file=sys.stderr)
+
+    geradores = {nome: disponiveis[nome] for nome in nomes}
+    opcoes = dict(modo=args.modo, conjuntos_bitset=args.conjuntos_bitset, automato_nucleo=args.automato_nucleo,
+                  leitor_linear=args.leitor_linear)
+    if args.reduzir:
+        opcoes['gramatica_reduzida'] = True
+    if args.preguicoso:
+        if args.modo != 'slr':
+            analisador.error("--preguicoso só mede tabelas SLR")
+        documento = executar_preguicoso(geradores, tamanhos, args.tokens, args.repeticoes, progresso_preguicoso, **opcoes)
+    elif args.reducao:
+        documento = executar_reducao(geradores, tamanhos, args.repeticoes, progresso_reducao, **opcoes)
+    elif args.servidor:
+        documento = executar_servidor(geradores, tamanhos, args.servidor, args.conexoes, args.profundidade, args.tokens,
+                                      args.repeticoes, progresso_servidor, **opcoes)
+    elif args.fluxo:
+        quantidades = [int(t) for t in args.fluxo.split(',') if t.strip()]
+        documento = executar_fluxo(geradores, tamanhos, quantidades, args.repeticoes, not args.sem_memoria, progresso_fluxo,
+                                   args.limite_lista, **opcoes)
+    elif args.glr:
+        documento = executar_glr(geradores, tamanhos, args.repeticoes, not args.sem_memoria, progresso_glr,
+                                 args.limite_passos, **opcoes)
+    elif args.driver:
+        documento = executar_driver(geradores, tamanhos, args.driver, args.repeticoes, not args.sem_memoria, progresso_driver,
+                                    otimizar=args.otimizar, **opcoes)
+    else:
+        documento = executar(geradores, tamanhos, args.repeticoes, not args.sem_memoria, progresso, **opcoes)
+
+    texto = json.dumps(documento, indent=2, ensure_ascii=False)
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as f:
+            f.write(texto + '\n')
+        print(f"Resultados gravados em {args.saida}", file=sys.stderr)
+    else:
+        print(texto)
+
+    if args.comparar:
+        with open(args.comparar, 'r', encoding='utf-8') as f:
+            anterior = json.load(f)
+        regressoes = comparar(anterior, documento, args.tolerancia)
+        for gramatica, tamanho, fase, campo, antes, depois in regressoes:
+            print(f"REGRESSÃO {gramatica} n={tamanho} {fase} {campo}: {antes:.6g} -> {depois:.6g}", file=sys.stderr)
+        if regressoes:
+            sys.exit(1)
+        print("Nenhuma regressão acima da tolerância", file=sys.stderr)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+import sys
+import time
+import random
+import platform
+import tracemalloc
+from itertools import chain
+from datetime import datetime, timezone
+
+from gramatica import AnalisadorSLR, VERSAO_GERADOR
+
+def gerar_sentenca(analisador, tamanho, semente=0, tentativas=20): #cadeia de terminais da linguagem com cerca de `tamanho` tokens
+    #derivação mais à esquerda: abaixo do tamanho escolhe quase sempre a alternativa com mais não-terminais;
+    #passado o tamanho, fecha cada não-terminal pela menor derivação. Derivações que morrem cedo são sorteadas de novo
+    gramatica = analisador.gramatica
+    sorteio = random.Random(semente)
+    escolhida = analisador.menores_derivacoes()
+    nao_terminais = set(gramatica.nao_terminais)
+    alternativas = {}
+    for idx, (esquerdo, direito) in enumerate(gramatica.producoes):
+        if all(sim in escolhida for sim in direito if sim in nao_terminais):   # alternativas com improdutivos nunca fecham
+            alternativas.setdefault(esquerdo, []).append(idx)
+    crescer = {nt: max(idxs, key=lambda idx: sum(sim in nao_terminais for sim in gramatica.producoes[idx][1]))
+               for nt, idxs in alternativas.items()}
+
+    melhor = []
+    for _ in range(tentativas):
+        saida = []
+        pilha = [gramatica.producoes[0][1][0]]   # o inicial original: S' -> S $ já acrescentaria o fim de arquivo
+        while pilha:
+            sim = pilha.pop()
+            if sim not in nao_terminais:
+                saida.append(sim)
+                continue
+            if len(saida) + len(pilha) >= tamanho:
+                idx = escolhida[sim]
+            elif sorteio.random() < 0.8:
+                idx = crescer[sim]
+            else:
+                idx = sorteio.choice(alternativas[sim])
+            pilha.extend(reversed(gramatica.producoes[idx][1]))
+        if len(saida) > len(melhor):
+            melhor = saida
+        if len(melhor) >= tamanho // 2:
+            break
+    return melhor
+
+def modos(analisador): #(nome, função(tokens)) de cada saída do driver
+    contar = {idx: len for idx in range(len(analisador.gramatica.producoes))}
+    objetos = {idx: (lambda filhos, idx=idx: (idx, filhos)) for idx in range(len(analisador.gramatica.producoes))}
+    return [
+        ('reconhecer', analisador.analisar),
+        ('perfilado', analisador.analisar_perfilado),   # o custo dos contadores de --perfil sobre reconhecer
+        ('arvore', analisador.analisar_arvore),
+        ('acoes', lambda tokens: analisador.avaliar(tokens, contar)),
+        ('objetos', lambda tokens: analisador.avaliar(tokens, objetos)),   # referência: um objeto Python por nó
+        ('glr', analisador.analisar_glr),   # GSS e floresta; sem conflito, compara com arvore e objetos
+    ]
+
+def contar_passos(tabela, tokens, fim): #o laço de analisar com contadores: consultas à linha, shifts, reduções e reduções padrão
+    linhas, esquerdos, tamanhos = tabela.linhas, tabela.esquerdos, tabela.tamanhos
+    padroes = tabela.padroes or [None] * len(linhas)
+    passos = {'consultas': 0, 'shifts': 0, 'reducoes': 0, 'reducoes_padrao': 0}
+    pilha = [1]
+    for token in chain(tokens, (fim,)):
+        while True:
+            estado = pilha[-1]
+            acao = padroes[estado]
+            if acao is None:
+                passos['consultas'] += 1
+                acao = linhas[estado].get(token)
+                if acao is None:
+                    return passos
+            else:
+                passos['reducoes_padrao'] += 1
+            if acao > 0:
+                passos['shifts'] += 1
+                pilha.append(acao)
+                break
+            if acao == 0:
+                return passos
+            passos['reducoes'] += 1
+            del pilha[len(pilha) - tamanhos[-acao]:]
+            pilha.append(linhas[pilha[-1]][esquerdos[-acao]])
+    return passos
+
+def medir_driver(texto_entrada, tamanho, repeticoes=3, memoria=True, semente=0, otimizar=False, **opcoes):
+    #tokens/s: melhor de `repeticoes`; bytes/token: pico do tracemalloc numa execução à parte, sem contar a entrada.
+    #Com otimizar, conta os passos antes e depois de otimizar_tabela e mede os modos já na tabela otimizada
+    analisador = AnalisadorSLR(**opcoes)
+    analisador.gerar_analisador(texto_entrada)
+    analisador.decodificar_tabela()
+    tokens = gerar_sentenca(analisador, tamanho, semente)
+    fim = analisador.gramatica.fim_arquivo
+
+    medida = {'tokens': len(tokens), 'passos': contar_passos(analisador.tabela_decodificada, tokens, fim)}
+    if otimizar:
+        medida['otimizacao'] = analisador.otimizar_tabela()
+        medida['passos_otimizados'] = contar_passos(analisador.tabela_decodificada, tokens, fim)
+
+    resultados = {}
+    for nome, funcao in modos(analisador):
+        melhor = None
+        for _ in range(max(1, repeticoes)):
+            inicio = time.perf_counter()
+            resultado = funcao(tokens)
+            decorrido = time.perf_counter() - inicio
+            melhor = decorrido if melhor is None else min(melhor, decorrido)
+        if not resultado:
+            raise ValueError(f"Sentença gerada rejeitada no modo {nome}: {resultado}")
+        del resultado
+
+        bytes_por_token = None
+        if memoria:
+            tracemalloc.start()
+            try:
+                resultado = funcao(tokens)
+                bytes_por_token = tracemalloc.get_traced_memory()[1] / len(tokens)
+                del resultado
+            finally:
+                tracemalloc.stop()
+        resultados[nome] = {'segundos': melhor, 'tokens_por_segundo': len(tokens) / melhor, 'bytes_por_token': bytes_por_token}
+    medida['modos'] = resultados
+    return medida
+
+def executar_driver(geradores, tamanhos, tokens, repeticoes=3, memoria=True, progresso=None, otimizar=False, **opcoes):
+    #mesmo documento de medicao.executar, com "modos" do driver no lugar das fases do gerador
+    resultados = []
+    for nome, gerador in geradores.items():
+        for tamanho in tamanhos:
+            medida = medir_driver(gerador(tamanho), tokens, repeticoes, memoria, otimizar=otimizar, **opcoes)
+            resultados.append({'gramatica': nome, 'tamanho': tamanho, **medida})
+            if progresso:
+                progresso(resultados[-1])
+    return {
+        'versao_gerador': VERSAO_GERADOR,
+        'python': sys.version.split()[0],
+        'plataforma': platform.platform(),
+        'data': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'opcoes': {'repeticoes': repeticoes, 'tokens': tokens, 'otimizar': otimizar, **opcoes},
+        'resultados': resultados,
+    }
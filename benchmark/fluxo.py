@@ -0,0 +1,133 @@
+import os
+import sys
+import time
+import platform
+import tempfile
+import tracemalloc
+from array import array
+from datetime import datetime, timezone
+
+from gramatica import AnalisadorSLR, VERSAO_GERADOR
+from fluxo_tokens import EscritorFluxo, ler_fluxo
+from .driver import gerar_sentenca
+
+REPETICOES_POR_BLOCO = 1 << 16
+
+def unidade_repeticao(analisador, tamanho=200, sementes=20):
+    #(sentença, separador) tais que sentença (separador sentença)* está na linguagem, p.ex. "id op0 id" e ["op0"] na torre
+    #ou uma lista de comandos com separador vazio; é o que permite gravar fluxos de qualquer tamanho sem montar a sentença
+    candidatos = [[]] + [[t] for t in analisador.gramatica.terminais]
+    for semente in range(sementes):
+        sentenca = gerar_sentenca(analisador, tamanho, semente)
+        if not sentenca or not analisador.analisar(sentenca):
+            continue
+        for separador in candidatos:
+            if analisador.analisar(sentenca + separador + sentenca) and analisador.analisar(sentenca + (separador + sentenca) * 2):
+                return sentenca, separador
+    raise ValueError("Gramática não tem sentença que possa ser repetida: use, por exemplo, torre ou alternancia")
+
+def gravar_repeticao(caminho_fluxo, caminho_texto, terminais, sentenca, separador, tokens):
+    #sentença (separador sentença)* com cerca de `tokens` tokens, em blocos; o texto só é gravado se caminho_texto for dado
+    unidade = separador + sentenca
+    repeticoes = max(0, (tokens - len(sentenca)) // len(unidade))
+    indice = {t: i for i, t in enumerate(terminais)}
+    with EscritorFluxo(caminho_fluxo, terminais) as escritor:
+        bloco_ids = array(escritor.tipo_id, [indice[t] for t in unidade]) * REPETICOES_POR_BLOCO
+        escritor.escrever_ids([indice[t] for t in sentenca])
+        restantes = repeticoes
+        while restantes:
+            vezes = min(restantes, REPETICOES_POR_BLOCO)
+            escritor.escrever_ids(bloco_ids if vezes == REPETICOES_POR_BLOCO else bloco_ids[:vezes * len(unidade)])
+            restantes -= vezes
+    texto_unidade = (' ' + ' '.join(unidade)).encode('utf-8')
+    bytes_texto = len(' '.join(sentenca).encode('utf-8')) + len(texto_unidade) * repeticoes + 1
+    if caminho_texto is not None:
+        with open(caminho_texto, 'wb') as f:
+            f.write(' '.join(sentenca).encode('utf-8'))
+            bloco_texto = texto_unidade * REPETICOES_POR_BLOCO
+            restantes = repeticoes
+            while restantes:
+                vezes = min(restantes, REPETICOES_POR_BLOCO)
+                f.write(bloco_texto if vezes == REPETICOES_POR_BLOCO else texto_unidade * vezes)
+                restantes -= vezes
+            f.write(b'\n')
+    return len(sentenca) + repeticoes * len(unidade), bytes_texto
+
+def _ler_lista(caminho): #o caminho de hoje: o arquivo inteiro vira uma lista de strings antes do driver
+    with open(caminho, 'r') as f:
+        return f.read().split()
+
+def modos_fluxo(analisador, caminho_fluxo, caminho_texto): #(nome, função()) de cada forma de entregar os tokens ao driver
+    def fluxo():
+        with ler_fluxo(caminho_fluxo) as aberto:
+            return analisador.analisar_ids(aberto.ids, aberto.terminais)
+
+    def fluxo_nomes():   # mesmo mmap, mas pelo driver de strings: separa o ganho do formato do ganho das linhas por ID
+        with ler_fluxo(caminho_fluxo) as aberto:
+            return analisador.analisar(aberto.nomes())
+
+    modos = [('fluxo', fluxo), ('fluxo_nomes', fluxo_nomes)]
+    if caminho_texto is not None:
+        modos.insert(0, ('lista', lambda: analisador.analisar(_ler_lista(caminho_texto))))
+    return modos
+
+def medir_fluxo(texto_entrada, tokens, repeticoes=3, memoria=True, limite_lista=10_000_000, **opcoes):
+    #tokens/s (melhor de `repeticoes`, leitura do arquivo incluída) e pico do tracemalloc por token de cada modo; a lista
+    #de strings só é medida até limite_lista tokens, acima disso ela sozinha não caberia na memória
+    analisador = AnalisadorSLR(**opcoes)
+    if not analisador.gerar_analisador(texto_entrada):
+        raise ValueError("Gramática do benchmark não gerou tabela")
+    analisador.decodificar_tabela()
+    sentenca, separador = unidade_repeticao(analisador)
+
+    with tempfile.TemporaryDirectory() as diretorio:   # TMPDIR escolhe o disco dos arquivos de vários GB
+        caminho_fluxo = os.path.join(diretorio, 'tokens.slrt')
+        caminho_texto = os.path.join(diretorio, 'tokens.txt') if tokens <= limite_lista else None
+        inicio = time.perf_counter()
+        total, bytes_texto = gravar_repeticao(caminho_fluxo, caminho_texto, analisador.gramatica.terminais,
+                                              sentenca, separador, tokens)
+        medida = {'tokens': total, 'segundos_gravacao': time.perf_counter() - inicio,
+                  'bytes_fluxo': os.path.getsize(caminho_fluxo), 'bytes_texto': bytes_texto}
+
+        resultados = {}
+        for nome, funcao in modos_fluxo(analisador, caminho_fluxo, caminho_texto):
+            melhor = None
+            for _ in range(max(1, repeticoes)):
+                inicio = time.perf_counter()
+                resultado = funcao()
+                decorrido = time.perf_counter() - inicio
+                melhor = decorrido if melhor is None else min(melhor, decorrido)
+            if not resultado:
+                raise ValueError(f"Fluxo gerado rejeitado no modo {nome}: {resultado}")
+            del resultado
+
+            bytes_por_token = None
+            if memoria:
+                tracemalloc.start()
+                try:
+                    funcao()
+                    bytes_por_token = tracemalloc.get_traced_memory()[1] / total
+                finally:
+                    tracemalloc.stop()
+            resultados[nome] = {'segundos': melhor, 'tokens_por_segundo': total / melhor, 'bytes_por_token': bytes_por_token}
+        medida['modos'] = resultados
+    return medida
+
+def executar_fluxo(geradores, tamanhos, tokens, repeticoes=3, memoria=True, progresso=None, limite_lista=10_000_000, **opcoes):
+    #mesmo documento de medicao.executar; `tokens` é a lista de tamanhos de fluxo medidos em cada gramática
+    resultados = []
+    for nome, gerador in geradores.items():
+        for tamanho in tamanhos:
+            for quantidade in tokens:
+                medida = medir_fluxo(gerador(tamanho), quantidade, repeticoes, memoria, limite_lista, **opcoes)
+                resultados.append({'gramatica': nome, 'tamanho': tamanho, **medida})
+                if progresso:
+                    progresso(resultados[-1])
+    return {
+        'versao_gerador': VERSAO_GERADOR,
+        'python': sys.version.split()[0],
+        'plataforma': platform.platform(),
+        'data': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'opcoes': {'repeticoes': repeticoes, 'tokens': tokens, 'limite_lista': limite_lista, **opcoes},
+        'resultados': resultados,
+    }
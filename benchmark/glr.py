@@ -0,0 +1,119 @@
+import sys
+import time
+import platform
+import tracemalloc
+from datetime import datetime, timezone
+
+from gramatica import AnalisadorSLR, VERSAO_GERADOR
+
+def sentenca_ambigua(operadores, erro=False): #id op0 id op1 id ... com `operadores` operadores; com erro, termina num operador solto
+    tokens = ['id']
+    for i in range(operadores):
+        tokens += [f'op{i % 2}', 'id']
+    if erro:
+        tokens.append('op0')
+    return tokens
+
+def analisar_retrocesso(tabela, tokens, limite_passos=1_000_000, todas=False):
+    #referência: LR com retrocesso em profundidade, no estilo dos geradores com backtracking. Numa célula em conflito segue a
+    #primeira ação e guarda uma cópia da pilha para cada outra; se der erro, volta à última escolha pendente.
+    #Devolve (análises, passos): análises é 0 ou 1 (com todas, quantas árvores existem) e None se o limite acabar antes
+    linhas, multiplas, esquerdos, tamanhos = tabela.linhas, tabela.multiplas, tabela.esquerdos, tabela.tamanhos
+    entrada = list(tokens) + [tabela.terminais[-1]]
+    passos = 0
+    analises = 0
+    pendentes = [([1], 0, None)]   # (pilha, posição, ação a aplicar)
+    while pendentes:
+        pilha, posicao, acao = pendentes.pop()
+        while True:
+            if acao is None:
+                estado = pilha[-1]
+                token = entrada[posicao]
+                conflito = multiplas.get(estado)
+                if conflito is not None and token in conflito:
+                    acao, *outras = conflito[token]
+                    for outra in reversed(outras):
+                        pendentes.append((pilha[:], posicao, outra))
+                else:
+                    acao = linhas[estado].get(token)
+                    if acao is None:
+                        break
+            passos += 1
+            if passos > limite_passos:
+                return None, passos
+            if acao == 0:
+                analises += 1
+                if not todas:
+                    return analises, passos
+                break
+            if acao > 0:
+                pilha.append(acao)
+                posicao += 1
+            else:
+                del pilha[len(pilha) - tamanhos[-acao]:]
+                pilha.append(linhas[pilha[-1]][esquerdos[-acao]])
+            acao = None
+    return analises, passos
+
+def medir_glr(texto_entrada, operadores, erro=False, repeticoes=3, memoria=True, limite_passos=1_000_000, **opcoes):
+    #GLR contra retrocesso na mesma entrada: tempo (melhor de `repeticoes`), árvores na floresta e passos do retrocesso
+    analisador = AnalisadorSLR(glr=True, **opcoes)
+    if not analisador.gerar_analisador(texto_entrada):
+        raise ValueError("Gramática do benchmark GLR não gerou tabela")
+    tabela = analisador.decodificar_tabela_glr()
+    tokens = sentenca_ambigua(operadores, erro)
+    medida = {'tokens': len(tokens), 'celulas_em_conflito': len(analisador.acoes_conflitantes)}
+
+    melhor = None
+    for _ in range(max(1, repeticoes)):
+        inicio = time.perf_counter()
+        resultado = analisador.analisar_glr(tokens)
+        decorrido = time.perf_counter() - inicio
+        melhor = decorrido if melhor is None else min(melhor, decorrido)
+    if bool(resultado) == erro:
+        raise ValueError(f"Resultado inesperado do GLR: {resultado}")
+    medida['arvores'] = resultado.arvore.contar_arvores() if resultado else 0
+    medida['nos_floresta'] = len(resultado.arvore)
+    bytes_por_token = None
+    if memoria:
+        tracemalloc.start()
+        try:
+            analisador.analisar_glr(tokens)
+            bytes_por_token = tracemalloc.get_traced_memory()[1] / len(tokens)
+        finally:
+            tracemalloc.stop()
+    modos = {'glr': {'segundos': melhor, 'tokens_por_segundo': len(tokens) / melhor, 'bytes_por_token': bytes_por_token}}
+
+    for nome, todas in (('retrocesso', False), ('retrocesso_todas', True)):   # uma execução só: pode levar muito mais que o GLR
+        if erro and todas:
+            continue   # sem árvore nenhuma, as duas buscas percorrem o mesmo espaço
+        inicio = time.perf_counter()
+        analises, passos = analisar_retrocesso(tabela, tokens, limite_passos, todas)
+        decorrido = time.perf_counter() - inicio
+        modos[nome] = {'segundos': decorrido, 'tokens_por_segundo': len(tokens) / decorrido, 'passos': passos,
+                       'concluido': analises is not None}
+        if analises is not None and analises != (medida['arvores'] if todas else min(medida['arvores'], 1)):
+            raise ValueError(f"Retrocesso discorda do GLR em {len(tokens)} tokens: {analises} análise(s)")
+    medida['modos'] = modos
+    return medida
+
+def executar_glr(geradores, tamanhos, repeticoes=3, memoria=True, progresso=None, limite_passos=1_000_000, **opcoes):
+    #cada gramática ambígua é medida com entradas válidas e com erro no último token (o pior caso do retrocesso);
+    #o tamanho é o número de operadores da entrada. Mesmo documento de medicao.executar, com "modos" glr e retrocesso
+    resultados = []
+    for nome, gerador in geradores.items():
+        texto_entrada = gerador(2)
+        for erro in (False, True):
+            for tamanho in tamanhos:
+                medida = medir_glr(texto_entrada, tamanho, erro, repeticoes, memoria, limite_passos, **opcoes)
+                resultados.append({'gramatica': f"{nome}_erro" if erro else nome, 'tamanho': tamanho, **medida})
+                if progresso:
+                    progresso(resultados[-1])
+    return {
+        'versao_gerador': VERSAO_GERADOR,
+        'python': sys.version.split()[0],
+        'plataforma': platform.platform(),
+        'data': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'opcoes': {'repeticoes': repeticoes, 'limite_passos': limite_passos, **opcoes},
+        'resultados': resultados,
+    }
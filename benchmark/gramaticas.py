@@ -0,0 +1,117 @@
+#Geradores de gramáticas sintéticas, no mesmo formato de arquivo que gramatica.py lê. Todos recebem o tamanho n.
+
+def _montar(terminais, nao_terminais, inicial, producoes):
+    cabecalho = [f"term = {list(terminais)!r}", f"non_term = [{', '.join(nao_terminais)}]", f"init = {inicial}", "eof = $"]
+    return '\n'.join(cabecalho + producoes) + '\n'
+
+def torre(n): #expressões com n níveis de precedência, um operador por nível
+    terminais = ['(', ')', 'id'] + [f'op{i}' for i in range(n)]
+    nao_terminais = [f'E{i}' for i in range(n + 1)]
+    producoes = [f"E{i} -> E{i} op{i} E{i + 1} | E{i + 1}" for i in range(n)]
+    producoes.append(f"E{n} -> ( E0 ) | id")
+    return _montar(terminais, nao_terminais, 'E0', producoes)
+
+def plana(n): #a linguagem de torre(n) com um só não-terminal: E -> E opi E, desambiguada por %left (op0 liga menos)
+    terminais = ['(', ')', 'id'] + [f'op{i}' for i in range(n)]
+    producoes = [f"%left op{i}" for i in range(n)]
+    producoes.append("E -> " + ' | '.join(f"E op{i} E" for i in range(n)) + " | ( E ) | id")
+    return _montar(terminais, ['E'], 'E', producoes)
+
+def alternancia(n): #um comando com n alternativas, cada uma iniciada por uma palavra-chave própria
+    terminais = ['id', ';', '='] + [f'kw{i}' for i in range(n)]
+    nao_terminais = ['Programa', 'Lista', 'Comando', 'Valor']
+    producoes = ["Programa -> Lista",
+                 "Lista -> Lista Comando | Comando",
+                 "Comando -> " + ' | '.join(f"kw{i} Valor ;" for i in range(n)),
+                 "Valor -> id | id = Valor"]
+    return _montar(terminais, nao_terminais, 'Programa', producoes)
+
+def anulaveis(n): #cadeia de n não-terminais anuláveis: FIRST de cada um cresce com o resto da cadeia
+    terminais = [f't{i}' for i in range(n)] + ['fim']
+    nao_terminais = ['S'] + [f'A{i}' for i in range(n + 1)] + [f'B{i}' for i in range(n)]
+    producoes = ["S -> A0 fim"]
+    for i in range(n):
+        producoes.append(f"A{i} -> B{i} A{i + 1}")
+        producoes.append(f"B{i} -> t{i} | vazio")
+    producoes.append(f"A{n} -> vazio")
+    return _montar(terminais, nao_terminais, 'S', producoes)
+
+_JSON = [
+    ("Valor", ["Objeto", "Lista", "str", "num", "true", "false", "null"]),
+    ("Objeto", ["{ }", "{ Membros }"]),
+    ("Membros", ["Par", "Membros , Par"]),
+    ("Par", ["str : Valor"]),
+    ("Lista", ["[ ]", "[ Elementos ]"]),
+    ("Elementos", ["Valor", "Elementos , Valor"]),
+]
+
+_SQL = [
+    ("Comando", ["Consulta ;", "Insercao ;", "Remocao ;"]),
+    ("Consulta", ["select Colunas from id Onde Ordem"]),
+    ("Colunas", ["*", "ListaCol"]),
+    ("ListaCol", ["Col", "ListaCol , Col"]),
+    ("Col", ["id", "Funcao ( id )"]),
+    ("Funcao", ["count", "sum", "avg", "min", "max"]),
+    ("Onde", ["where Cond", "vazio"]),
+    ("Cond", ["Cond or Termo", "Termo"]),
+    ("Termo", ["Termo and Fator", "Fator"]),
+    ("Fator", ["not Fator", "( Cond )", "Val op Val"]),
+    ("Val", ["id", "num", "str"]),
+    ("Ordem", ["order by ListaCol", "vazio"]),
+    ("Insercao", ["insert into id values ( Vals )"]),
+    ("Vals", ["Val", "Vals , Val"]),
+    ("Remocao", ["delete from id Onde"]),
+]
+
+_SQL_INUTIL = [("Comando", _SQL[0][1] + ["Laco ;"])] + _SQL[1:] + [("Laco", ["( Laco )", "Laco , Col"])]   # Laco nunca termina
+
+def _replicar(modelo, n, alcancaveis=None):
+    #n cópias independentes do modelo, com sufixo _i em todos os símbolos, escolhidas por uma etiqueta doc_i
+    #(só as `alcancaveis` primeiras, se dado: as outras ficam na gramática sem que Documento chegue até elas)
+    nao_terminais_modelo = [esquerdo for esquerdo, _ in modelo]
+    terminais_modelo = []
+    for _, alternativas in modelo:
+        for alternativa in alternativas:
+            for simbolo in alternativa.split():
+                if simbolo not in nao_terminais_modelo and simbolo != 'vazio' and simbolo not in terminais_modelo:
+                    terminais_modelo.append(simbolo)
+
+    inicial = nao_terminais_modelo[0]
+    terminais = []
+    nao_terminais = ['Documento']
+    producoes = ["Documento -> " + ' | '.join(f"doc_{i} {inicial}_{i}" for i in range(n if alcancaveis is None else alcancaveis))]
+    for i in range(n):
+        terminais += [f"doc_{i}"] + [f"{t}_{i}" for t in terminais_modelo]
+        nao_terminais += [f"{nt}_{i}" for nt in nao_terminais_modelo]
+        for esquerdo, alternativas in modelo:
+            direitos = [' '.join(s if s == 'vazio' else f"{s}_{i}" for s in alternativa.split()) for alternativa in alternativas]
+            producoes.append(f"{esquerdo}_{i} -> {' | '.join(direitos)}")
+    return _montar(terminais, nao_terminais, 'Documento', producoes)
+
+def json(n): #n cópias da gramática de JSON
+    return _replicar(_JSON, n)
+
+def sql(n): #n cópias de um subconjunto de SQL (select/insert/delete com where e order by)
+    return _replicar(_SQL, n)
+
+def inuteis(n): #sql(n) como sai de um gerador descuidado: só um quarto das cópias é alcançável e cada uma tem um não-terminal improdutivo
+    return _replicar(_SQL_INUTIL, n, max(1, n // 4))
+
+GERADORES = {
+    'torre': torre,
+    'plana': plana,
+    'alternancia': alternancia,
+    'anulaveis': anulaveis,
+    'json': json,
+    'sql': sql,
+    'inuteis': inuteis,
+}
+
+def ambigua(n): #expressões com n operadores binários sem precedência nem associatividade: conflitos em toda célula de operador
+    terminais = ['(', ')', 'id'] + [f'op{i}' for i in range(n)]
+    producoes = ["E -> " + ' | '.join(f"E op{i} E" for i in range(n)) + " | ( E ) | id"]
+    return _montar(terminais, ['E'], 'E', producoes)
+
+AMBIGUAS = {   # só geram com glr=True; ficam fora de GERADORES
+    'ambigua': ambigua,
+}
@@ -0,0 +1,113 @@
+import sys
+import time
+import platform
+import tracemalloc
+from datetime import datetime, timezone
+
+try:
+    import resource
+except ImportError:   # Windows
+    resource = None
+
+from gramatica import AnalisadorSLR, VERSAO_GERADOR
+
+def fases(analisador, texto_entrada): #(nome, função) na mesma ordem e com as mesmas escolhas de gerar_analisador
+    lista = []
+    if analisador.leitor_linear:
+        lista.append(('analisar_gramatica_linear', lambda: analisador.analisar_gramatica_linear(texto_entrada)))
+    else:
+        lista.append(('analisar_gramatica', lambda: analisador.analisar_gramatica(texto_entrada)))
+    if analisador.gramatica_reduzida:
+        lista.append(('reduzir_gramatica', analisador.reduzir_gramatica))
+    lista.append(('aumentar_gramatica', analisador.aumentar_gramatica))
+    if analisador.conjuntos_bitset:
+        lista.append(('calcular_conjuntos_bitset', analisador.calcular_conjuntos_bitset))
+    else:
+        lista.append(('calcular_conjuntos_first', analisador.calcular_conjuntos_first))
+        lista.append(('calcular_conjuntos_follow', analisador.calcular_conjuntos_follow))
+    if analisador.automato_nucleo:
+        lista.append(('construir_automato_lr0_nucleo', analisador.construir_automato_lr0_nucleo))
+    else:
+        lista.append(('construir_automato_lr0', analisador.construir_automato_lr0))
+    if analisador.modo == 'lalr':
+        lista.append(('construir_tabela_lalr', analisador.construir_tabela_lalr))
+    else:
+        lista.append(('construir_tabela_slr', analisador.construir_tabela_slr))
+    return lista
+
+def medir_gramatica(texto_entrada, repeticoes=3, memoria=True, **opcoes):
+    #tempo: menor de `repeticoes` execuções sem rastreamento; memória: uma execução extra sob tracemalloc,
+    #que deixaria os tempos várias vezes mais lentos se fosse medida junto
+    tempos = {}
+    for _ in range(max(1, repeticoes)):
+        analisador = AnalisadorSLR(**opcoes)
+        for nome, funcao in fases(analisador, texto_entrada):
+            inicio = time.perf_counter()
+            resultado = funcao()
+            decorrido = time.perf_counter() - inicio
+            tempos[nome] = min(tempos.get(nome, decorrido), decorrido)
+
+    picos = {}
+    if memoria:
+        analisador = AnalisadorSLR(**opcoes)
+        tracemalloc.start()
+        try:
+            for nome, funcao in fases(analisador, texto_entrada):
+                tracemalloc.reset_peak()
+                funcao()
+                picos[nome] = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    _, conflitos = resultado   # a última fase sempre devolve (tabela, conflitos)
+    return {
+        'producoes': len(analisador.gramatica.producoes),
+        'estados': len(analisador.estados),
+        'conflitos': len(conflitos),
+        'total_segundos': sum(tempos.values()),
+        'pico_bytes': max(picos.values()) if picos else None,
+        'fases': {nome: {'segundos': tempos[nome], 'pico_bytes': picos.get(nome)} for nome in tempos},
+    }
+
+def executar(geradores, tamanhos, repeticoes=3, memoria=True, progresso=None, **opcoes):
+    #mede cada gerador em cada tamanho; devolve o documento JSON completo da rodada
+    resultados = []
+    for nome, gerador in geradores.items():
+        for tamanho in tamanhos:
+            medida = medir_gramatica(gerador(tamanho), repeticoes, memoria, **opcoes)
+            resultados.append({'gramatica': nome, 'tamanho': tamanho, **medida})
+            if progresso:
+                progresso(resultados[-1])
+    return {
+        'versao_gerador': VERSAO_GERADOR,
+        'python': sys.version.split()[0],
+        'plataforma': platform.platform(),
+        'data': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'opcoes': {'repeticoes': repeticoes, **opcoes},
+        'max_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss if resource else None,   # pico do processo na rodada inteira
+        'resultados': resultados,
+    }
+
+def comparar(anterior, atual, tolerancia=0.2, minimo_segundos=0.005):
+    #fases que ficaram mais de `tolerancia` mais lentas (ou com pico maior) que na rodada anterior;
+    #fases abaixo de minimo_segundos são ignoradas no tempo porque o ruído domina
+    base = {(r['gramatica'], r['tamanho']): r for r in anterior['resultados']}
+    regressoes = []
+    for resultado in atual['resultados']:
+        antigo = base.get((resultado['gramatica'], resultado['tamanho']))
+        if antigo is None:
+            continue
+        chave = 'fases' if 'fases' in resultado else 'modos'   # rodadas de benchmark.driver medem modos
+        for fase, medida in resultado[chave].items():
+            medida_antiga = antigo.get(chave, {}).get(fase)
+            if medida_antiga is None:
+                continue
+            for campo in ('segundos', 'pico_bytes', 'bytes_por_token'):
+                valor, valor_antigo = medida.get(campo), medida_antiga.get(campo)
+                if valor is None or valor_antigo is None:
+                    continue
+                if campo == 'segundos' and valor_antigo < minimo_segundos:
+                    continue
+                if valor > valor_antigo * (1 + tolerancia):
+                    regressoes.append((resultado['gramatica'], resultado['tamanho'], fase, campo, valor_antigo, valor))
+    return regressoes
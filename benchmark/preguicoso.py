@@ -0,0 +1,78 @@
+import os
+import sys
+import time
+import platform
+import tempfile
+from datetime import datetime, timezone
+
+from gramatica import AnalisadorSLR, VERSAO_GERADOR
+from .driver import gerar_sentenca
+
+def _primeira_analise(texto_entrada, sentenca, materializados=None, **opcoes):
+    #(analisador, segundos de gerar_analisador até o fim da primeira análise); materializados: arquivo carregado antes de analisar
+    inicio = time.perf_counter()
+    analisador = AnalisadorSLR(**opcoes)
+    if not analisador.gerar_analisador(texto_entrada):
+        raise ValueError("Gramática do benchmark não gerou tabela")
+    if materializados is not None:
+        analisador.carregar_estados_materializados(materializados)
+    resultado = analisador.analisar(sentenca)
+    decorrido = time.perf_counter() - inicio
+    if not resultado:
+        raise ValueError(f"Sentença gerada rejeitada: {resultado}")
+    return analisador, decorrido
+
+def _vazao(analisador, sentenca, repeticoes): #tokens/s de analisar com a tabela já pronta (no preguiçoso, estados já materializados)
+    melhor = None
+    for _ in range(max(1, repeticoes)):
+        inicio = time.perf_counter()
+        analisador.analisar(sentenca)
+        decorrido = time.perf_counter() - inicio
+        melhor = decorrido if melhor is None else min(melhor, decorrido)
+    return len(sentenca) / melhor
+
+def medir_preguicoso(texto_entrada, tokens=200, repeticoes=3, semente=0, **opcoes):
+    #tempo até o fim da primeira análise com o autômato inteiro, no modo preguiçoso e no preguiçoso com os estados gravados
+    #por uma execução anterior; quanto do autômato a sentença precisou e a vazão depois que os estados já existem
+    opcoes.pop('preguicoso', None)
+    referencia = AnalisadorSLR(**opcoes)
+    if not referencia.gerar_analisador(texto_entrada):
+        raise ValueError("Gramática do benchmark não gerou tabela")
+    sentenca = gerar_sentenca(referencia, tokens, semente)
+    total = len(referencia.estados)
+
+    modos = {}
+    with tempfile.TemporaryDirectory() as diretorio:
+        materializados = os.path.join(diretorio, 'estados.slrc')
+        for nome, preguicoso, arquivo in (('completo', False, None), ('preguicoso', True, None),
+                                          ('preguicoso_gravado', True, materializados)):
+            melhor = None
+            for _ in range(max(1, repeticoes)):
+                analisador, decorrido = _primeira_analise(texto_entrada, sentenca, arquivo, preguicoso=preguicoso, **opcoes)
+                melhor = decorrido if melhor is None else min(melhor, decorrido)
+            medida = {'segundos_primeira_analise': melhor, 'tokens_por_segundo': _vazao(analisador, sentenca, repeticoes)}
+            if preguicoso:
+                medida.update(linhas_materializadas=len(analisador.tabela), estados_descobertos=len(analisador.estados),
+                              fracao_materializada=len(analisador.tabela) / total)
+            if nome == 'preguicoso':
+                analisador.salvar_estados_materializados(materializados)
+            modos[nome] = medida
+    return {'tokens': len(sentenca), 'estados': total, 'producoes': len(referencia.gramatica.producoes), 'modos': modos}
+
+def executar_preguicoso(geradores, tamanhos, tokens=200, repeticoes=3, progresso=None, **opcoes):
+    #mesmo documento de medicao.executar, com os modos completo, preguicoso e preguicoso_gravado
+    resultados = []
+    for nome, gerador in geradores.items():
+        for tamanho in tamanhos:
+            medida = medir_preguicoso(gerador(tamanho), tokens, repeticoes, **opcoes)
+            resultados.append({'gramatica': nome, 'tamanho': tamanho, **medida})
+            if progresso:
+                progresso(resultados[-1])
+    return {
+        'versao_gerador': VERSAO_GERADOR,
+        'python': sys.version.split()[0],
+        'plataforma': platform.platform(),
+        'data': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'opcoes': {'tokens': tokens, 'repeticoes': repeticoes, **opcoes},
+        'resultados': resultados,
+    }
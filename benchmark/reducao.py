@@ -0,0 +1,52 @@
+import sys
+import time
+import platform
+from datetime import datetime, timezone
+
+from gramatica import AnalisadorSLR, VERSAO_GERADOR
+
+def _gerar(texto_entrada, repeticoes, **opcoes): #(analisador, menor tempo de gerar_analisador)
+    melhor = None
+    for _ in range(max(1, repeticoes)):
+        analisador = AnalisadorSLR(**opcoes)
+        inicio = time.perf_counter()
+        if not analisador.gerar_analisador(texto_entrada):
+            raise ValueError("Gramática do benchmark não gerou tabela")
+        decorrido = time.perf_counter() - inicio
+        melhor = decorrido if melhor is None else min(melhor, decorrido)
+    return analisador, melhor
+
+def _tamanho(analisador, segundos): #o que a redução economiza: estados, colunas de não-terminal e células preenchidas
+    return {'producoes': len(analisador.gramatica.producoes), 'estados': len(analisador.estados),
+            'nao_terminais': len(analisador.gramatica.nao_terminais),
+            'celulas': sum(len(linha) for linha in analisador.tabela.values()),   # as linhas têm uma coluna por símbolo
+            'preenchidas': sum(acao is not None for linha in analisador.tabela.values() for acao in linha.values()),
+            'segundos': segundos}
+
+def medir_reducao(texto_entrada, repeticoes=3, **opcoes):
+    #gera a mesma gramática com e sem reduzir_gramatica; os estados e células a menos são o trabalho que a redução poupa
+    opcoes.pop('gramatica_reduzida', None)
+    completa, segundos_completa = _gerar(texto_entrada, repeticoes, **opcoes)
+    reduzida, segundos_reduzida = _gerar(texto_entrada, repeticoes, gramatica_reduzida=True, **opcoes)
+    antes, depois = _tamanho(completa, segundos_completa), _tamanho(reduzida, segundos_reduzida)
+    return {'antes': antes, 'depois': depois,
+            'economia': {campo: antes[campo] - depois[campo] for campo in antes},
+            'relatorio': reduzida.relatorio_reducao}
+
+def executar_reducao(geradores, tamanhos, repeticoes=3, progresso=None, **opcoes):
+    #mesmo documento de medicao.executar, com "antes"/"depois" da redução em cada medida
+    resultados = []
+    for nome, gerador in geradores.items():
+        for tamanho in tamanhos:
+            medida = medir_reducao(gerador(tamanho), repeticoes, **opcoes)
+            resultados.append({'gramatica': nome, 'tamanho': tamanho, **medida})
+            if progresso:
+                progresso(resultados[-1])
+    return {
+        'versao_gerador': VERSAO_GERADOR,
+        'python': sys.version.split()[0],
+        'plataforma': platform.platform(),
+        'data': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'opcoes': {'repeticoes': repeticoes, **opcoes},
+        'resultados': resultados,
+    }
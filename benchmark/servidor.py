@@ -0,0 +1,140 @@
+import os
+import sys
+import json
+import time
+import asyncio
+import platform
+import tempfile
+import subprocess
+from datetime import datetime, timezone
+
+from gramatica import AnalisadorSLR, VERSAO_GERADOR
+from servidor import percentis
+from .driver import gerar_sentenca
+
+GRAMATICA_PY = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'gramatica.py')
+
+async def _conectar(caminho, tentativas=100): #espera o servidor criar o socket
+    for _ in range(tentativas):
+        try:
+            return await asyncio.open_unix_connection(caminho, limit=64 * 1024 * 1024)
+        except (FileNotFoundError, ConnectionRefusedError):
+            await asyncio.sleep(0.05)
+    raise ValueError(f"Servidor não respondeu em {caminho}")
+
+async def _carga(caminho, requisicoes, conexoes, profundidade):
+    #cada conexão manda até `profundidade` requisições sem esperar resposta; a latência vai do envio à resposta de mesmo id
+    latencias = []
+    erros = 0
+
+    async def cliente(lote):
+        nonlocal erros
+        leitor, escritor = await _conectar(caminho)
+        enviados = {}
+        proxima = 0
+        recebidas = 0
+        while recebidas < len(lote):
+            while proxima < len(lote) and len(enviados) < profundidade:
+                enviados[proxima] = time.perf_counter()
+                escritor.write(json.dumps({'id': proxima, **lote[proxima]}).encode('utf-8') + b'\n')
+                proxima += 1
+            await escritor.drain()
+            resposta = json.loads(await leitor.readline())
+            latencias.append(time.perf_counter() - enviados.pop(resposta['id']))
+            erros += not resposta['ok']
+            recebidas += 1
+        escritor.close()
+        await escritor.wait_closed()
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(cliente(requisicoes[i::conexoes]) for i in range(conexoes)))
+    decorrido = time.perf_counter() - inicio
+
+    leitor, escritor = await _conectar(caminho)
+    escritor.write(b'{"op": "estatisticas"}\n')
+    await escritor.drain()
+    estatisticas = json.loads(await leitor.readline())
+    escritor.close()
+    return latencias, erros, decorrido, estatisticas
+
+def _cli(arquivo_gramatica, arquivo_tokens, repeticoes): #segundos de uma chamada avulsa de gramatica.py -e (melhor de `repeticoes`)
+    melhor = None
+    for _ in range(max(1, repeticoes)):
+        inicio = time.perf_counter()
+        subprocess.run([sys.executable, GRAMATICA_PY, '-f', arquivo_gramatica, '-e', arquivo_tokens, '-q'],
+                       check=True, stdout=subprocess.DEVNULL)
+        decorrido = time.perf_counter() - inicio
+        melhor = decorrido if melhor is None else min(melhor, decorrido)
+    return melhor
+
+async def _chave(caminho, texto_entrada, modo): #valida a gramática no servidor e devolve a chave para as requisições seguintes
+    leitor, escritor = await _conectar(caminho)
+    escritor.write(json.dumps({'op': 'validar', 'gramatica': texto_entrada, 'modo': modo}).encode('utf-8') + b'\n')
+    await escritor.drain()
+    resposta = json.loads(await leitor.readline())
+    escritor.close()
+    if not resposta.get('valida'):
+        raise ValueError(f"Servidor rejeitou a gramática: {resposta}")
+    return resposta['chave']
+
+def medir_servidor(texto_entrada, requisicoes=1000, conexoes=4, profundidade=16, tokens=200, repeticoes=3,
+                   sentencas=50, **opcoes):
+    #sobe `gramatica.py --servidor` num socket temporário e mede requisições de análise (só a primeira leva a gramática,
+    #as demais usam a chave); compara com o custo de uma chamada avulsa da CLI analisando a mesma entrada
+    analisador = AnalisadorSLR(**opcoes)
+    if not analisador.gerar_analisador(texto_entrada):
+        raise ValueError("Gramática do benchmark não gerou tabela")
+    frases = [gerar_sentenca(analisador, tokens, semente) for semente in range(sentencas)]
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        arquivo_gramatica = os.path.join(diretorio, 'gramatica.txt')
+        arquivo_tokens = os.path.join(diretorio, 'tokens.txt')
+        caminho = os.path.join(diretorio, 'servidor.sock')
+        with open(arquivo_gramatica, 'w', encoding='utf-8') as f:
+            f.write(texto_entrada)
+        with open(arquivo_tokens, 'w', encoding='utf-8') as f:
+            f.write(' '.join(frases[0]))
+
+        modo = opcoes.get('modo', 'slr')
+        processo = subprocess.Popen([sys.executable, GRAMATICA_PY, '-f', arquivo_gramatica, '-m', modo, '--servidor', caminho],
+                                    stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            chave = asyncio.run(_chave(caminho, texto_entrada, modo))
+            lote = [{'op': 'analisar', 'chave': chave, 'tokens': frases[i % len(frases)]} for i in range(requisicoes)]
+            latencias, erros, decorrido, estatisticas = asyncio.run(_carga(caminho, lote, conexoes, profundidade))
+        finally:
+            processo.terminate()
+            processo.wait()
+        segundos_cli = _cli(arquivo_gramatica, arquivo_tokens, repeticoes)
+
+    if erros:
+        raise ValueError(f"{erros} requisição(ões) com erro no servidor")
+    return {
+        'requisicoes': requisicoes, 'conexoes': conexoes, 'profundidade': profundidade,
+        'tokens_por_requisicao': sum(len(frase) for frase in frases) / len(frases),
+        'modos': {
+            'servidor': {'segundos': decorrido, 'requisicoes_por_segundo': requisicoes / decorrido,
+                         'latencia_ms': percentis(latencias), 'latencia_servidor_ms': estatisticas['latencias_ms'].get('analisar')},
+            'cli': {'segundos': segundos_cli, 'requisicoes_por_segundo': 1 / segundos_cli},
+        },
+    }
+
+def executar_servidor(geradores, tamanhos, requisicoes=1000, conexoes=4, profundidade=16, tokens=200, repeticoes=3,
+                      progresso=None, **opcoes):
+    #mesmo documento de medicao.executar, com "modos" servidor e cli
+    resultados = []
+    for nome, gerador in geradores.items():
+        for tamanho in tamanhos:
+            medida = medir_servidor(gerador(tamanho), requisicoes, conexoes, profundidade, tokens, repeticoes, **opcoes)
+            resultados.append({'gramatica': nome, 'tamanho': tamanho, **medida})
+            if progresso:
+                progresso(resultados[-1])
+    return {
+        'versao_gerador': VERSAO_GERADOR,
+        'python': sys.version.split()[0],
+        'plataforma': platform.platform(),
+        'data': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'opcoes': {'requisicoes': requisicoes, 'conexoes': conexoes, 'profundidade': profundidade, 'tokens': tokens,
+                   'repeticoes': repeticoes, **opcoes},
+        'resultados': resultados,
+    }
@@ -0,0 +1,117 @@
+import os
+import mmap
+import struct
+import hashlib
+import tempfile
+
+MAGICO = b'SLRC'
+VERSAO_FORMATO = 1
+
+# o que um arquivo truncado ou corrompido levanta ao ser lido ou restaurado: para o cache, é só uma falta
+ERROS_CACHE = (OSError, ValueError, struct.error, TypeError, IndexError, KeyError)
+
+def normalizar_texto(texto_entrada): #mesma filtragem de linhas de analisar_gramatica, com espaços colapsados
+    linhas = []
+    for linha in texto_entrada.split('\n'):
+        linha = ' '.join(linha.split())
+        if linha and not linha.startswith('#'):
+            linhas.append(linha)
+    return '\n'.join(linhas)
+
+def gravar_tabelas(caminho, simbolos, vetores): #grava a tabela de símbolos e os vetores int32 em um único arquivo binário
+    bloco = '\0'.join(simbolos).encode('utf-8')
+    partes = [MAGICO, struct.pack('<III', VERSAO_FORMATO, len(simbolos), len(bloco)), bloco]
+    partes.append(b'\0' * (-len(bloco) % 4))   # vetores começam alinhados em 4 bytes para o cast do memoryview
+    partes.append(struct.pack('<I', len(vetores)))
+    for vetor in vetores:
+        partes.append(struct.pack('<I', len(vetor)))
+        partes.append(struct.pack(f'<{len(vetor)}i', *vetor))
+
+    diretorio = os.path.dirname(caminho) or '.'
+    descritor, temporario = tempfile.mkstemp(dir=diretorio, suffix='.tmp')
+    try:
+        with os.fdopen(descritor, 'wb') as f:
+            f.write(b''.join(partes))
+        os.replace(temporario, caminho)   # escrita atômica: outro processo nunca lê um arquivo pela metade
+    except BaseException:
+        os.unlink(temporario)
+        raise
+
+def ler_tabelas(caminho): #abre o arquivo com mmap; os vetores são memoryviews int32 sobre o mapeamento, sem cópia
+    with open(caminho, 'rb') as f:
+        mapa = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    visao = memoryview(mapa)
+
+    if visao[:4] != MAGICO:
+        raise ValueError(f"Arquivo de cache inválido: {caminho}")
+    versao, num_simbolos, tamanho_bloco = struct.unpack_from('<III', visao, 4)
+    if versao != VERSAO_FORMATO:
+        raise ValueError(f"Versão de cache não suportada: {versao}")
+
+    pos = 16
+    if pos + tamanho_bloco > len(visao):
+        raise ValueError(f"Arquivo de cache truncado: {caminho}")
+    simbolos = str(visao[pos:pos + tamanho_bloco], 'utf-8').split('\0') if num_simbolos else []
+    pos += tamanho_bloco + (-tamanho_bloco % 4)
+
+    num_vetores, = struct.unpack_from('<I', visao, pos)
+    pos += 4
+    vetores = []
+    for _ in range(num_vetores):
+        tamanho, = struct.unpack_from('<I', visao, pos)
+        pos += 4
+        if pos + 4 * tamanho > len(visao):   # a fatia viria curta e o cast falharia com TypeError
+            raise ValueError(f"Arquivo de cache truncado: {caminho}")
+        vetores.append(visao[pos:pos + 4 * tamanho].cast('i'))
+        pos += 4 * tamanho
+    return simbolos, vetores
+
+class CacheTabelas: #Diretório de tabelas geradas, indexadas pelo hash da gramática, com descarte LRU por tamanho total
+    def __init__(self, diretorio, tamanho_maximo=64 * 1024 * 1024):
+        self.diretorio = diretorio
+        self.tamanho_maximo = tamanho_maximo
+        os.makedirs(diretorio, exist_ok=True)
+
+    def chave(self, texto_entrada, versao_gerador, modo):
+        conteudo = f"{versao_gerador}\n{modo}\n{normalizar_texto(texto_entrada)}"
+        return hashlib.sha256(conteudo.encode('utf-8')).hexdigest()
+
+    def _caminho(self, chave):
+        return os.path.join(self.diretorio, f"{chave}.slrc")
+
+    def carregar(self, chave): #(simbolos, vetores) ou None; um acerto atualiza o mtime, que é a ordem do LRU
+        caminho = self._caminho(chave)
+        try:
+            dados = ler_tabelas(caminho)
+        except ERROS_CACHE:
+            return None
+        try:
+            os.utime(caminho)
+        except OSError:
+            pass
+        return dados
+
+    def salvar(self, chave, simbolos, vetores):
+        gravar_tabelas(self._caminho(chave), simbolos, vetores)
+        self.descartar_excesso()
+
+    def descartar_excesso(self): #remove os arquivos usados há mais tempo até o total caber no limite
+        arquivos = []
+        for nome in os.listdir(self.diretorio):
+            if not nome.endswith('.slrc'):
+                continue
+            try:
+                info = os.stat(os.path.join(self.diretorio, nome))
+            except OSError:
+                continue
+            arquivos.append((info.st_mtime, info.st_size, nome))
+
+        total = sum(tamanho for _, tamanho, _ in arquivos)
+        for _, tamanho, nome in sorted(arquivos):
+            if total <= self.tamanho_maximo:
+                break
+            try:
+                os.unlink(os.path.join(self.diretorio, nome))
+            except OSError:
+                continue
+            total -= tamanho
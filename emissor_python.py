@@ -0,0 +1,122 @@
+import sys
+import zlib
+import base64
+from array import array
+
+MODELO = '''# Analisador gerado por gramatica.py --emit-python a partir de {origem}.
+# Módulo independente: não importa gramatica.py nem reconstrói o autômato. Não edite à mão.
+import sys
+import zlib
+import base64
+from array import array
+from itertools import chain
+
+SIMBOLOS = {simbolos!r}
+FIM_ARQUIVO = {fim!r}
+NUM_TERMINAIS = {num_terminais!r}   # SIMBOLOS[:NUM_TERMINAIS] são os terminais, incluindo o fim de arquivo
+PRODUCOES = {producoes!r}
+
+def _vetor(blob):
+    vetor = array('i')
+    vetor.frombytes(zlib.decompress(base64.b85decode(blob)))
+    if sys.byteorder == 'big':
+        vetor.byteswap()
+    return vetor
+
+# células não vazias por estado: [quantidade, símbolo, ação, símbolo, ação, ...]
+# ação: >0 shift/goto, <0 reduce pela produção -ação, 0 aceita
+_CELULAS = _vetor({celulas!r})
+
+LINHAS = [None]
+_pos = 0
+while _pos < len(_CELULAS):
+    _fim = _pos + 1 + 2 * _CELULAS[_pos]
+    LINHAS.append({{SIMBOLOS[s]: a for s, a in zip(_CELULAS[_pos + 1:_fim:2], _CELULAS[_pos + 2:_fim:2])}})
+    _pos = _fim
+del _CELULAS, _pos, _fim
+
+_ESQUERDOS = [esquerdo for esquerdo, direito in PRODUCOES]
+_TAMANHOS = [len(direito) for esquerdo, direito in PRODUCOES]
+_VALIDOS = frozenset(SIMBOLOS[:NUM_TERMINAIS])   # a mesma linha guarda os gotos: não-terminal na entrada não pode chegar nela
+
+class ResultadoAnalise:
+    def __init__(self, aceito, posicao, token, estado, esperados=None):
+        self.aceito = aceito
+        self.posicao = posicao
+        self.token = token
+        self.estado = estado
+        self.esperados = esperados or []
+
+    def __bool__(self):
+        return self.aceito
+
+    def __repr__(self):
+        return f"ResultadoAnalise(aceito={{self.aceito}}, posicao={{self.posicao}}, token={{self.token!r}})"
+
+def analisar(tokens, capacidade_pilha=256):
+    linhas = LINHAS
+    esquerdos = _ESQUERDOS
+    tamanhos = _TAMANHOS
+    pilha = [0] * capacidade_pilha
+    capacidade = capacidade_pilha
+    topo = 0
+    estado = pilha[0] = 1
+
+    validos = _VALIDOS
+    entrada = chain(tokens, (FIM_ARQUIVO,))
+    posicao = 0
+    for token in entrada:
+        if token not in validos:
+            esperados = [t for t in SIMBOLOS[:NUM_TERMINAIS] if t in linhas[estado]]
+            return ResultadoAnalise(False, posicao, token, estado, esperados)
+        while True:
+            acao = linhas[estado].get(token)
+            if acao is None:
+                esperados = [t for t in SIMBOLOS[:NUM_TERMINAIS] if t in linhas[estado]]
+                return ResultadoAnalise(False, posicao, token, estado, esperados)
+            if acao > 0:
+                topo += 1
+                if topo == capacidade:
+                    pilha.extend([0] * capacidade)
+                    capacidade *= 2
+                pilha[topo] = estado = acao
+                break
+            if acao == 0:
+                if next(entrada, None) is not None:   # fim de arquivo no meio da entrada
+                    return ResultadoAnalise(False, posicao, token, estado)
+                return ResultadoAnalise(True, posicao, token, estado)
+            topo -= tamanhos[-acao]
+            estado = linhas[pilha[topo]][esquerdos[-acao]]
+            topo += 1
+            if topo == capacidade:
+                pilha.extend([0] * capacidade)
+                capacidade *= 2
+            pilha[topo] = estado
+        posicao += 1
+
+    return ResultadoAnalise(False, posicao, FIM_ARQUIVO, estado)
+'''
+
+def _blob(valores): #vetor int32 little-endian comprimido e em base85, para virar um literal bytes compacto no módulo gerado
+    vetor = array('i', valores)
+    if sys.byteorder == 'big':
+        vetor.byteswap()
+    return base64.b85encode(zlib.compress(vetor.tobytes(), 9))
+
+def emitir_modulo(caminho, origem, terminais, nao_terminais, fim_arquivo, producoes, linhas):
+    #linhas: lista indexada por estado (posição 0 sem uso) de dicts símbolo -> ação inteira, como em TabelaDecodificada
+    simbolos = list(terminais) + [nt for nt in nao_terminais if nt not in terminais]
+    indice = {sim: i for i, sim in enumerate(simbolos)}
+
+    celulas = []
+    for linha in linhas[1:]:
+        celulas.append(len(linha))
+        for sim, acao in linha.items():
+            celulas += [indice[sim], acao]
+
+    codigo = MODELO.format(origem=origem, simbolos=tuple(simbolos), fim=fim_arquivo, num_terminais=len(terminais),
+                           producoes=tuple((esquerdo, tuple(direito)) for esquerdo, direito in producoes),
+                           celulas=_blob(celulas))
+    with open(caminho, 'w', encoding='utf-8') as f:
+        f.write(codigo)
+    return len(codigo)
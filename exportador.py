@@ -0,0 +1,53 @@
+import csv
+import json
+
+TAMANHO_BUFFER = 1 << 20   # escrita em blocos de 1 MiB: uma chamada de sistema por bloco, não por linha
+
+def formatar_item(producoes, idx_prod, ponto): #mesmo texto de imprimir_estados, sem os colchetes: "E -> E .+ T"
+    esquerdo, direito = producoes[idx_prod]
+    partes = []
+    for i, sim in enumerate(direito):
+        partes.append('.' + sim if i == ponto else sim)
+    if ponto == len(direito):
+        partes.append('.')
+    return f"{esquerdo} -> {' '.join(partes)}"
+
+def _linhas(tabela): #(estado, linha) em ordem de estado; vale para dict de dicts e para TabelaCompacta
+    for estado in sorted(tabela.keys()):
+        yield estado, tabela[estado]
+
+def exportar_jsonl(caminho, gramatica, estados, transicoes, tabela, modo='slr'):
+    #um objeto JSON por linha: o primeiro descreve a gramática, depois um por estado com itens, transições e ações não vazias
+    with open(caminho, 'w', encoding='utf-8', buffering=TAMANHO_BUFFER) as f:
+        cabecalho = {
+            'tipo': 'gramatica',
+            'modo': modo,
+            'terminais': gramatica.terminais,
+            'nao_terminais': gramatica.nao_terminais,
+            'inicial': gramatica.simbolo_inicial,
+            'fim_arquivo': gramatica.fim_arquivo,
+            'producoes': [[esquerdo, direito] for esquerdo, direito in gramatica.producoes],
+        }
+        f.write(json.dumps(cabecalho, ensure_ascii=False))
+        f.write('\n')
+        codificar = json.JSONEncoder(ensure_ascii=False).encode
+        for (estado, linha), I in zip(_linhas(tabela), estados):
+            registro = {
+                'tipo': 'estado',
+                'estado': estado,
+                'itens': sorted(I),
+                'transicoes': transicoes.get(estado, {}),
+                'acoes': {sim: acao for sim, acao in linha.items() if acao},
+            }
+            f.write(codificar(registro))
+            f.write('\n')
+
+def exportar_csv(caminho, gramatica, estados, tabela):
+    #formato largo: uma linha por estado, uma coluna por símbolo e a última coluna com os itens separados por "; "
+    colunas = gramatica.terminais + [gramatica.fim_arquivo] + [nt for nt in gramatica.nao_terminais if nt != "S'"]
+    with open(caminho, 'w', encoding='utf-8', newline='', buffering=TAMANHO_BUFFER) as f:
+        escritor = csv.writer(f)
+        escritor.writerow(['estado'] + colunas + ['itens'])
+        for (estado, linha), I in zip(_linhas(tabela), estados):
+            itens = '; '.join(formatar_item(gramatica.producoes, idx_prod, ponto) for idx_prod, ponto in sorted(I))
+            escritor.writerow([estado] + [linha.get(sim) or '' for sim in colunas] + [itens])
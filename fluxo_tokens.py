@@ -0,0 +1,247 @@
+import os
+import re
+import sys
+import mmap
+import struct
+import shutil
+import tempfile
+from array import array
+from itertools import islice
+
+#Fluxo binário de tokens já classificados (extensão .slrt), little-endian:
+#  'SLRT' | versão, nº de terminais, bytes do bloco de nomes (uint32) | typecode dos IDs, typecode dos deslocamentos
+#  ou '\0' sem deslocamentos, 2 bytes livres | nº de tokens (uint64) | nomes separados por '\0' | IDs | deslocamentos
+#IDs e deslocamentos começam alinhados em 8 bytes, então o leitor os expõe como memoryview sobre o mmap, sem cópia.
+#O ID de cada token indexa a tabela de nomes do próprio arquivo (0 a nº de terminais - 1, conferido na escrita);
+#o deslocamento (uint64) é a posição em bytes no fonte
+
+MAGICO = b'SLRT'
+VERSAO_FORMATO = 1
+CABECALHO = struct.Struct('<IIIcc2xQ')
+INICIO_NOMES = len(MAGICO) + CABECALHO.size
+TOKENS_POR_BLOCO = 1 << 20   # IDs acumulados antes de cada escrita
+
+def _tipo_id(num_terminais): #menor typecode sem sinal que comporta os IDs
+    for tipo in ('B', 'H', 'I'):
+        if num_terminais <= 1 << (array(tipo).itemsize * 8):
+            return tipo
+    raise ValueError(f"{num_terminais} terminais não cabem em IDs de 32 bits")
+
+def _alinhamento(tamanho):
+    return -tamanho % 8
+
+def _gravar_array(arquivo, vetor):
+    if sys.byteorder == 'big':
+        vetor = array(vetor.typecode, vetor)
+        vetor.byteswap()
+    vetor.tofile(arquivo)
+
+class EscritorFluxo: #Grava um fluxo aos poucos, em blocos; o arquivo só aparece no caminho final em fechar()
+    def __init__(self, caminho, terminais, deslocamentos=False):
+        self.caminho = caminho
+        self.terminais = list(terminais)
+        if any('\0' in t for t in self.terminais):
+            raise ValueError("Nomes de terminais não podem conter '\\0'")
+        self.indice = {t: i for i, t in enumerate(self.terminais)}
+        self.tipo_id = _tipo_id(len(self.terminais))
+        self.tipo_deslocamento = 'Q' if deslocamentos else None
+        self.total = 0
+        self.ids = array(self.tipo_id)
+        self.deslocamentos = array('Q')
+
+        diretorio = os.path.dirname(caminho) or '.'
+        descritor, self.temporario = tempfile.mkstemp(dir=diretorio, suffix='.tmp')
+        self.arquivo = os.fdopen(descritor, 'wb')
+        # os deslocamentos vêm depois de todos os IDs: ficam num arquivo à parte até fechar()
+        self.arquivo_deslocamentos = tempfile.TemporaryFile(dir=diretorio) if deslocamentos else None
+        bloco = '\0'.join(self.terminais).encode('utf-8')
+        self.tamanho_nomes = len(bloco)
+        self.arquivo.write(MAGICO + self._cabecalho())
+        self.arquivo.write(bloco + b'\0' * _alinhamento(INICIO_NOMES + len(bloco)))
+
+    def _cabecalho(self):
+        return CABECALHO.pack(VERSAO_FORMATO, len(self.terminais), self.tamanho_nomes, self.tipo_id.encode(),
+                              (self.tipo_deslocamento or '\0').encode(), self.total)
+
+    def escrever_ids(self, ids, deslocamentos=None): #ids: iterável de inteiros (um array do mesmo typecode é copiado direto)
+        inicio = len(self.ids)
+        try:
+            self.ids.extend(ids)
+            if len(self.ids) > inicio and max(self.ids[inicio:]) >= len(self.terminais):
+                raise OverflowError
+        except OverflowError:
+            del self.ids[inicio:]
+            raise ValueError(f"ID de terminal fora da faixa de {len(self.terminais)} terminais")
+        if self.arquivo_deslocamentos is not None:
+            if deslocamentos is None:
+                raise ValueError("Fluxo criado com deslocamentos: informe um deslocamento por token")
+            self.deslocamentos.extend(deslocamentos)
+            if len(self.deslocamentos) != len(self.ids):
+                raise ValueError(f"{len(self.ids) - inicio} tokens e {len(self.deslocamentos) - inicio} deslocamentos no mesmo bloco")
+        if len(self.ids) >= TOKENS_POR_BLOCO:
+            self._descarregar()
+
+    def escrever(self, tokens, deslocamentos=None): #tokens pelo nome do terminal
+        indice = self.indice
+        try:
+            ids = [indice[t] for t in tokens]
+        except KeyError as e:
+            raise ValueError(f"Token '{e.args[0]}' não está na tabela de terminais do fluxo")
+        self.escrever_ids(ids, deslocamentos)
+
+    def _descarregar(self):
+        _gravar_array(self.arquivo, self.ids)
+        self.total += len(self.ids)
+        self.ids = array(self.tipo_id)
+        if self.arquivo_deslocamentos is not None:
+            _gravar_array(self.arquivo_deslocamentos, self.deslocamentos)
+            self.deslocamentos = array('Q')
+
+    def fechar(self): #completa o cabeçalho e move o arquivo para o caminho final (escrita atômica, como o cache)
+        try:
+            self._descarregar()
+            if self.arquivo_deslocamentos is not None:
+                self.arquivo.write(b'\0' * _alinhamento(self.arquivo.tell()))
+                self.arquivo_deslocamentos.seek(0)
+                shutil.copyfileobj(self.arquivo_deslocamentos, self.arquivo, 1 << 20)
+                self.arquivo_deslocamentos.close()
+            self.arquivo.seek(len(MAGICO))
+            self.arquivo.write(self._cabecalho())
+            self.arquivo.close()
+            mascara = os.umask(0)   # mkstemp cria com 0600; o fluxo segue a umask como um open comum
+            os.umask(mascara)
+            os.chmod(self.temporario, 0o666 & ~mascara)
+            os.replace(self.temporario, self.caminho)
+        except BaseException:
+            self.descartar()
+            raise
+        return self.total
+
+    def descartar(self):
+        self.arquivo.close()
+        if self.arquivo_deslocamentos is not None:
+            self.arquivo_deslocamentos.close()
+        try:
+            os.unlink(self.temporario)
+        except FileNotFoundError:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo, valor, rastro):
+        if tipo is None:
+            self.fechar()
+        else:
+            self.descartar()
+
+def gravar_fluxo(caminho, terminais, tokens, deslocamentos=False):
+    #tokens: nomes de terminais, ou pares (nome, deslocamento) com deslocamentos=True; devolve quantos tokens gravou
+    tokens = iter(tokens)
+    with EscritorFluxo(caminho, terminais, deslocamentos) as escritor:
+        while True:
+            bloco = list(islice(tokens, TOKENS_POR_BLOCO))
+            if not bloco:
+                break
+            if deslocamentos:
+                nomes, posicoes = zip(*bloco)
+                escritor.escrever(nomes, posicoes)
+            else:
+                escritor.escrever(bloco)
+    return escritor.total
+
+_NAO_ESPACO = re.compile(rb'\S+')
+
+def converter_texto(caminho_texto, caminho_fluxo, terminais, deslocamentos=False, tamanho_bloco=1 << 24):
+    #arquivo de tokens separados por espaço (o formato do -e) -> fluxo binário, lido em blocos: nunca há uma lista
+    #com todos os tokens. Os deslocamentos são posições em bytes no arquivo de texto
+    indice = {t.encode('utf-8'): i for i, t in enumerate(terminais)}
+    with open(caminho_texto, 'rb') as entrada, EscritorFluxo(caminho_fluxo, terminais, deslocamentos) as escritor:
+        resto = b''
+        base = 0   # posição no arquivo do primeiro byte de `resto`
+        while True:
+            bloco = entrada.read(tamanho_bloco)
+            dados = resto + bloco
+            if bloco:
+                corte = max(dados.rfind(b' '), dados.rfind(b'\n'), dados.rfind(b'\t'), dados.rfind(b'\r')) + 1
+                if corte == 0:   # nenhum espaço no bloco: o token continua no próximo
+                    resto = dados
+                    continue
+                dados, resto = dados[:corte], dados[corte:]
+            try:
+                if deslocamentos:
+                    partes = list(_NAO_ESPACO.finditer(dados))
+                    escritor.escrever_ids([indice[m.group()] for m in partes], [base + m.start() for m in partes])
+                else:
+                    escritor.escrever_ids([indice[token] for token in dados.split()])
+            except KeyError as e:
+                posicao = base + next(m.start() for m in _NAO_ESPACO.finditer(dados) if m.group() == e.args[0])
+                raise ValueError(f"Token {e.args[0].decode('utf-8', 'replace')!r} no byte {posicao} não está na tabela de terminais")
+            if not bloco:
+                break
+            base += len(dados)
+    return escritor.total
+
+class FluxoTokens: #Fluxo binário aberto com mmap: ids e deslocamentos são memoryviews sobre o arquivo, sem cópia
+    def __init__(self, caminho):
+        with open(caminho, 'rb') as f:
+            self.mapa = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        visao = memoryview(self.mapa)
+        try:
+            if len(visao) < INICIO_NOMES or visao[:4] != MAGICO:
+                raise ValueError(f"Arquivo de fluxo de tokens inválido: {caminho}")
+            versao, num_terminais, tamanho_nomes, tipo_id, tipo_deslocamento, total = CABECALHO.unpack_from(visao, len(MAGICO))
+            if versao != VERSAO_FORMATO:
+                raise ValueError(f"Versão de fluxo de tokens não suportada: {versao}")
+            tipo_id = tipo_id.decode()
+            tipo_deslocamento = tipo_deslocamento.decode() if tipo_deslocamento != b'\0' else None
+
+            pos = INICIO_NOMES
+            self.terminais = str(visao[pos:pos + tamanho_nomes], 'utf-8').split('\0') if num_terminais else []
+            pos += tamanho_nomes
+            pos += _alinhamento(pos)
+            self.ids, pos = self._vetor(visao, pos, tipo_id, total, caminho)
+            self.deslocamentos = None
+            if tipo_deslocamento is not None:
+                pos += _alinhamento(pos)
+                self.deslocamentos, pos = self._vetor(visao, pos, tipo_deslocamento, total, caminho)
+        except BaseException:
+            for vetor in (getattr(self, 'ids', None), visao):
+                if vetor is not None:
+                    vetor.release()
+            self.mapa.close()
+            raise
+        self.visao = visao
+
+    @staticmethod
+    def _vetor(visao, pos, tipo, total, caminho):
+        fim = pos + total * array(tipo).itemsize
+        if fim > len(visao):
+            raise ValueError(f"Fluxo de tokens truncado: {caminho}")
+        if sys.byteorder == 'big':   # o arquivo é little-endian: aqui não há como evitar a cópia
+            vetor = array(tipo, visao[pos:fim])
+            vetor.byteswap()
+            return memoryview(vetor), fim
+        return visao[pos:fim].cast(tipo), fim
+
+    def __len__(self):
+        return len(self.ids)
+
+    def nomes(self): #os tokens pelo nome, para os drivers que recebem strings (os nomes são os da tabela, sem criar strings)
+        terminais = self.terminais
+        return map(terminais.__getitem__, self.ids)
+
+    def fechar(self):
+        for vetor in (self.ids, self.deslocamentos, self.visao):
+            if vetor is not None:
+                vetor.release()
+        self.mapa.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo, valor, rastro):
+        self.fechar()
+
+def ler_fluxo(caminho):
+    return FluxoTokens(caminho)
@@ -0,0 +1,331 @@
+import math
+from array import array
+from collections import deque
+from itertools import chain
+
+class Floresta: #Floresta de análise compartilhada e empacotada (SPPF) em arrays paralelos
+    #nó n: simbolo[n] cobre os tokens [inicio[n], fim[n]); nos não-terminais, producao[n] e filhos[n] são a primeira
+    #alternativa e empacotadas[n] guarda as demais — só os pontos de ambiguidade pagam por uma lista. Terminais: producao -1
+    def __init__(self, producoes):
+        self.producoes = producoes
+        self.simbolo = []
+        self.inicio = array('i')
+        self.fim = array('i')
+        self.producao = array('i')
+        self.filhos = []
+        self.empacotadas = {}
+        self.raiz = None
+
+    def __len__(self):
+        return len(self.simbolo)
+
+    def _novo(self, simbolo, inicio, fim, producao=-1, filhos=None):
+        self.simbolo.append(simbolo)
+        self.inicio.append(inicio)
+        self.fim.append(fim)
+        self.producao.append(producao)
+        self.filhos.append(filhos)
+        return len(self.simbolo) - 1
+
+    def _empacotar(self, no, producao, filhos): #mais uma alternativa (producao, filhos) para o nó
+        self.empacotadas.setdefault(no, []).append((producao, filhos))
+
+    def alternativas(self, no): #lista de (produção, filhos) do nó; None nos terminais
+        if self.producao[no] < 0:
+            return None
+        return [(self.producao[no], self.filhos[no])] + self.empacotadas.get(no, [])
+
+    def ambiguos(self): #nós com mais de uma alternativa
+        return sorted(self.empacotadas)
+
+    def contar_arvores(self, no=None): #quantidade de árvores distintas representadas a partir de `no` (padrão: raiz)
+        #math.inf quando um nó alcançável volta por um dos próprios descendentes (A =>+ A): todo nó tem ao menos uma árvore
+        #finita, a primeira alternativa, então o ciclo gera infinitas
+        no = self.raiz if no is None else no
+        contagem = {}
+        no_caminho = set()
+        pendentes = [(no, None)]   # (nó, iterador dos filhos ainda não vistos); a pilha é o próprio caminho
+        while pendentes:   # pós-ordem iterativa: florestas profundas não estouram a recursão
+            atual, filhos = pendentes[-1]
+            if filhos is None:
+                alternativas = self.alternativas(atual)
+                if alternativas is None:
+                    contagem[atual] = 1
+                    pendentes.pop()
+                    continue
+                no_caminho.add(atual)
+                filhos = iter([filho for _, filhos_alt in alternativas for filho in filhos_alt])
+                pendentes[-1] = (atual, filhos)
+            for filho in filhos:
+                if filho in no_caminho:
+                    return math.inf
+                if filho not in contagem:
+                    pendentes.append((filho, None))
+                    break
+            else:
+                total = 0
+                for _, filhos_alt in self.alternativas(atual):
+                    produto = 1
+                    for filho in filhos_alt:
+                        produto *= contagem[filho]
+                    total += produto
+                contagem[atual] = total
+                no_caminho.discard(atual)
+                pendentes.pop()
+        return contagem[no]
+
+    def arvore(self, no=None, escolha=0): #uma árvore da floresta como tuplas (símbolo, filhos...); escolha indexa as alternativas
+        #iterativa, como ArvoreSintatica.para_tuplas. Uma alternativa que volta a um nó ainda em expansão (ciclo A =>+ A) é
+        #trocada pela primeira que não volta; sem nenhuma assim, o nó repetido entra só com o símbolo
+        no = self.raiz if no is None else no
+        montados = []
+        em_expansao = set()
+        pendentes = [(no, None)]   # (nó, None) a expandir; (nó, k) fecha o nó com os k últimos montados
+        while pendentes:
+            atual, k = pendentes.pop()
+            if k is not None:
+                filhos = montados[len(montados) - k:]
+                del montados[len(montados) - k:]
+                montados.append((self.simbolo[atual], *filhos))
+                em_expansao.discard(atual)
+                continue
+            alternativas = self.alternativas(atual)
+            if alternativas is None or atual in em_expansao:
+                montados.append(self.simbolo[atual])
+                continue
+            em_expansao.add(atual)
+            candidatas = [alternativas[min(escolha, len(alternativas) - 1)]] + alternativas
+            _, filhos = next((alternativa for alternativa in candidatas if not em_expansao.intersection(alternativa[1])),
+                             candidatas[0])
+            pendentes.append((atual, len(filhos)))
+            pendentes.extend((filho, None) for filho in reversed(filhos))
+        return montados[-1]
+
+class _NoGSS: #nó da pilha estruturada em grafo: estado, nível (posição do token) e arestas (anterior, nó da floresta)
+    __slots__ = ('estado', 'nivel', 'arestas')
+
+    def __init__(self, estado, nivel, arestas):
+        self.estado = estado
+        self.nivel = nivel
+        self.arestas = arestas
+
+def _caminhos(no, tamanho, primeira, exigida): #(nó de destino, filhos da esquerda para a direita) de cada caminho de `tamanho` arestas
+    #primeira: aresta inicial obrigatória (None: qualquer uma); exigida: aresta pela qual o caminho tem de passar (Farshi)
+    resultado = []
+    pendentes = [(no, tamanho, (), exigida is None)]
+    while pendentes:
+        atual, faltam, filhos, passou = pendentes.pop()
+        if faltam == 0:
+            if passou:
+                resultado.append((atual, filhos[::-1]))
+            continue
+        arestas = (primeira,) if atual is no and faltam == tamanho and primeira is not None else atual.arestas
+        for aresta in arestas:
+            anterior, rotulo = aresta
+            pendentes.append((anterior, faltam - 1, filhos + (rotulo,), passou or aresta is exigida))
+    return resultado
+
+def _empilhar(base, estados, rotulos, fins): #materializa a pilha do trecho determinístico como cadeia de nós da GSS sobre `base`
+    if base is None:
+        base = _NoGSS(estados[0], 0, [])
+    v = base
+    for estado, rotulo in zip(estados[1:], rotulos[1:]):   # o nível de cada nó é o fim do rótulo da aresta que chega nele
+        v = _NoGSS(estado, fins[rotulo], [(v, rotulo)])
+    return v
+
+def analisar_glr(linhas, multiplas, esquerdos, tamanhos, terminais, producoes, tokens):
+    #linhas: tabela decodificada sem as células em conflito; multiplas[estado][token]: todas as ações dessas células.
+    #Enquanto a GSS tem um só topo, roda o laço do LR determinístico numa pilha de listas paralelas apoiada no nó `base`;
+    #só numa célula em conflito (ou redução que desce abaixo da base) a pilha vira nós da GSS e entra a fila de reduções.
+    #Devolve (aceito, posição, token, estado, esperados, floresta)
+    fim = terminais[-1]
+    floresta = Floresta(producoes)
+    simbolos, inicios, fins = floresta.simbolo, floresta.inicio, floresta.fim
+    novo_simbolo, novo_inicio, novo_fim = simbolos.append, inicios.append, fins.append
+    nova_producao, novos_filhos = floresta.producao.append, floresta.filhos.append
+    base = None
+    estados, rotulos = [1], [None]   # rotulos[i]: nó da floresta da aresta entre estados[i - 1] e estados[i]
+    topo = None   # dict estado -> nó da GSS enquanto houver mais de um topo
+
+    validos = set(terminais)
+    entrada = chain(tokens, (fim,))
+    posicao = 0
+    for token in entrada:
+        if token not in validos:   # não-terminal na entrada: o goto dele seria tomado como shift
+            ativos = [estados[-1]] if topo is None else list(topo)
+            esperados = [t for t in terminais if any(_acoes(linhas, multiplas, e, t) for e in ativos)]
+            return (False, posicao, token, min(ativos), esperados, floresta)
+        if topo is None:
+            empilhados = None   # estados empilhados por reduções neste nível: repetir um é ciclo (A =>+ A), que só a GSS fecha
+            vazios = None   # símbolo -> nó da floresta vazio deste nível; os não vazios não se repetem numa pilha só
+            while True:
+                estado = estados[-1]
+                acao = linhas[estado].get(token)
+                if acao is None or acao > 0:
+                    break
+                if acao == 0:
+                    if next(entrada, None) is not None:   # fim de arquivo no meio da entrada
+                        return (False, posicao, token, estado, [], floresta)
+                    floresta.raiz = rotulos[-1]
+                    return (True, posicao, token, estado, [], floresta)
+                tamanho = tamanhos[-acao]
+                if tamanho >= len(estados):   # o caminho desce para dentro da GSS
+                    break
+                esquerdo = esquerdos[-acao]
+                destino = linhas[estados[len(estados) - 1 - tamanho]][esquerdo]
+                if empilhados is None:
+                    empilhados = set()
+                elif destino in empilhados:
+                    break
+                empilhados.add(destino)
+                if tamanho == 0:
+                    if vazios is None:
+                        vazios = {}
+                    rotulo = vazios.get(esquerdo)
+                    if rotulo is not None:
+                        if (-acao, ()) not in floresta.alternativas(rotulo):
+                            floresta._empacotar(rotulo, -acao, ())
+                        rotulos.append(rotulo)
+                        estados.append(destino)
+                        continue
+                    vazios[esquerdo] = len(simbolos)
+                    filhos = ()
+                    inicio = posicao
+                else:
+                    corte = len(estados) - tamanho
+                    filhos = tuple(rotulos[corte:])
+                    del estados[corte:], rotulos[corte:]
+                    inicio = inicios[filhos[0]]
+                rotulos.append(len(simbolos))
+                novo_simbolo(esquerdo)
+                novo_inicio(inicio)
+                novo_fim(posicao)
+                nova_producao(-acao)
+                novos_filhos(filhos)
+                estados.append(destino)
+            if acao is not None and acao > 0:
+                rotulos.append(len(simbolos))
+                novo_simbolo(token)
+                novo_inicio(posicao)
+                novo_fim(posicao + 1)
+                nova_producao(-1)
+                novos_filhos(None)
+                estados.append(acao)
+                posicao += 1
+                continue
+            v = _empilhar(base, estados, rotulos, fins)
+            topo = {v.estado: v}
+
+        compartilhados = {}   # (símbolo, início) -> nó da floresta terminado neste nível, inclusive os do trecho determinístico
+        no = len(simbolos) - 1
+        while no >= 0 and fins[no] == posicao and floresta.producao[no] >= 0:
+            compartilhados[simbolos[no], inicios[no]] = no
+            no -= 1
+        _reduzir(topo, token, posicao, linhas, multiplas, esquerdos, tamanhos, floresta, compartilhados)
+
+        if token == fim:
+            for v in topo.values():
+                if 0 in _acoes(linhas, multiplas, v.estado, token):
+                    if next(entrada, None) is not None:   # fim de arquivo no meio da entrada
+                        return (False, posicao, token, v.estado, [], floresta)
+                    floresta.raiz = v.arestas[0][1]
+                    return (True, posicao, token, v.estado, [], floresta)
+
+        proximo = {}
+        terminal = None
+        for v in topo.values():
+            for acao in _acoes(linhas, multiplas, v.estado, token):
+                if acao > 0:
+                    if terminal is None:
+                        terminal = floresta._novo(token, posicao, posicao + 1)
+                    w = proximo.get(acao)
+                    if w is None:
+                        proximo[acao] = _NoGSS(acao, posicao + 1, [(v, terminal)])
+                    else:
+                        w.arestas.append((v, terminal))
+        if not proximo:
+            estado = min(topo)
+            esperados = [t for t in terminais if any(_acoes(linhas, multiplas, v.estado, t) for v in topo.values())]
+            return (False, posicao, token, estado, esperados, floresta)
+        if len(proximo) == 1:   # voltou a um só topo: ele vira a base de um novo trecho determinístico
+            (base,) = proximo.values()
+            estados, rotulos = [base.estado], [None]
+            topo = None
+        else:
+            topo = proximo
+        posicao += 1
+
+    return (False, posicao, fim, estados[-1] if topo is None else min(topo), [], floresta)
+
+def _acoes(linhas, multiplas, estado, token): #todas as ações da célula, em conflito ou não
+    conflito = multiplas.get(estado)
+    if conflito is not None and token in conflito:
+        return conflito[token]
+    acao = linhas[estado].get(token)
+    return [] if acao is None else [acao]
+
+def _reduzir(topo, token, posicao, linhas, multiplas, esquerdos, tamanhos, floresta, compartilhados):
+    #fase de reduções de um nível: cada aresta nova dispara as reduções do seu nó de origem que começam por ela;
+    #quando a aresta chega a um nó já existente, os caminhos de outros nós que passam por ela são refeitos (correção de Farshi)
+    fila = deque()
+    vazias_no_nivel = False
+    arestas = {(w, u): rotulo for w in topo.values() for u, rotulo in w.arestas}   # (destino, origem) -> rótulo
+    # (rótulo, alternativa) já empacotados: os nós da floresta deste nível só ganham alternativas aqui e no trecho determinístico
+    empacotadas = {(rotulo, alternativa) for rotulo in compartilhados.values() for alternativa in floresta.alternativas(rotulo)}
+
+    def agendar(v, aresta, so_longas):
+        for acao in _acoes(linhas, multiplas, v.estado, token):
+            if acao < 0:
+                if tamanhos[-acao] == 0:
+                    if not so_longas:
+                        fila.append((v, -acao, None, None))
+                elif aresta is None:
+                    for existente in v.arestas:
+                        fila.append((v, -acao, existente, None))
+                else:
+                    fila.append((v, -acao, aresta, None))
+
+    for v in list(topo.values()):
+        agendar(v, None, False)
+
+    while fila:
+        v, producao, primeira, exigida = fila.popleft()
+        for u, filhos in _caminhos(v, tamanhos[producao], primeira, exigida):
+            esquerdo = esquerdos[producao]
+            alternativa = (producao, filhos)
+            estado = linhas[u.estado][esquerdo]
+            w = topo.get(estado)
+            if w is not None:
+                rotulo = arestas.get((w, u))
+                if rotulo is not None:   # aresta já existe: só empacota a alternativa no nó da floresta dela
+                    if (rotulo, alternativa) not in empacotadas:
+                        empacotadas.add((rotulo, alternativa))
+                        floresta._empacotar(rotulo, producao, filhos)
+                    continue
+
+            chave = (esquerdo, u.nivel)
+            rotulo = compartilhados.get(chave)
+            if rotulo is None:
+                rotulo = compartilhados[chave] = floresta._novo(esquerdo, u.nivel, posicao, producao, filhos)
+                empacotadas.add((rotulo, alternativa))
+            elif (rotulo, alternativa) not in empacotadas:
+                empacotadas.add((rotulo, alternativa))
+                floresta._empacotar(rotulo, producao, filhos)
+
+            aresta = (u, rotulo)
+            vazias_no_nivel = vazias_no_nivel or u.nivel == posicao
+            if w is None:
+                w = topo[estado] = _NoGSS(estado, posicao, [aresta])
+                arestas[w, u] = rotulo
+                agendar(w, aresta, False)
+                continue
+            w.arestas.append(aresta)
+            arestas[w, u] = rotulo
+            agendar(w, aresta, True)
+            if vazias_no_nivel:   # só há caminhos de outro topo passando por w se houver arestas dentro do nível
+                for outro in list(topo.values()):
+                    if outro is w:
+                        continue
+                    for acao in _acoes(linhas, multiplas, outro.estado, token):
+                        if acao < 0 and tamanhos[-acao] >= 2:
+                            fila.append((outro, -acao, None, aresta))
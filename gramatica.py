@@ -1,15 +1,45 @@
+import os
 import re
 import sys
 import argparse
+import time
+import json
+import heapq
+import hashlib
+import math
 from collections import defaultdict, deque
+from itertools import chain
+from array import array
+from cache_tabelas import CacheTabelas, ERROS_CACHE, gravar_tabelas, ler_tabelas
+from emissor_python import emitir_modulo
+from lote import empacotar_tabela, analisar_arquivos
+from analisador_lexico import AnalisadorLexico, ler_definicoes
+from fluxo_tokens import FluxoTokens, ler_fluxo, gravar_fluxo, converter_texto
+from leitor_gramatica import ler_gramatica, ler_precedencia, separar_prec, montar_precedencia, erros_precedencia
+from exportador import formatar_item, exportar_jsonl, exportar_csv
+from otimizador import otimizar_tabela
+from perfil import PerfilAnalise, analisar_perfilado
+from reducao_gramatica import reduzir, formatar_relatorio
+from automato_preguicoso import AutomatoPreguicoso, LinhaPendente
+from glr import analisar_glr
+from servidor import ServidorAnalise, servir
+
+try:
+    import resource
+except ImportError:   # Windows: sem pico de RSS nas estatísticas
+    resource = None
+
+VERSAO_GERADOR = 1   # entra na chave do cache: mude sempre que a construção das tabelas mudar
 
 class Gramatica:
-    def __init__(self, terminais, nao_terminais, simbolo_inicial, fim_arquivo, producoes): #Ficha da Gramatica esta guardando um valor dentro do objeto
+    def __init__(self, terminais, nao_terminais, simbolo_inicial, fim_arquivo, producoes, precedencia=None, prec_producoes=None): #Ficha da Gramatica esta guardando um valor dentro do objeto
         self.terminais = terminais
         self.nao_terminais = nao_terminais
         self.simbolo_inicial = simbolo_inicial
         self.fim_arquivo = fim_arquivo
         self.producoes = producoes
+        self.precedencia = precedencia or {}   # símbolo -> (nível, 'left'/'right'/'nonassoc'), das linhas %left/%right/%nonassoc
+        self.prec_producoes = prec_producoes or {}   # índice da produção -> símbolo dado por %prec
         
         self.prod_por_esquerdo = defaultdict(list)
         for idx, (esquerdo, direito) in enumerate(producoes): # Dizendo o termo que está a direita e qual a esquerda
@@ -40,17 +70,688 @@ class Gramatica:
         intersecao = set(self.terminais) & set(self.nao_terminais)
         if intersecao:
             erros.append(f"Símbolos aparecem tanto como terminais quanto não-terminais: {intersecao}")
+        erros.extend(erros_precedencia(self.precedencia, self.prec_producoes, self.producoes, set(self.nao_terminais)))
         
         return erros
 
+    def precedencia_producao(self, idx): #(nível, associatividade) da produção: a do %prec ou a do último terminal do lado direito, como no yacc
+        simbolo = self.prec_producoes.get(idx)
+        if simbolo is None:
+            terminais = set(self.terminais)
+            for sim in reversed(self.producoes[idx][1]):
+                if sim in terminais:
+                    simbolo = sim
+                    break
+        return self.precedencia.get(simbolo)
+
+def _decodificar_acao(acao): #'s3'/'g3' -> 3, 'r1' -> -1, 'a' -> 0
+    tipo = acao[0]
+    if tipo == 's' or tipo == 'g':   # shift e goto nunca dividem a mesma chave, pois terminais e não-terminais são disjuntos
+        return int(acao[1:])
+    if tipo == 'r':
+        return -int(acao[1:])
+    return 0
+
+class TabelaDecodificada: #Tabela SLR já convertida para inteiros, usada pelo driver em tempo de execução
+    def __init__(self, linhas, esquerdos, tamanhos, terminais, padroes=None):
+        self.linhas = linhas          # linhas[estado][simbolo]: >0 shift/goto, <0 reduce pela produção -acao, 0 aceita
+        self.esquerdos = esquerdos    # lado esquerdo de cada produção
+        self.tamanhos = tamanhos      # quantidade de símbolos do lado direito de cada produção
+        self.terminais = terminais    # terminais + fim de arquivo, para listar os esperados em caso de erro
+        self.validos = frozenset(terminais)   # o que pode vir na entrada: a mesma linha guarda os gotos dos não-terminais
+        self.padroes = padroes        # redução feita sem olhar o token em cada estado; None sem otimizar_tabela
+        self.sem_padroes = [None] * len(linhas)   # o que os drivers usam no lugar de padroes=None; cresce junto com linhas no modo preguiçoso
+        self.por_terminais = {}       # linhas_por_id já montadas, por tabela de terminais do fluxo
+
+    def linhas_por_id(self, terminais, fim, nao_terminais):
+        #(acoes, gotos, esquerdo): acoes[estado] é uma lista indexada pelo ID do fluxo, com o fim de arquivo no ID
+        #len(terminais); gotos[estado] é indexada pelo não-terminal e esquerdo[p] é o índice do lado esquerdo da produção p.
+        #Ficam separadas para que um ID inválido dê IndexError em vez de cair num goto
+        chave = (tuple(terminais), fim)
+        montadas = self.por_terminais.get(chave)
+        if montadas is None:
+            validos = set(self.terminais)   # nome de não-terminal no fluxo também não é terminal da tabela
+            colunas = [t if t in validos else None for t in terminais] + [fim]
+            indice_nt = {nt: i for i, nt in enumerate(nao_terminais)}
+            acoes = [None]
+            gotos = [None]
+            for estado in range(1, len(self.linhas)):
+                linha = self.linhas[estado] or {}
+                padrao = self.padroes[estado] if self.padroes else None
+                if padrao is not None:   # redução padrão: toda coluna válida reduz; as outras erram antes, como em _analisar_com_padroes
+                    acoes.append([padrao if t is not None else None for t in colunas])
+                else:
+                    acoes.append([linha.get(t) if t is not None else None for t in colunas])
+                gotos.append([linha.get(nt) for nt in nao_terminais])
+            montadas = self.por_terminais[chave] = (acoes, gotos, [indice_nt[esquerdo] for esquerdo in self.esquerdos])
+        return montadas
+
+def _tipo_array(maximo, minimo=0): #menor typecode de array que comporta os valores
+    for tipo in ('b', 'h', 'i', 'q'):
+        limite = 1 << (array(tipo).itemsize * 8 - 1)
+        if -limite <= minimo and maximo < limite:
+            return tipo
+    raise ValueError(f"Valor {maximo} não cabe em um array de inteiros")
+
+def _deslocar_linhas(linhas, num_estados): #compressão por deslocamento de linhas (comb vector): cada linha é encaixada nos buracos das anteriores
+    base = [0] * (num_estados + 1)
+    valores = []
+    verificacao = []   # estado dono de cada posição; 0 = posição livre
+    primeiro_livre = 0
+
+    for estado in sorted(linhas, key=lambda e: -len(linhas[e])):
+        entradas = linhas[estado]
+        if not entradas:
+            continue
+        menor_coluna = entradas[0][0]
+        deslocamento = primeiro_livre - menor_coluna
+        while True:
+            for coluna, valor in entradas:
+                pos = deslocamento + coluna
+                if pos < len(verificacao) and verificacao[pos]:
+                    break
+            else:
+                break
+            deslocamento += 1
+
+        base[estado] = deslocamento
+        for coluna, valor in entradas:
+            pos = deslocamento + coluna
+            if pos >= len(verificacao):
+                valores.extend([0] * (pos + 1 - len(verificacao)))
+                verificacao.extend([0] * (pos + 1 - len(verificacao)))
+            valores[pos] = valor
+            verificacao[pos] = estado
+        while primeiro_livre < len(verificacao) and verificacao[primeiro_livre]:
+            primeiro_livre += 1
+
+    return (array(_tipo_array(max(base), min(base)), base),
+            array(_tipo_array(max(valores, default=0)), valores),
+            array(_tipo_array(num_estados), verificacao))
+
+class _LinhaCompacta: #Visão de uma linha da TabelaCompacta com a mesma interface de linha de dict ('s3', 'r1', 'g7', 'a' ou None)
+    def __init__(self, tabela, estado):
+        self.tabela = tabela
+        self.estado = estado
+
+    def __getitem__(self, simbolo):
+        if simbolo not in self.tabela.indice_simbolo:
+            raise KeyError(simbolo)
+        return self.tabela.acao_texto(self.estado, simbolo)
+
+    def get(self, simbolo, padrao=None):
+        if simbolo not in self.tabela.indice_simbolo:
+            return padrao
+        return self.tabela.acao_texto(self.estado, simbolo)
+
+    def __contains__(self, simbolo):
+        return simbolo in self.tabela.indice_simbolo
+
+    def __iter__(self):
+        return iter(self.tabela.simbolos)
+
+    def __len__(self):
+        return len(self.tabela.simbolos)
+
+    def keys(self):
+        return list(self.tabela.simbolos)
+
+    def items(self):
+        return [(simbolo, self.tabela.acao_texto(self.estado, simbolo)) for simbolo in self.tabela.simbolos]
+
+    def values(self):
+        return [acao for simbolo, acao in self.items()]
+
+    def __repr__(self):
+        return repr(dict(self.items()))
+
+class TabelaCompacta: #Tabela ACTION/GOTO em arrays de inteiros, com classes de terminais, ação padrão por linha e deslocamento de linhas
+    ERRO, SHIFT, REDUCE, ACEITA = 0, 1, 2, 3   # 2 bits baixos de cada ação empacotada
+
+    def __init__(self, tabela, terminais, nao_terminais):
+        self.terminais = list(terminais)          # inclui o fim de arquivo
+        self.nao_terminais = list(nao_terminais)
+        self.simbolos = self.terminais + self.nao_terminais
+        self.indice_simbolo = {s: i for i, s in enumerate(self.simbolos)}
+        self.num_estados = max(tabela)
+
+        colunas = {}   # terminais com a mesma coluna em todos os estados viram uma única classe
+        classe_terminal = []
+        for t in self.terminais:
+            coluna = tuple(self.codificar(tabela[e][t]) for e in range(1, self.num_estados + 1))
+            classe_terminal.append(colunas.setdefault(coluna, len(colunas)))
+        self.num_classes = len(colunas)
+        self.classe_terminal = array(_tipo_array(self.num_classes), classe_terminal)
+
+        padroes = [0] * (self.num_estados + 1)
+        linhas_acao = {}
+        linhas_goto = {}
+        for estado in range(1, self.num_estados + 1):
+            linha = tabela[estado]
+            por_classe = {}
+            for t, classe in zip(self.terminais, classe_terminal):
+                por_classe[classe] = self.codificar(linha[t])
+            contagem = defaultdict(int)
+            for codigo in por_classe.values():
+                contagem[codigo] += 1
+            padrao = max(contagem, key=lambda c: (contagem[c], c == 0)) if contagem else 0   # empate favorece o erro
+            padroes[estado] = padrao
+            linhas_acao[estado] = sorted((c, v) for c, v in por_classe.items() if v != padrao)
+            linhas_goto[estado] = [(i, int(linha[nt][1:])) for i, nt in enumerate(self.nao_terminais) if linha[nt]]
+
+        self.padrao = array(_tipo_array(max(padroes)), padroes)
+        self.base_acao, self.valores_acao, self.verificacao_acao = _deslocar_linhas(linhas_acao, self.num_estados)
+        self.base_goto, self.valores_goto, self.verificacao_goto = _deslocar_linhas(linhas_goto, self.num_estados)
+
+    @staticmethod
+    def codificar(acao): #'s3' -> 3<<2|1, 'r1' -> 1<<2|2, 'a' -> 3, None -> 0
+        if not acao:
+            return 0
+        if acao[0] == 's':
+            return int(acao[1:]) << 2 | TabelaCompacta.SHIFT
+        if acao[0] == 'r':
+            return int(acao[1:]) << 2 | TabelaCompacta.REDUCE
+        if acao[0] == 'a':
+            return TabelaCompacta.ACEITA
+        raise ValueError(f"Ação desconhecida na tabela: {acao}")
+
+    def acao(self, estado, id_terminal): #ação empacotada para (estado, índice do terminal)
+        classe = self.classe_terminal[id_terminal]
+        pos = self.base_acao[estado] + classe
+        if 0 <= pos < len(self.verificacao_acao) and self.verificacao_acao[pos] == estado:
+            return self.valores_acao[pos]
+        return self.padrao[estado]
+
+    def desvio(self, estado, id_nao_terminal): #estado destino do goto, ou 0 se não houver
+        pos = self.base_goto[estado] + id_nao_terminal
+        if 0 <= pos < len(self.verificacao_goto) and self.verificacao_goto[pos] == estado:
+            return self.valores_goto[pos]
+        return 0
+
+    def acao_texto(self, estado, simbolo):
+        indice = self.indice_simbolo[simbolo]
+        if indice >= len(self.terminais):
+            destino = self.desvio(estado, indice - len(self.terminais))
+            return f'g{destino}' if destino else None
+        codigo = self.acao(estado, indice)
+        tipo = codigo & 3
+        if tipo == self.SHIFT:
+            return f's{codigo >> 2}'
+        if tipo == self.REDUCE:
+            return f'r{codigo >> 2}'
+        if tipo == self.ACEITA:
+            return 'a'
+        return None
+
+    def __getitem__(self, estado):
+        if not 1 <= estado <= self.num_estados:
+            raise KeyError(estado)
+        return _LinhaCompacta(self, estado)
+
+    def __contains__(self, estado):
+        return isinstance(estado, int) and 1 <= estado <= self.num_estados
+
+    def __iter__(self):
+        return iter(range(1, self.num_estados + 1))
+
+    def __len__(self):
+        return self.num_estados
+
+    def keys(self):
+        return list(self)
+
+    def items(self):
+        return [(estado, self[estado]) for estado in self]
+
+    def bytes_usados(self):
+        arrays = (self.classe_terminal, self.padrao, self.base_acao, self.valores_acao, self.verificacao_acao,
+                  self.base_goto, self.valores_goto, self.verificacao_goto)
+        return sum(len(a) * a.itemsize for a in arrays)
+
+def _bytes_tabela_dict(tabela): #memória ocupada pela tabela em dict de dicts (linhas + strings das ações)
+    vistos = set()
+    total = sys.getsizeof(tabela)
+    for linha in tabela.values():
+        total += sys.getsizeof(linha)
+        for acao in linha.values():
+            if acao is not None and id(acao) not in vistos:
+                vistos.add(id(acao))
+                total += sys.getsizeof(acao)
+    return total
+
+def _digrafo(vizinhos, F): #Algoritmo digraph de DeRemer–Pennello: F[x] |= F[y] para todo y alcançável de x, colapsando ciclos (SCCs)
+    n = len(vizinhos)
+    infinito = n + 1
+    N = [0] * n
+    pilha = []
+
+    for raiz in range(n):
+        if N[raiz]:
+            continue
+        pilha.append(raiz)
+        N[raiz] = len(pilha)
+        caminho = [(raiz, 0, len(pilha))]   # DFS iterativa: (vértice, próximo vizinho, profundidade de entrada)
+
+        while caminho:
+            x, i, d = caminho[-1]
+            if i < len(vizinhos[x]):
+                caminho[-1] = (x, i + 1, d)
+                y = vizinhos[x][i]
+                if N[y] == 0:
+                    pilha.append(y)
+                    N[y] = len(pilha)
+                    caminho.append((y, 0, len(pilha)))
+                    continue
+                if N[y] < N[x]:
+                    N[x] = N[y]
+                F[x] |= F[y]
+                continue
+
+            caminho.pop()
+            if N[x] == d:   # x é raiz de uma SCC: todos os membros ficam com o mesmo conjunto
+                while True:
+                    z = pilha.pop()
+                    N[z] = infinito
+                    F[z] = F[x]
+                    if z == x:
+                        break
+            if caminho:
+                pai = caminho[-1][0]
+                if N[x] < N[pai]:
+                    N[pai] = N[x]
+                F[pai] |= F[x]
+    return F
+
+def _tipo_conflito(acao1, acao2):
+    tipos = {acao1[0], acao2[0]}
+    if tipos == {'r'}:
+        return "reduce/reduce"
+    if 'r' in tipos:
+        return "shift/reduce"
+    return "shift/shift" if tipos == {'s'} else "unknown"
+
+class _CelulasFormatadas(dict): #ação -> célula de imprimir_tabela já formatada
+    def __init__(self, fim):
+        self.fim = fim
+
+    def __missing__(self, acao):
+        texto = self[acao] = f" {acao if acao else '':^3}{self.fim}"
+        return texto
+
+class ConjuntosBitset: #FIRST/FOLLOW com símbolos internados em inteiros e conjuntos guardados como bitsets (int)
+    def __init__(self, gramatica):
+        self.gramatica = gramatica
+
+        nao_terminais = list(gramatica.nao_terminais)
+        for esquerdo, direito in gramatica.producoes:
+            if esquerdo not in nao_terminais:
+                nao_terminais.append(esquerdo)
+        self.nao_terminais = nao_terminais
+        self.indice_nt = {nt: i for i, nt in enumerate(nao_terminais)}
+
+        terminais = list(gramatica.terminais)   # qualquer símbolo do lado direito que não é não-terminal vale como terminal (ex.: '$')
+        vistos = set(terminais)
+        for esquerdo, direito in gramatica.producoes:
+            for sim in direito:
+                if sim not in self.indice_nt and sim not in vistos:
+                    vistos.add(sim)
+                    terminais.append(sim)
+        if gramatica.fim_arquivo not in vistos:
+            terminais.append(gramatica.fim_arquivo)
+        self.terminais = terminais
+        self.bit_terminal = {t: 1 << i for i, t in enumerate(terminais)}
+
+        # produções com o lado direito já convertido: >=0 não-terminal, <0 terminal (~indice)
+        indice_t = {t: i for i, t in enumerate(terminais)}
+        self.producoes = [(self.indice_nt[esquerdo], [self.indice_nt[s] if s in self.indice_nt else ~indice_t[s] for s in direito])
+                          for esquerdo, direito in gramatica.producoes]
+
+        self.anulavel = self._calcular_anulaveis()
+        self.first = self._calcular_first()
+        self.follow = self._calcular_follow()
+
+    def _calcular_anulaveis(self): #worklist linear: cada produção guarda quantos símbolos ainda não são anuláveis
+        n = len(self.nao_terminais)
+        anulavel = [False] * n
+        restantes = []
+        ocorrencias = [[] for _ in range(n)]
+        fila = deque()
+
+        for idx, (esquerdo, direito) in enumerate(self.producoes):
+            if any(s < 0 for s in direito):
+                restantes.append(-1)   # contém terminal: nunca será anulável
+                continue
+            restantes.append(len(direito))
+            for s in direito:
+                ocorrencias[s].append(idx)
+            if not direito and not anulavel[esquerdo]:
+                anulavel[esquerdo] = True
+                fila.append(esquerdo)
+
+        while fila:
+            nt = fila.popleft()
+            for idx in ocorrencias[nt]:
+                restantes[idx] -= 1
+                esquerdo = self.producoes[idx][0]
+                if restantes[idx] == 0 and not anulavel[esquerdo]:
+                    anulavel[esquerdo] = True
+                    fila.append(esquerdo)
+        return anulavel
+
+    def _calcular_first(self): #FIRST(A) = terminais iniciais diretos ∪ FIRST(B) para cada B no prefixo anulável
+        n = len(self.nao_terminais)
+        F = [0] * n
+        vizinhos = [set() for _ in range(n)]
+        for esquerdo, direito in self.producoes:
+            for s in direito:
+                if s < 0:
+                    F[esquerdo] |= 1 << ~s
+                    break
+                vizinhos[esquerdo].add(s)
+                if not self.anulavel[s]:
+                    break
+        return _digrafo([list(v) for v in vizinhos], F)
+
+    def first_sequencia(self, simbolos): #FIRST de uma sequência já internada e se ela é anulável
+        bits = 0
+        for s in simbolos:
+            if s < 0:
+                return bits | (1 << ~s), False
+            bits |= self.first[s]
+            if not self.anulavel[s]:
+                return bits, False
+        return bits, True
+
+    def _calcular_follow(self): #FOLLOW(B) = FIRST do que vem depois de B ∪ FOLLOW(A) quando B termina uma produção de A
+        n = len(self.nao_terminais)
+        F = [0] * n
+        vizinhos = [set() for _ in range(n)]
+        F[self.indice_nt[self.gramatica.simbolo_inicial]] |= self.bit_terminal[self.gramatica.fim_arquivo]
+
+        for esquerdo, direito in self.producoes:
+            sufixo_bits = 0
+            sufixo_anulavel = True
+            for s in reversed(direito):
+                if s < 0:
+                    sufixo_bits = 1 << ~s
+                    sufixo_anulavel = False
+                    continue
+                F[s] |= sufixo_bits
+                if sufixo_anulavel and s != esquerdo:
+                    vizinhos[s].add(esquerdo)
+                if self.anulavel[s]:
+                    sufixo_bits |= self.first[s]
+                else:
+                    sufixo_bits = self.first[s]
+                    sufixo_anulavel = False
+        return _digrafo([list(v) for v in vizinhos], F)
+
+    def bits_para_conjunto(self, bits):
+        conjunto = set()
+        while bits:
+            menor = bits & -bits
+            conjunto.add(self.terminais[menor.bit_length() - 1])
+            bits ^= menor
+        return conjunto
+
+    def conjuntos_first(self): #mesmo formato de calcular_conjuntos_first: não-terminais, depois terminais; '' marca anulável
+        first = {}
+        for i, nt in enumerate(self.nao_terminais):
+            first[nt] = self.bits_para_conjunto(self.first[i])
+            if self.anulavel[i]:
+                first[nt].add('')
+        for t in self.gramatica.terminais:
+            first[t] = {t}
+        return first
+
+    def conjuntos_follow(self):
+        return {nt: self.bits_para_conjunto(self.follow[i]) for i, nt in enumerate(self.nao_terminais)}
+
+class EstadosNucleo: #Estados LR(0) guardados só pelo núcleo (itens inteiros); o fechamento é expandido quando o estado é lido
+    def __init__(self, nucleos, fecho_item, prod_item, pos_item):
+        self.nucleos = nucleos
+        self.fecho_item = fecho_item
+        self.prod_item = prod_item
+        self.pos_item = pos_item
+
+    def itens(self, indice): #itens inteiros do estado fechado
+        itens = set(self.nucleos[indice])
+        for item in self.nucleos[indice]:
+            itens.update(self.fecho_item[item])
+        return itens
+
+    def __getitem__(self, indice):
+        return frozenset((self.prod_item[item], self.pos_item[item]) for item in self.itens(indice))
+
+    def __len__(self):
+        return len(self.nucleos)
+
+    def __iter__(self):
+        for indice in range(len(self.nucleos)):
+            yield self[indice]
+
+class ResultadoAnalise: #Resposta do driver: aceitou ou não, e onde parou
+    def __init__(self, aceito, posicao, token, estado, esperados=None, arvore=None, valor=None):
+        self.aceito = aceito
+        self.posicao = posicao
+        self.token = token
+        self.estado = estado
+        self.esperados = esperados or []
+        self.arvore = arvore   # ArvoreSintatica de analisar_arvore
+        self.valor = valor     # valor da raiz em avaliar
+
+    def __bool__(self):
+        return self.aceito
+
+    def __str__(self):
+        if self.aceito:
+            return f"Entrada aceita ({self.posicao} tokens)"
+        return (f"Erro sintático na posição {self.posicao}: token '{self.token}' inesperado no estado {self.estado}. "
+                f"Esperado: {', '.join(self.esperados) if self.esperados else 'nada'}")
+
+FOLHA, INTERNO = 0, 1
+
+class ArvoreSintatica: #Árvore em arena: três arrays paralelos em vez de um objeto por nó
+    #os nós ficam em pós-ordem; a subárvore do nó n ocupa os índices [inicio[n], n] e os filhos são
+    #subárvores consecutivas dentro desse intervalo. Em folhas, producao guarda a posição do token na entrada
+    def __init__(self, tipo, producao, inicio, producoes):
+        self.tipo = tipo           # array('b'): FOLHA ou INTERNO
+        self.producao = producao   # array('i'): índice em gramatica.producoes, ou posição do token
+        self.inicio = inicio       # array('i'): primeiro nó da subárvore
+        self.producoes = producoes
+
+    def __len__(self):
+        return len(self.tipo)
+
+    @property
+    def raiz(self):
+        return len(self.tipo) - 1
+
+    def filhos(self, no): #da esquerda para a direita; anda de irmão em irmão pelo início de cada subárvore
+        if self.tipo[no] == FOLHA:
+            return []
+        filhos = []
+        atual = no - 1
+        while atual >= self.inicio[no]:
+            filhos.append(atual)
+            atual = self.inicio[atual] - 1
+        filhos.reverse()
+        return filhos
+
+    def simbolo(self, no, tokens): #lado esquerdo da produção, ou o terminal lido naquela posição de `tokens`
+        if self.tipo[no] == FOLHA:
+            return tokens[self.producao[no]]
+        return self.producoes[self.producao[no]][0]
+
+    def folhas(self): #índices das folhas na ordem da entrada
+        tipo = self.tipo
+        return [no for no in range(len(tipo)) if tipo[no] == FOLHA]
+
+    def bytes_usados(self):
+        return sum(a.itemsize * len(a) for a in (self.tipo, self.producao, self.inicio))
+
+    def para_tuplas(self, tokens): #(símbolo, filhos...) aninhado, para depuração e comparação com outras árvores
+        montados = []
+        for no in range(len(self.tipo)):
+            if self.tipo[no] == FOLHA:
+                montados.append(tokens[self.producao[no]])
+                continue
+            k = len(self.producoes[self.producao[no]][1])
+            filhos = montados[len(montados) - k:] if k else []
+            del montados[len(montados) - k:]
+            montados.append((self.producoes[self.producao[no]][0], *filhos))
+        return montados[-1] if montados else None
+
+class AnalisadorIncremental: #Parser push sobre a tabela gerada: os tokens chegam aos poucos e as reduções saem por callback
+    def __init__(self, tabela, fim_arquivo, ao_reduzir=None, ao_completar=None):
+        self.tabela = tabela
+        self.fim = fim_arquivo
+        self.ao_reduzir = ao_reduzir       # ao_reduzir(idx_prod, valores_filhos) -> valor do não-terminal
+        self.ao_completar = ao_completar   # ao_completar(idx_prod, valor): construção que ficou logo acima do estado inicial
+        self.estados = [1]                 # só a pilha de estados/valores fica em memória: cresce com o aninhamento, não com a entrada
+        self.valores = [None]
+        self.posicao = 0
+        self.resultado = None
+        self.validos = tabela.validos - {fim_arquivo}   # o fim de arquivo só chega por finish
+
+    def feed(self, token, valor=None):
+        if token not in self.validos:
+            self._rejeitar(token)
+        self._consumir(token, token if valor is None else valor)
+
+    def feed_many(self, tokens): #mesmo laço de _consumir com as variáveis em locais, para fluxos longos
+        if self.resultado is not None:
+            raise ValueError(f"Análise já terminou: {self.resultado}")
+
+        linhas = self.tabela.linhas
+        esquerdos = self.tabela.esquerdos
+        tamanhos = self.tabela.tamanhos
+        ao_reduzir = self.ao_reduzir
+        ao_completar = self.ao_completar
+        estados = self.estados
+        valores = self.valores
+        estado = estados[-1]
+        validos = self.validos
+        for token in tokens:
+            if token not in validos:
+                self._rejeitar(token)
+            while True:
+                acao = linhas[estado].get(token)
+                if acao is None or acao == 0:   # erro ou fim de arquivo no meio do fluxo: _consumir trata e registra o resultado
+                    self._consumir(token, token)
+                    if self.resultado is not None:
+                        return
+                    estado = estados[-1]
+                    break
+                if acao > 0:
+                    estados.append(acao)
+                    valores.append(token)
+                    estado = acao
+                    self.posicao += 1
+                    break
+                producao = -acao
+                tamanho = tamanhos[producao]
+                valor_nt = ao_reduzir(producao, valores[len(valores) - tamanho:]) if ao_reduzir is not None else None
+                if tamanho:
+                    del estados[-tamanho:]
+                    del valores[-tamanho:]
+                estado = linhas[estados[-1]][esquerdos[producao]]
+                estados.append(estado)
+                valores.append(valor_nt)
+                if ao_completar is not None and len(estados) == 2:
+                    ao_completar(producao, valor_nt)
+
+    def finish(self): #envia o fim de arquivo; devolve o valor do símbolo inicial
+        self._consumir(self.fim, None)
+        return self.valores[1] if len(self.valores) > 1 else None
+
+    def _rejeitar(self, token): #não-terminal ou fim de arquivo vindo por feed: o goto seria tomado como shift, o fim como aceite
+        if self.resultado is not None:
+            raise ValueError(f"Análise já terminou: {self.resultado}")
+        linha = self.tabela.linhas[self.estados[-1]]
+        esperados = [t for t in self.tabela.terminais if t in linha]
+        self.resultado = ResultadoAnalise(False, self.posicao, token, self.estados[-1], esperados)
+        raise ValueError(str(self.resultado))
+
+    def _consumir(self, token, valor):
+        if self.resultado is not None:
+            raise ValueError(f"Análise já terminou: {self.resultado}")
+
+        linhas = self.tabela.linhas
+        estados = self.estados
+        valores = self.valores
+        while True:
+            acao = linhas[estados[-1]].get(token)
+            if acao is None:
+                esperados = [t for t in self.tabela.terminais if t in linhas[estados[-1]]]
+                self.resultado = ResultadoAnalise(False, self.posicao, token, estados[-1], esperados)
+                raise ValueError(str(self.resultado))
+
+            if acao > 0:
+                estados.append(acao)
+                valores.append(valor)
+                self.posicao += 1
+                return
+
+            if acao == 0:
+                self.resultado = ResultadoAnalise(True, self.posicao, token, estados[-1])
+                return
+
+            producao = -acao
+            tamanho = self.tabela.tamanhos[producao]
+            if self.ao_reduzir is not None:
+                valor_nt = self.ao_reduzir(producao, valores[len(valores) - tamanho:])
+            else:
+                valor_nt = None
+            if tamanho:
+                del estados[-tamanho:]
+                del valores[-tamanho:]
+            estados.append(linhas[estados[-1]][self.tabela.esquerdos[producao]])
+            valores.append(valor_nt)
+            if self.ao_completar is not None and len(estados) == 2:
+                self.ao_completar(producao, valor_nt)
+
 class AnalisadorSLR: #sequencia do analisador
-    def __init__(self):
+    def __init__(self, modo='slr', tabela_compacta=False, conjuntos_bitset=False, automato_nucleo=False, cache=None, leitor_linear=False,
+                 estatisticas=False, ao_fase=None, tempo_diagnostico=0.5, glr=False, perfilar=False,
+                 gramatica_reduzida=False, preguicoso=False):
+        if modo not in ('slr', 'lalr'):
+            raise ValueError(f"Modo desconhecido: {modo}. Use 'slr' ou 'lalr'")
+        if preguicoso and (modo != 'slr' or glr):
+            raise ValueError("O modo preguiçoso só constrói tabelas SLR sem GLR: os lookaheads LALR e as células em conflito dependem do autômato inteiro")
+        self.modo = modo
+        self.cache = cache
+        self.carregado_do_cache = False
+        self.tabela_compacta = tabela_compacta
+        self.conjuntos_bitset = conjuntos_bitset
+        self.automato_nucleo = automato_nucleo
+        self.leitor_linear = leitor_linear
+        self.gramatica_reduzida = gramatica_reduzida   # remove símbolos inúteis antes de aumentar_gramatica
+        self.relatorio_reducao = None
+        self.preguicoso = preguicoso   # estados e linhas da tabela construídos quando o driver chega neles
+        self.automato_preguicoso = None
+        self.glr = glr   # conflitos não impedem a geração: as células em disputa ficam para analisar_glr
+        self.medir = estatisticas or ao_fase is not None   # desligado: nenhuma medição além de um if por fase
+        self.ao_fase = ao_fase   # gancho ao_fase(nome, segundos), chamado ao fim de cada fase de gerar_analisador
+        self.estatisticas = None
+        self.iteracoes_ponto_fixo = {}
         self.gramatica = None
         self.conjuntos_first = None
         self.conjuntos_follow = None
         self.estados = None
         self.transicoes = None
         self.tabela = None
+        self.tabela_decodificada = None
+        self.tabela_glr = None
+        self.otimizacao = None   # opções de otimizar_tabela, reaplicadas a cada decodificar_tabela
+        self.relatorio_otimizacao = None
+        self.acoes_conflitantes = {}
+        self.conflitos_resolvidos = {}   # (estado, símbolo) -> (shift, reduce, ação escolhida) decididos por precedência
+        self.tempo_diagnostico = tempo_diagnostico
+        self.regeneracao = None   # resumo da última chamada de regenerar
+        self.perfil = None   # PerfilAnalise de analisar_perfilado
+        if perfilar:   # analisar vira analisar_perfilado só nesta instância: o laço comum não ganha nenhum teste por passo
+            self.analisar = self.analisar_perfilado
         
     def tokenizar_producao(self, direito, terminais): #Transforma o lado direito de uma produção em uma lista de token
         if not direito:
@@ -121,11 +822,16 @@ class AnalisadorSLR: #sequencia do analisador
             raise ValueError(f"Erro no parsing do cabeçalho da gramática: {str(e)}")
             
         prods = []
+        declaracoes = []
+        prec_producoes = {}
         for l in linhas[4:]:
             try:
                 l = l.strip()
                 if not l or l.startswith('#'):
                     continue
+                if l.startswith('%'):   # %left/%right/%nonassoc: cada linha um nível acima da anterior
+                    declaracoes.append(ler_precedencia(l))
+                    continue
                     
                 if '->' not in l:
                     raise ValueError(f"Produção deve conter '->': {l}")
@@ -140,6 +846,9 @@ class AnalisadorSLR: #sequencia do analisador
                 alternativas_direito = direito.split('|') if '|' in direito else [direito] #o código separa cada opção  e processa individualmente! 
                 
                 for alt in alternativas_direito:
+                    alt, simbolo_prec = separar_prec(alt)
+                    if simbolo_prec is not None:
+                        prec_producoes[len(prods)] = simbolo_prec
                     alt = alt.strip()
                     if not alt or alt == 'vazio' or alt == 'epsilon':
                         prods.append((esquerdo, []))
@@ -161,7 +870,7 @@ class AnalisadorSLR: #sequencia do analisador
         if not prods:
             raise ValueError("Gramática deve ter pelo menos uma produção")
                 
-        self.gramatica = Gramatica(term, nao_term, inicial, eof, prods)
+        self.gramatica = Gramatica(term, nao_term, inicial, eof, prods, montar_precedencia(declaracoes), prec_producoes)
         
         erros_validacao = self.gramatica.validar()
         if erros_validacao:
@@ -169,12 +878,31 @@ class AnalisadorSLR: #sequencia do analisador
             raise ValueError(mensagem_erro)
         
         return self.gramatica
+
+    def analisar_gramatica_linear(self, texto_entrada): #Mesmo resultado de analisar_gramatica em uma passada, sem eval e com linha/coluna nos erros
+        self.gramatica = Gramatica(*ler_gramatica(texto_entrada))
+        return self.gramatica
     
+    def reduzir_gramatica(self): #Tira não-terminais improdutivos e inalcançáveis, e as produções que os usam, antes de aumentar_gramatica
+        if not self.gramatica:
+            raise ValueError("Gramática não inicializada. Chame analisar_gramatica primeiro.")
+        g = self.gramatica
+        manter, self.relatorio_reducao = reduzir(g)
+        if len(manter) == len(g.producoes):
+            return self.relatorio_reducao
+        novo_indice = {antigo: novo for novo, antigo in enumerate(manter)}
+        restantes = {g.producoes[idx][0] for idx in manter}
+        self.gramatica = Gramatica(g.terminais, [nt for nt in g.nao_terminais if nt in restantes], g.simbolo_inicial, g.fim_arquivo,
+                                   [g.producoes[idx] for idx in manter], g.precedencia,
+                                   {novo_indice[idx]: sim for idx, sim in g.prec_producoes.items() if idx in novo_indice})
+        return self.relatorio_reducao
+
     def aumentar_gramatica(self):
         if not self.gramatica:
             raise ValueError("Gramática não inicializada. Chame analisar_gramatica primeiro.")
             
         self.gramatica.producoes = [("S'", [self.gramatica.simbolo_inicial, self.gramatica.fim_arquivo])] + self.gramatica.producoes #Adiciona uma nova regra no início: S' -> S $
+        self.gramatica.prec_producoes = {idx + 1: simbolo for idx, simbolo in self.gramatica.prec_producoes.items()}
         self.gramatica.nao_terminais = ["S'"] + self.gramatica.nao_terminais
         self.gramatica.simbolo_inicial = "S'"
         
@@ -197,8 +925,10 @@ class AnalisadorSLR: #sequencia do analisador
             first[t] = {t}
         
         mudou = True #repete até ter certeza de que descobriu todas as possibilidade
+        iteracoes = 0
         while mudou:
             mudou = False
+            iteracoes += 1
             for esquerdo, direito in self.gramatica.producoes:
                 prev = set(first[esquerdo])
                 
@@ -219,6 +949,7 @@ class AnalisadorSLR: #sequencia do analisador
                 if prev != first[esquerdo]:
                     mudou = True
         
+        self.iteracoes_ponto_fixo['first'] = iteracoes
         self.conjuntos_first = first
         return first
     
@@ -237,8 +968,10 @@ class AnalisadorSLR: #sequencia do analisador
         follow[self.gramatica.simbolo_inicial].add(self.gramatica.fim_arquivo)
         
         mudou = True  # Repete até que nenhum FOLLOW mude (algoritmo de ponto fixo)
+        iteracoes = 0
         while mudou:
             mudou = False
+            iteracoes += 1
             for esquerdo, direito in self.gramatica.producoes:
                 trailer = set(follow[esquerdo])
                 
@@ -255,20 +988,30 @@ class AnalisadorSLR: #sequencia do analisador
                             trailer |= (self.conjuntos_first[sim] - {''})
                         else:
                             if sim in self.conjuntos_first:
-                                trailer = self.conjuntos_first[sim]
+                                trailer = set(self.conjuntos_first[sim])   # cópia: o trailer é alterado com |= logo abaixo
                             else:
                                 trailer = {sim}
                         if prev != follow[sim]:
                             mudou = True
                     else:
                         if sim in self.conjuntos_first:
-                            trailer = self.conjuntos_first[sim]
+                            trailer = set(self.conjuntos_first[sim])
                         else:
                             trailer = {sim}
         
+        self.iteracoes_ponto_fixo['follow'] = iteracoes
         self.conjuntos_follow = follow
         return follow
     
+    def calcular_conjuntos_bitset(self): #FIRST e FOLLOW pelo motor de bitsets; mesmo resultado das duas funções acima
+        if not self.gramatica:
+            raise ValueError("Gramática não inicializada. Chame analisar_gramatica primeiro.")
+
+        motor = ConjuntosBitset(self.gramatica)
+        self.conjuntos_first = motor.conjuntos_first()
+        self.conjuntos_follow = motor.conjuntos_follow()
+        return self.conjuntos_first, self.conjuntos_follow
+
     def fechamento(self, itens):
         if not self.gramatica:
             raise ValueError("Gramática não inicializada.")
@@ -325,23 +1068,7 @@ class AnalisadorSLR: #sequencia do analisador
                 if pos_ponto < len(direito):
                     simbolos.add(direito[pos_ponto])
             
-            lista_simbolos = []
-            if 'x' in simbolos:
-                lista_simbolos.append('x')
-            if '(' in simbolos:
-                lista_simbolos.append('(')
-            if ')' in simbolos:
-                lista_simbolos.append(')')
-            if ',' in simbolos:
-                lista_simbolos.append(',')
-            
-            for sim in sorted(simbolos):
-                if sim in self.gramatica.terminais and sim not in lista_simbolos:
-                    lista_simbolos.append(sim)
-            
-            for sim in sorted(simbolos):
-                if sim in self.gramatica.nao_terminais:
-                    lista_simbolos.append(sim)
+            lista_simbolos = self._ordenar_simbolos(simbolos, self.gramatica.terminais, self.gramatica.nao_terminais)
             
             for X in lista_simbolos:
                 conjunto_ir_para = self.ir_para(I, X)
@@ -359,141 +1086,982 @@ class AnalisadorSLR: #sequencia do analisador
         self.estados = C
         self.transicoes = transicoes
         return C, transicoes
+
+    def _ordenar_simbolos(self, simbolos, terminais, nao_terminais): #ordem em que os estados sucessores são numerados
+        lista_simbolos = []
+        if 'x' in simbolos:
+            lista_simbolos.append('x')
+        if '(' in simbolos:
+            lista_simbolos.append('(')
+        if ')' in simbolos:
+            lista_simbolos.append(')')
+        if ',' in simbolos:
+            lista_simbolos.append(',')
+        
+        for sim in sorted(simbolos):
+            if sim in terminais and sim not in lista_simbolos:
+                lista_simbolos.append(sim)
+        
+        for sim in sorted(simbolos):
+            if sim in nao_terminais:
+                lista_simbolos.append(sim)
+        return lista_simbolos
+
+    def construir_automato_lr0_nucleo(self): #Mesmo autômato de construir_automato_lr0, identificando estados só pelos itens de núcleo
+        if not self.gramatica:
+            raise ValueError("Gramática não inicializada.")
+
+        producoes = self.gramatica.producoes
+        terminais = set(self.gramatica.terminais)
+        nao_terminais = set(self.gramatica.nao_terminais)
+
+        # cada item (produção, ponto) vira um inteiro: inicio_prod[produção] + ponto
+        inicio_prod = []
+        prod_item = []
+        pos_item = []
+        simbolo_item = []
+        for idx, (esquerdo, direito) in enumerate(producoes):
+            inicio_prod.append(len(prod_item))
+            for pos in range(len(direito) + 1):
+                prod_item.append(idx)
+                pos_item.append(pos)
+                simbolo_item.append(direito[pos] if pos < len(direito) else None)
+
+        # contribuição de cada não-terminal para o fechamento, calculada uma única vez
+        fecho_nt = {}
+        for A in nao_terminais:
+            vistos = {A}
+            pendentes = [A]
+            itens = []
+            while pendentes:
+                B = pendentes.pop()
+                for idx, direito in self.gramatica.prod_por_esquerdo.get(B, ()):
+                    itens.append(inicio_prod[idx])
+                    if direito and direito[0] in nao_terminais and direito[0] not in vistos:
+                        vistos.add(direito[0])
+                        pendentes.append(direito[0])
+            fecho_nt[A] = tuple(itens)
+        fecho_item = [fecho_nt[sim] if sim in nao_terminais else () for sim in simbolo_item]
+
+        nucleo_inicial = (inicio_prod[0],)
+        nucleos = [nucleo_inicial]
+        mapa_estado = {nucleo_inicial: 1}
+        transicoes = {1: {}}
+
+        num_estado = 0
+        while num_estado < len(nucleos):   # a lista de núcleos cresce durante o laço, na mesma ordem da fila BFS
+            nucleo = nucleos[num_estado]
+            num_estado += 1
+
+            itens = set(nucleo)
+            for item in nucleo:
+                itens.update(fecho_item[item])
+
+            avancos = defaultdict(list)   # todos os goto do estado em uma única passada pelos itens
+            for item in itens:
+                sim = simbolo_item[item]
+                if sim is not None:
+                    avancos[sim].append(item + 1)
+
+            for X in self._ordenar_simbolos(avancos, terminais, nao_terminais):
+                destino_nucleo = tuple(sorted(avancos[X]))
+                destino = mapa_estado.get(destino_nucleo)
+                if destino is None:
+                    nucleos.append(destino_nucleo)
+                    destino = len(nucleos)
+                    mapa_estado[destino_nucleo] = destino
+                    transicoes[destino] = {}
+                transicoes[num_estado][X] = destino
+
+        self.estados = EstadosNucleo(nucleos, fecho_item, prod_item, pos_item)
+        self.transicoes = transicoes
+        return self.estados, transicoes
     
-    def construir_tabela_slr(self):
-        if not self.estados or not self.transicoes or not self.conjuntos_follow:
+    def preparar_automato_preguicoso(self): #Modo preguiçoso: no lugar do autômato e da tabela, só o estado 1; o resto sai de _materializar_linha
+        if not self.gramatica or not self.conjuntos_follow:
+            raise ValueError("Gramática ou conjuntos FOLLOW não inicializados.")
+        automato = self.automato_preguicoso = AutomatoPreguicoso(self.gramatica, self._ordenar_simbolos)
+        self.estados = EstadosNucleo(automato.nucleos, automato.fecho_item, automato.prod_item, automato.pos_item)   # os já descobertos
+        self.transicoes = automato.transicoes
+        self.tabela = {}   # só as linhas materializadas
+        self.tabela_decodificada = None
+        self.tabela_glr = None
+        self.acoes_conflitantes = {}
+        self.conflitos_resolvidos = {}
+        return automato
+
+    def _materializar_linha(self, num_estado): #linha em strings de um estado que o driver acabou de alcançar; memorizada em self.tabela
+        acao = self.tabela.get(num_estado)
+        if acao is not None:   # já construída, ou carregada por carregar_estados_materializados
+            return acao
+        conflitos = []
+        acao = self._preencher_linha(num_estado, self.automato_preguicoso.expandir(num_estado), None, conflitos.append)
+        if conflitos:   # sem o autômato inteiro, um conflito só aparece quando o driver chega no estado
+            estado, simbolo, tipo_conflito, acao1, acao2 = conflitos[0]
+            raise ValueError(f"Conflito {tipo_conflito} no estado {estado}, símbolo '{simbolo}': {acao1} vs {acao2}. "
+                             f"A gramática não é SLR (gere sem o modo preguiçoso para ver todos os conflitos)")
+        self.tabela[num_estado] = acao
+        return acao
+
+    def _decodificar_preguicosa(self): #TabelaDecodificada com LinhaPendente nos estados ainda não construídos
+        #linhas continua sendo uma lista comum, então o laço dos drivers não muda; ela só cresce quando aparecem estados novos
+        nucleos = self.automato_preguicoso.nucleos
+        linhas = [None]
+        tabela = TabelaDecodificada(linhas, [esquerdo for esquerdo, direito in self.gramatica.producoes],
+                                    [len(direito) for esquerdo, direito in self.gramatica.producoes],
+                                    self.gramatica.terminais + [self.gramatica.fim_arquivo])
+
+        def materializar(num_estado):
+            acao = self._materializar_linha(num_estado)
+            for novo in range(len(linhas), len(nucleos) + 1):
+                linhas.append(LinhaPendente(novo, materializar))
+                tabela.sem_padroes.append(None)
+            linha = linhas[num_estado] = {simbolo: _decodificar_acao(valor) for simbolo, valor in acao.items() if valor}
+            return linha
+
+        for num_estado in range(1, len(nucleos) + 1):
+            linhas.append(LinhaPendente(num_estado, materializar))
+            tabela.sem_padroes.append(None)
+        self.tabela_decodificada = tabela
+        return tabela
+
+    def materializar_tudo(self): #Modo preguiçoso: expande os estados que faltam, para o que precisa da tabela inteira; devolve quantos
+        automato = self.automato_preguicoso
+        if automato is None or automato.completo:
+            return 0
+        antes = len(self.tabela)
+        num_estado = 1
+        while num_estado <= len(automato.nucleos):   # cresce durante o laço, como a fila de construir_automato_lr0_nucleo
+            if num_estado not in self.tabela:
+                self._materializar_linha(num_estado)
+            num_estado += 1
+        automato.completo = True
+        self.tabela_decodificada = None   # a próxima decodificar_tabela monta a lista comum, sem __missing__
+        return len(self.tabela) - antes
+
+    def _impressao_gramatica(self): #identifica a gramática aumentada de um arquivo de estados materializados
+        g = self.gramatica
+        conteudo = repr((VERSAO_GERADOR, g.terminais, g.nao_terminais, g.fim_arquivo, g.producoes))
+        return hashlib.sha256(conteudo.encode('utf-8')).hexdigest()
+
+    def salvar_estados_materializados(self, caminho): #grava os núcleos descobertos e as linhas já materializadas (formato do cache)
+        automato = self.automato_preguicoso
+        if automato is None:
+            raise ValueError("Analisador não foi gerado no modo preguiçoso.")
+        g = self.gramatica
+        simbolos = [self._impressao_gramatica()] + g.terminais + [g.fim_arquivo] + g.nao_terminais
+        indice = {sim: i for i, sim in enumerate(simbolos)}
+        nucleos = []
+        for nucleo in automato.nucleos:
+            nucleos += [len(nucleo)] + list(nucleo)
+        transicoes = []
+        for num_estado, saidas in automato.transicoes.items():
+            transicoes += [num_estado, len(saidas)]
+            for sim, destino in saidas.items():
+                transicoes += [indice[sim], destino]
+        tabela = []
+        for num_estado, acoes in self.tabela.items():
+            celulas = [(indice[sim], acao) for sim, acao in acoes.items() if acao]
+            tabela += [num_estado, len(celulas)]
+            for sim, acao in celulas:
+                tabela += [sim, 3 if acao == 'a' else int(acao[1:]) << 2 | (2 if acao[0] == 'r' else 1)]
+        gravar_tabelas(caminho, simbolos, [nucleos, transicoes, tabela])
+        return len(self.tabela)
+
+    def carregar_estados_materializados(self, caminho): #inverso de salvar_estados_materializados, para a mesma gramática; devolve quantas linhas
+        automato = self.automato_preguicoso
+        if automato is None:
+            raise ValueError("Analisador não foi gerado no modo preguiçoso.")
+        simbolos, (v_nucleos, v_transicoes, v_tabela) = ler_tabelas(caminho)
+        if simbolos[0] != self._impressao_gramatica():
+            raise ValueError(f"Estados materializados de outra gramática: {caminho}")
+        nucleos = []
+        pos = 0
+        while pos < len(v_nucleos):
+            nucleos.append(tuple(v_nucleos[pos + 1:pos + 1 + v_nucleos[pos]]))
+            pos += 1 + v_nucleos[pos]
+        transicoes = {}
+        pos = 0
+        while pos < len(v_transicoes):
+            tamanho = v_transicoes[pos + 1]
+            pares = v_transicoes[pos + 2:pos + 2 + 2 * tamanho]
+            transicoes[v_transicoes[pos]] = {simbolos[sim]: destino for sim, destino in zip(pares[::2], pares[1::2])}
+            pos += 2 + 2 * tamanho
+        automato.restaurar(nucleos, transicoes)
+
+        colunas_goto = set(self.gramatica.nao_terminais)
+        colunas = simbolos[1:]
+        self.tabela = {}
+        pos = 0
+        while pos < len(v_tabela):
+            tamanho = v_tabela[pos + 1]
+            pares = v_tabela[pos + 2:pos + 2 + 2 * tamanho]
+            acao = dict.fromkeys(colunas)
+            for sim, codigo in zip(pares[::2], pares[1::2]):
+                simbolo = simbolos[sim]
+                if codigo == 3:
+                    acao[simbolo] = 'a'
+                elif codigo & 3 == 2:
+                    acao[simbolo] = f'r{codigo >> 2}'
+                else:
+                    acao[simbolo] = f"{'g' if simbolo in colunas_goto else 's'}{codigo >> 2}"
+            self.tabela[v_tabela[pos]] = acao
+            pos += 2 + 2 * tamanho
+        self.tabela_decodificada = None
+        return len(self.tabela)
+
+    def construir_tabela_slr(self, lookaheads=None): #lookaheads: {(estado, produção): terminais}; sem ele, usa FOLLOW (SLR)
+        if not self.estados or not self.transicoes or (lookaheads is None and not self.conjuntos_follow):
             raise ValueError("Autômato ou conjuntos FOLLOW não inicializados.")
             
         tabela = {}
         conflitos = []
+        competidores = {}   # (estado, símbolo) -> todas as ações que disputam a célula, na ordem em que apareceram
+        self.conflitos_resolvidos = {}
+
+        def registrar(conflito):
+            conflitos.append(conflito)
+            estado, simbolo, _, antiga, nova = conflito
+            acoes = competidores.setdefault((estado, simbolo), [antiga])
+            if nova not in acoes:
+                acoes.append(nova)
         
         for idx, I in enumerate(self.estados):
-            num_estado = idx + 1
-            tabela[num_estado] = {}
-            acao = tabela[num_estado]
-            
-            for t in self.gramatica.terminais + [self.gramatica.fim_arquivo]:
-                acao[t] = None
-            for nt in self.gramatica.nao_terminais:
-                acao[nt] = None
-            
-            for (idx_prod, ponto) in I:
-                esquerdo, direito = self.gramatica.producoes[idx_prod]
-                
-                if ponto < len(direito):
-                    sim = direito[ponto]
-                    if num_estado in self.transicoes and sim in self.transicoes[num_estado]:
-                        destino = self.transicoes[num_estado][sim]
-                        if sim in self.gramatica.terminais:
-                            if acao[sim] is not None and acao[sim] != f's{destino}':
-                                tipo_conflito = "shift/reduce" if acao[sim].startswith('r') else "shift/shift"
-                                conflitos.append((num_estado, sim, tipo_conflito, acao[sim], f's{destino}'))
-                            acao[sim] = f's{destino}'
-                        elif sim in self.gramatica.nao_terminais:  #cada ação é determinada por regras específicas baseadas nos itens LR(0)
-                            acao[sim] = f'g{destino}'
-                            
-                else:
-                    if idx_prod == 0:
-                        if acao[self.gramatica.fim_arquivo] is not None and acao[self.gramatica.fim_arquivo] != 'a':
-                            conflitos.append((num_estado, self.gramatica.fim_arquivo, "shift/reduce", acao[self.gramatica.fim_arquivo], 'a'))
-                        acao[self.gramatica.fim_arquivo] = 'a'   #A verificação if/elif garante que: Se é terminal → só pode ser SHIFT Se é não-terminal → só pode ser GOTO
-                    else:
-                        simbolos_follow = self.conjuntos_follow[esquerdo]
-                        for t in simbolos_follow:
-                            if acao[t] is not None and acao[t] != f'r{idx_prod}':
-                                if acao[t].startswith('s'):
-                                    tipo_conflito = "shift/reduce"
-                                elif acao[t].startswith('r'):
-                                    tipo_conflito = "reduce/reduce"
-                                else:
-                                    tipo_conflito = "unknown"
-                                conflitos.append((num_estado, t, tipo_conflito, acao[t], f'r{idx_prod}'))
-                            acao[t] = f'r{idx_prod}'
-            
-            for (idx_prod, ponto) in I:
-                if idx_prod == 0:
-                    esquerdo, direito = self.gramatica.producoes[idx_prod]
-                    if ponto == 1 and len(direito) == 2 and direito[1] == self.gramatica.fim_arquivo:
-                        if acao[self.gramatica.fim_arquivo] is not None and acao[self.gramatica.fim_arquivo] != 'a':
-                            conflitos.append((num_estado, self.gramatica.fim_arquivo, "shift/reduce", acao[self.gramatica.fim_arquivo], 'a'))
-                        acao[self.gramatica.fim_arquivo] = 'a'
-        
-        if 3 in tabela and 'S' in tabela[3]:
-            tabela[3]['S'] = 'g7'
-        
-        if 5 in tabela and ')' in tabela[5]:
-            tabela[5][')'] = 's6'
-            
-        if 6 in tabela:
-            for simbolo in [',', ')']:
-                if simbolo in tabela[6]:
-                    tabela[6][simbolo] = 'r4'
-                    
-        if 7 in tabela:
-            for simbolo in [',', ')', '$']:
-                if simbolo in tabela[7]:
-                    tabela[7][simbolo] = 'r1'
-                    
-        if 9 in tabela:
-            for simbolo in [',', ')']:
-                if simbolo in tabela[9]:
-                    tabela[9][simbolo] = 'r3'
+            tabela[idx + 1] = self._preencher_linha(idx + 1, I, lookaheads, registrar)
         
         self.tabela = tabela
+        self.tabela_decodificada = None
+        self.tabela_glr = None
+        self.acoes_conflitantes = competidores
         return tabela, conflitos
     
-    def verificar_conflitos_slr(self):
+    def _resolver_precedencia(self, num_estado, simbolo, shift, reducao):
+        #shift/reduce decidido como no yacc: vence o nível maior entre o token e a produção; no mesmo nível, left reduz,
+        #right empilha e nonassoc deixa a célula em erro ('e' até o fim da linha). None se algum dos dois não tem precedência
+        prec_token = self.gramatica.precedencia.get(simbolo)
+        prec_producao = self.gramatica.precedencia_producao(int(reducao[1:]))
+        if prec_token is None or prec_producao is None:
+            return None
+        if prec_producao[0] != prec_token[0]:
+            escolhida = reducao if prec_producao[0] > prec_token[0] else shift
+        else:
+            escolhida = {'left': reducao, 'right': shift, 'nonassoc': 'e'}[prec_token[1]]
+        self.conflitos_resolvidos[(num_estado, simbolo)] = (shift, reducao, escolhida)
+        return escolhida
+
+    def _preencher_linha(self, num_estado, I, lookaheads, registrar): #linha da tabela para um estado; conflitos vão para registrar
+        acao = {}
+        
+        for t in self.gramatica.terminais + [self.gramatica.fim_arquivo]:
+            acao[t] = None
+        for nt in self.gramatica.nao_terminais:
+            acao[nt] = None
+        
+        for (idx_prod, ponto) in I:
+            esquerdo, direito = self.gramatica.producoes[idx_prod]
+            
+            if ponto < len(direito):
+                sim = direito[ponto]
+                if num_estado in self.transicoes and sim in self.transicoes[num_estado]:
+                    destino = self.transicoes[num_estado][sim]
+                    if sim in self.gramatica.terminais:
+                        if acao[sim] is not None and acao[sim] != f's{destino}':
+                            if acao[sim] == 'e':   # shift já descartado por %nonassoc
+                                continue
+                            if acao[sim].startswith('r'):
+                                escolhida = self._resolver_precedencia(num_estado, sim, f's{destino}', acao[sim])
+                                if escolhida is not None:
+                                    acao[sim] = escolhida
+                                    continue
+                            tipo_conflito = "shift/reduce" if acao[sim].startswith('r') else "shift/shift"
+                            registrar((num_estado, sim, tipo_conflito, acao[sim], f's{destino}'))
+                        acao[sim] = f's{destino}'
+                    elif sim in self.gramatica.nao_terminais:  #cada ação é determinada por regras específicas baseadas nos itens LR(0)
+                        acao[sim] = f'g{destino}'
+                        
+            else:
+                if idx_prod == 0:
+                    if acao[self.gramatica.fim_arquivo] is not None and acao[self.gramatica.fim_arquivo] != 'a':
+                        registrar((num_estado, self.gramatica.fim_arquivo, "shift/reduce", acao[self.gramatica.fim_arquivo], 'a'))
+                    acao[self.gramatica.fim_arquivo] = 'a'   #A verificação if/elif garante que: Se é terminal → só pode ser SHIFT Se é não-terminal → só pode ser GOTO
+                else:
+                    if lookaheads is None:
+                        simbolos_follow = self.conjuntos_follow[esquerdo]
+                    else:
+                        simbolos_follow = lookaheads.get((num_estado, idx_prod), ())
+                    for t in simbolos_follow:
+                        if acao[t] == 'e':   # célula fechada por %nonassoc: outra redução disputa com a que foi descartada
+                            acao[t] = self.conflitos_resolvidos[(num_estado, t)][1]
+                        if acao[t] is not None and acao[t] != f'r{idx_prod}':
+                            if acao[t].startswith('s'):
+                                escolhida = self._resolver_precedencia(num_estado, t, acao[t], f'r{idx_prod}')
+                                if escolhida is not None:
+                                    acao[t] = escolhida
+                                    continue
+                                tipo_conflito = "shift/reduce"
+                            elif acao[t].startswith('r'):
+                                tipo_conflito = "reduce/reduce"
+                            else:
+                                tipo_conflito = "unknown"
+                            registrar((num_estado, t, tipo_conflito, acao[t], f'r{idx_prod}'))
+                        acao[t] = f'r{idx_prod}'
+        
+        for (idx_prod, ponto) in I:
+            if idx_prod == 0:
+                esquerdo, direito = self.gramatica.producoes[idx_prod]
+                if ponto == 1 and len(direito) == 2 and direito[1] == self.gramatica.fim_arquivo:
+                    if acao[self.gramatica.fim_arquivo] is not None and acao[self.gramatica.fim_arquivo] != 'a':
+                        registrar((num_estado, self.gramatica.fim_arquivo, "shift/reduce", acao[self.gramatica.fim_arquivo], 'a'))
+                    acao[self.gramatica.fim_arquivo] = 'a'
+        for simbolo, valor in acao.items():
+            if valor == 'e':
+                acao[simbolo] = None   # erro explícito de %nonassoc: na tabela final é uma célula vazia
+        return acao
+
+    def calcular_lookaheads_lalr(self): #LA(q, A -> w) pelas relações reads/includes/lookback de DeRemer–Pennello, sem montar itens LR(1)
+        if not self.estados or not self.transicoes:
+            raise ValueError("Autômato não inicializado.")
+
+        gramatica = self.gramatica
+        motor = ConjuntosBitset(gramatica)
+        nao_terminais = set(gramatica.nao_terminais)
+
+        indice_trans = {}   # transições por não-terminal (p, A), numeradas
+        trans = []
+        for p, saidas in self.transicoes.items():
+            for sim, destino in saidas.items():
+                if sim in nao_terminais:
+                    indice_trans[(p, sim)] = len(trans)
+                    trans.append((p, sim, destino))
+
+        # DR(p, A): terminais lidos logo depois de goto(p, A); inclui o fim de arquivo de S' -> S . $
+        lidos_no_estado = {}
+        DR = []
+        for p, A, r in trans:
+            bits = lidos_no_estado.get(r)
+            if bits is None:
+                bits = 0
+                for idx_prod, ponto in self.estados[r - 1]:
+                    direito = gramatica.producoes[idx_prod][1]
+                    if ponto < len(direito) and direito[ponto] not in nao_terminais:
+                        bits |= motor.bit_terminal[direito[ponto]]
+                lidos_no_estado[r] = bits
+            DR.append(bits)
+
+        # (p, A) reads (r, C) quando r = goto(p, A) e C é anulável
+        reads = [[] for _ in trans]
+        for i, (p, A, r) in enumerate(trans):
+            for C in self.transicoes[r]:
+                if C in nao_terminais and motor.anulavel[motor.indice_nt[C]]:
+                    reads[i].append(indice_trans[(r, C)])
+        Read = _digrafo(reads, DR)
+
+        # includes e lookback saem do mesmo percurso de cada produção B -> w a partir de p'
+        includes = [[] for _ in trans]
+        lookback = defaultdict(list)
+        for j, (origem, B, _) in enumerate(trans):
+            for idx_prod, direito in gramatica.prod_por_esquerdo[B]:
+                caminho = [origem]
+                for sim in direito:
+                    proximo = self.transicoes[caminho[-1]].get(sim)
+                    if proximo is None:   # só acontece no '$' de S' -> S $, que não tem redução
+                        break
+                    caminho.append(proximo)
+                else:
+                    lookback[(caminho[-1], idx_prod)].append(j)
+
+                for k in range(len(direito) - 1, -1, -1):
+                    sim = direito[k]
+                    if sim not in nao_terminais:
+                        break
+                    if k + 1 < len(caminho):
+                        includes[indice_trans[(caminho[k], sim)]].append(j)
+                    if not motor.anulavel[motor.indice_nt[sim]]:
+                        break
+        Follow = _digrafo(includes, Read)
+
+        lookaheads = {}
+        for (q, idx_prod), origens in lookback.items():
+            bits = 0
+            for j in origens:
+                bits |= Follow[j]
+            lookaheads[(q, idx_prod)] = motor.bits_para_conjunto(bits)
+        return lookaheads
+
+    def construir_tabela_lalr(self):
+        return self.construir_tabela_slr(self.calcular_lookaheads_lalr())
+
+    def verificar_conflitos_slr(self): #conflitos registrados durante o preenchimento; a célula do dict guarda só a última ação
         if not self.tabela:
             raise ValueError("Tabela de parsing não inicializada.")
-            
+
         conflitos = []
-        
-        for idx_estado, acoes in self.tabela.items():
-            for simbolo, acao in acoes.items():
-                if not acao:
-                    continue
-                
-                if acao.startswith('s'):
-                    for outro_simbolo, outra_acao in acoes.items():
-                        if outra_acao and outra_acao.startswith('r') and outro_simbolo == simbolo:
-                            conflitos.append((idx_estado, simbolo, 'shift/reduce', acao, outra_acao))
-                
-                if acao.startswith('r'):
-                    for outro_simbolo, outra_acao in acoes.items():
-                        if (outra_acao and outra_acao.startswith('r') and 
-                            outro_simbolo == simbolo and outra_acao != acao):
-                            conflitos.append((idx_estado, simbolo, 'reduce/reduce', acao, outra_acao))
-        
+        for (idx_estado, simbolo), acoes in self.acoes_conflitantes.items():
+            for anterior, acao in zip(acoes, acoes[1:]):
+                conflitos.append((idx_estado, simbolo, _tipo_conflito(anterior, acao), anterior, acao))
         return conflitos
-    
-    def imprimir_estados(self):
+
+    def prefixos_viaveis(self, alvos, tempo_limite=None): #menor sequência de símbolos do estado 1 até cada alvo, por BFS em self.transicoes
+        prazo = time.perf_counter() + tempo_limite if tempo_limite is not None else None
+        alvos = set(alvos)
+        restantes = alvos - {1}
+        pai = {1: None}
+        fila = deque([1])
+        visitados = 0
+        while fila and restantes:
+            estado = fila.popleft()
+            visitados += 1
+            if prazo is not None and visitados & 255 == 0 and time.perf_counter() > prazo:
+                break   # alvos ainda não alcançados ficam sem prefixo
+            for simbolo, destino in self.transicoes.get(estado, {}).items():
+                if destino not in pai:
+                    pai[destino] = (estado, simbolo)
+                    fila.append(destino)
+                    restantes.discard(destino)
+
+        prefixos = {}
+        for alvo in alvos:
+            if alvo not in pai:
+                continue
+            caminho = []
+            estado = alvo
+            while pai[estado] is not None:
+                estado, simbolo = pai[estado]
+                caminho.append(simbolo)
+            prefixos[alvo] = caminho[::-1]
+        return prefixos
+
+    def menores_derivacoes(self): #produção que gera a menor cadeia de terminais de cada não-terminal (algoritmo de Knuth, com heap)
+        producoes = self.gramatica.producoes
+        nao_terminais = set(self.gramatica.nao_terminais)
+        faltam = []   # não-terminais do lado direito ainda sem comprimento conhecido
+        usos = defaultdict(list)
+        heap = []
+        for idx, (esquerdo, direito) in enumerate(producoes):
+            pendentes = [sim for sim in direito if sim in nao_terminais]
+            faltam.append(len(pendentes))
+            for sim in pendentes:
+                usos[sim].append(idx)
+            if not pendentes:
+                heap.append((len(direito), idx))
+        heapq.heapify(heap)
+
+        comprimento = {}
+        escolhida = {}
+        while heap:
+            tamanho, idx = heapq.heappop(heap)
+            esquerdo = producoes[idx][0]
+            if esquerdo in comprimento:
+                continue
+            comprimento[esquerdo] = tamanho
+            escolhida[esquerdo] = idx
+            for uso in usos[esquerdo]:
+                faltam[uso] -= 1
+                if faltam[uso] == 0:
+                    direito = producoes[uso][1]
+                    heapq.heappush(heap, (sum(comprimento[sim] if sim in nao_terminais else 1 for sim in direito), uso))
+        return escolhida
+
+    def _expandir(self, simbolos, escolhida, limite=40): #troca cada não-terminal pela sua menor derivação, até `limite` terminais
+        producoes = self.gramatica.producoes
+        saida = []
+        pilha = list(reversed(simbolos))
+        while pilha and len(saida) < limite:
+            sim = pilha.pop()
+            if sim in escolhida:
+                pilha.extend(reversed(producoes[escolhida[sim]][1]))
+            elif sim in self.gramatica.nao_terminais:
+                saida.append(f"<{sim}>")   # não-terminal improdutivo: não deriva nenhuma cadeia de terminais
+            else:
+                saida.append(sim)
+        if pilha:
+            saida.append('...')
+        return saida
+
+    def contraexemplos(self, conflitos, tempo_limite=None): #{estado: (prefixo viável, cadeia de terminais que leva até ele)}
+        tempo_limite = self.tempo_diagnostico if tempo_limite is None else tempo_limite
+        prefixos = self.prefixos_viaveis({estado for estado, *_ in conflitos}, tempo_limite)
+        if not prefixos:
+            return {}
+        escolhida = self.menores_derivacoes()
+        return {estado: (prefixo, self._expandir(prefixo, escolhida)) for estado, prefixo in prefixos.items()}
+
+    def compactar_tabela(self): #Troca a tabela em dict pela TabelaCompacta, mantendo o acesso tabela[estado][simbolo]
+        self.materializar_tudo()
+        if not self.tabela:
+            raise ValueError("Tabela de parsing não inicializada.")
+        if isinstance(self.tabela, TabelaCompacta):
+            return self.tabela
+
+        terminais = self.gramatica.terminais + [self.gramatica.fim_arquivo]
+        compacta = TabelaCompacta(self.tabela, terminais, self.gramatica.nao_terminais)
+        self.bytes_tabela_dict = _bytes_tabela_dict(self.tabela)
+        self.tabela = compacta
+        self.tabela_decodificada = None
+        self.tabela_glr = None
+        return compacta
+
+    def relatorio_memoria(self):
+        if not isinstance(self.tabela, TabelaCompacta):
+            raise ValueError("Tabela compacta não foi gerada. Chame compactar_tabela primeiro.")
+        compacta = self.tabela.bytes_usados()
+        return (f"Tabela em dict: {self.bytes_tabela_dict} bytes | "
+                f"tabela compacta: {compacta} bytes ({compacta / self.bytes_tabela_dict:.1%}) | "
+                f"{len(self.tabela.terminais)} terminais em {self.tabela.num_classes} classes | "
+                f"vetor de ações com {len(self.tabela.valores_acao)} posições")
+
+    def _linhas_decodificadas(self): #linhas[estado][símbolo] em inteiros, a partir da tabela em strings
+        linhas = [None] * (max(self.tabela) + 1)
+        for estado, acoes in self.tabela.items():
+            linha = {}
+            for simbolo, acao in acoes.items():
+                if acao:
+                    linha[simbolo] = _decodificar_acao(acao)
+            linhas[estado] = linha
+        return linhas
+
+    def decodificar_tabela_glr(self): #Tabela do analisar_glr: as células em conflito saem das linhas e vão com todas as ações para multiplas
+        self.materializar_tudo()
+        if not self.tabela:
+            raise ValueError("Tabela de parsing não inicializada.")
+
+        linhas = self._linhas_decodificadas()   # sem otimizar_tabela: a numeração dos estados tem de bater com acoes_conflitantes
+        multiplas = {}
+        for (estado, simbolo), acoes in self.acoes_conflitantes.items():
+            multiplas.setdefault(estado, {})[simbolo] = [_decodificar_acao(acao) for acao in acoes]
+            linhas[estado].pop(simbolo, None)
+
+        esquerdos = [esquerdo for esquerdo, direito in self.gramatica.producoes]
+        tamanhos = [len(direito) for esquerdo, direito in self.gramatica.producoes]
+        terminais = self.gramatica.terminais + [self.gramatica.fim_arquivo]
+        self.tabela_glr = TabelaDecodificada(linhas, esquerdos, tamanhos, terminais)
+        self.tabela_glr.multiplas = multiplas
+        return self.tabela_glr
+
+    def analisar_glr(self, tokens): #Driver GLR: pilha em grafo e floresta compartilhada; aceita gramáticas com conflitos
+        #o resultado traz a Floresta em .arvore; em trechos sem conflito roda o laço LR comum, só acrescentando os nós da floresta
+        if self.tabela_glr is None:
+            self.decodificar_tabela_glr()
+        tabela = self.tabela_glr
+        return ResultadoAnalise(*analisar_glr(tabela.linhas, tabela.multiplas, tabela.esquerdos, tabela.tamanhos,
+                                              tabela.terminais, self.gramatica.producoes, tokens))
+
+    def decodificar_tabela(self): #Converte 's3'/'r1'/'g7'/'a' em inteiros uma única vez, para o driver não reinterpretar strings a cada passo
+        if self.automato_preguicoso is not None and not self.automato_preguicoso.completo:
+            return self._decodificar_preguicosa()
+        if not self.tabela:
+            raise ValueError("Tabela de parsing não inicializada.")
+
+        linhas = self._linhas_decodificadas()
+        esquerdos = [esquerdo for esquerdo, direito in self.gramatica.producoes]
+        tamanhos = [len(direito) for esquerdo, direito in self.gramatica.producoes]
+        terminais = self.gramatica.terminais + [self.gramatica.fim_arquivo]
+
+        padroes = None
+        if self.otimizacao is not None:
+            linhas, padroes, self.relatorio_otimizacao = otimizar_tabela(linhas, self.gramatica.producoes, terminais,
+                                                                         self.gramatica.nao_terminais, **self.otimizacao)
+        self.tabela_decodificada = TabelaDecodificada(linhas, esquerdos, tamanhos, terminais, padroes)
+        return self.tabela_decodificada
+
+    def otimizar_tabela(self, reducoes_padrao=True, unitarias=True, mesclar=True, preservar=()): #Passada de otimização da tabela do driver
+        #reduções padrão nos estados consistentes, desvio das produções unitárias A -> B (menos as de `preservar`, p.ex. as
+        #que têm ação semântica) e fusão de linhas equivalentes. Só a tabela decodificada muda; devolve o relatório
+        self.materializar_tudo()
+        self.otimizacao = {'reducoes_padrao': reducoes_padrao, 'unitarias': unitarias, 'mesclar': mesclar, 'preservar': tuple(preservar)}
+        self.decodificar_tabela()
+        return self.relatorio_otimizacao
+
+    def analisar(self, tokens, capacidade_pilha=256): #Driver shift/reduce: consome a sequência de terminais e diz se ela pertence à linguagem
+        if self.tabela_decodificada is None:
+            self.decodificar_tabela()
+
+        tabela = self.tabela_decodificada
+        if tabela.padroes is not None:
+            return self._analisar_com_padroes(tokens, capacidade_pilha)
+        linhas = tabela.linhas
+        esquerdos = tabela.esquerdos
+        tamanhos = tabela.tamanhos
+        fim = self.gramatica.fim_arquivo
+
+        pilha = [0] * capacidade_pilha   # pilha de estados pré-alocada; topo aponta para o estado atual
+        capacidade = capacidade_pilha
+        topo = 0
+        estado = pilha[0] = 1
+
+        validos = tabela.validos
+        entrada = chain(tokens, (fim,))
+        posicao = 0
+        for token in entrada:
+            if token not in validos:   # não-terminal na entrada: o goto dele seria tomado como shift
+                esperados = [t for t in tabela.terminais if t in linhas[estado]]
+                return ResultadoAnalise(False, posicao, token, estado, esperados)
+            while True:
+                acao = linhas[estado].get(token)
+                if acao is None:
+                    esperados = [t for t in tabela.terminais if t in linhas[estado]]
+                    return ResultadoAnalise(False, posicao, token, estado, esperados)
+
+                if acao > 0:   # shift: empilha e passa para o próximo token
+                    topo += 1
+                    if topo == capacidade:
+                        pilha.extend([0] * capacidade)
+                        capacidade *= 2
+                    pilha[topo] = estado = acao
+                    break
+
+                if acao == 0:
+                    if next(entrada, None) is not None:   # fim de arquivo no meio da entrada: o resto nunca seria lido
+                        return ResultadoAnalise(False, posicao, token, estado)
+                    return ResultadoAnalise(True, posicao, token, estado)
+
+                topo -= tamanhos[-acao]   # reduce: desempilha o lado direito e segue o goto do lado esquerdo
+                estado = linhas[pilha[topo]][esquerdos[-acao]]
+                topo += 1
+                if topo == capacidade:
+                    pilha.extend([0] * capacidade)
+                    capacidade *= 2
+                pilha[topo] = estado
+            posicao += 1
+
+        return ResultadoAnalise(False, posicao, fim, estado)
+
+    def _analisar_com_padroes(self, tokens, capacidade_pilha): #analisar para tabelas otimizadas: estados com redução padrão nem olham o token
+        #laço separado para que a tabela sem otimizar não pague a consulta a padroes em todo passo
+        tabela = self.tabela_decodificada
+        linhas = tabela.linhas
+        esquerdos = tabela.esquerdos
+        tamanhos = tabela.tamanhos
+        padroes = tabela.padroes
+        fim = self.gramatica.fim_arquivo
+
+        pilha = [0] * capacidade_pilha   # pilha de estados pré-alocada; topo aponta para o estado atual
+        capacidade = capacidade_pilha
+        topo = 0
+        estado = pilha[0] = 1
+
+        validos = tabela.validos
+        entrada = chain(tokens, (fim,))
+        posicao = 0
+        for token in entrada:
+            if token not in validos:   # antes das reduções padrão, que rodariam sem olhar o token
+                esperados = [t for t in tabela.terminais if t in linhas[estado]]
+                return ResultadoAnalise(False, posicao, token, estado, esperados)
+            while True:
+                acao = padroes[estado]
+                if acao is None:
+                    acao = linhas[estado].get(token)
+                    if acao is None:
+                        esperados = [t for t in tabela.terminais if t in linhas[estado]]
+                        return ResultadoAnalise(False, posicao, token, estado, esperados)
+
+                if acao > 0:   # shift: empilha e passa para o próximo token
+                    topo += 1
+                    if topo == capacidade:
+                        pilha.extend([0] * capacidade)
+                        capacidade *= 2
+                    pilha[topo] = estado = acao
+                    break
+
+                if acao == 0:
+                    if next(entrada, None) is not None:   # fim de arquivo no meio da entrada
+                        return ResultadoAnalise(False, posicao, token, estado)
+                    return ResultadoAnalise(True, posicao, token, estado)
+
+                topo -= tamanhos[-acao]   # reduce: desempilha o lado direito e segue o goto do lado esquerdo
+                estado = linhas[pilha[topo]][esquerdos[-acao]]
+                topo += 1
+                if topo == capacidade:
+                    pilha.extend([0] * capacidade)
+                    capacidade *= 2
+                pilha[topo] = estado
+            posicao += 1
+
+        return ResultadoAnalise(False, posicao, fim, estado)
+
+    def analisar_arvore(self, tokens, capacidade_pilha=256): #Mesmo driver de analisar, montando a ArvoreSintatica em arena
+        if self.tabela_decodificada is None:
+            self.decodificar_tabela()
+
+        tabela = self.tabela_decodificada
+        linhas = tabela.linhas
+        esquerdos = tabela.esquerdos
+        tamanhos = tabela.tamanhos
+        padroes = tabela.padroes or tabela.sem_padroes
+        fim = self.gramatica.fim_arquivo
+
+        pilha = [0] * capacidade_pilha
+        pilha_no = [0] * capacidade_pilha   # nó da árvore correspondente a cada posição da pilha de estados
+        capacidade = capacidade_pilha
+        topo = 0
+        estado = pilha[0] = 1
+
+        tipo = array('b')
+        producao = array('i')
+        inicio = array('i')
+        novo_tipo, nova_producao, novo_inicio = tipo.append, producao.append, inicio.append
+
+        validos = tabela.validos
+        entrada = chain(tokens, (fim,))
+        posicao = 0
+        no = 0   # próximo índice livre na arena
+        for token in entrada:
+            if token not in validos:   # não-terminal na entrada: viraria folha pelo goto
+                esperados = [t for t in tabela.terminais if t in linhas[estado]]
+                return ResultadoAnalise(False, posicao, token, estado, esperados)
+            while True:
+                acao = padroes[estado]
+                if acao is None:
+                    acao = linhas[estado].get(token)
+                    if acao is None:
+                        esperados = [t for t in tabela.terminais if t in linhas[estado]]
+                        return ResultadoAnalise(False, posicao, token, estado, esperados)
+
+                if acao > 0:
+                    topo += 1
+                    if topo == capacidade:
+                        pilha.extend([0] * capacidade)
+                        pilha_no.extend([0] * capacidade)
+                        capacidade *= 2
+                    pilha[topo] = estado = acao
+                    pilha_no[topo] = no
+                    novo_tipo(FOLHA)
+                    nova_producao(posicao)
+                    novo_inicio(no)
+                    no += 1
+                    break
+
+                if acao == 0:
+                    if next(entrada, None) is not None:   # fim de arquivo no meio da entrada
+                        return ResultadoAnalise(False, posicao, token, estado)
+                    return ResultadoAnalise(True, posicao, token, estado,
+                                            arvore=ArvoreSintatica(tipo, producao, inicio, self.gramatica.producoes))
+
+                k = tamanhos[-acao]
+                comeco = inicio[pilha_no[topo - k + 1]] if k else no   # produção vazia: subárvore só com o próprio nó
+                topo -= k
+                estado = linhas[pilha[topo]][esquerdos[-acao]]
+                topo += 1
+                if topo == capacidade:
+                    pilha.extend([0] * capacidade)
+                    pilha_no.extend([0] * capacidade)
+                    capacidade *= 2
+                pilha[topo] = estado
+                pilha_no[topo] = no
+                novo_tipo(INTERNO)
+                nova_producao(-acao)
+                novo_inicio(comeco)
+                no += 1
+            posicao += 1
+
+        return ResultadoAnalise(False, posicao, fim, estado)
+
+    def avaliar(self, tokens, acoes=None, valores=None, capacidade_pilha=256): #Driver com ações semânticas
+        #acoes: {índice em gramatica.producoes: f(lista de valores dos filhos)}; sem ação, o valor é o do
+        #primeiro filho (None em produção vazia). valores: iterável paralelo a tokens; por padrão, o próprio token
+        if self.tabela_decodificada is None:
+            self.decodificar_tabela()
+
+        tabela = self.tabela_decodificada
+        linhas = tabela.linhas
+        esquerdos = tabela.esquerdos
+        tamanhos = tabela.tamanhos
+        padroes = tabela.padroes or tabela.sem_padroes
+        fim = self.gramatica.fim_arquivo
+        acoes = acoes or {}
+        por_producao = [acoes.get(idx) for idx in range(len(tamanhos))]   # lista indexada: sem dict.get por redução
+        proximo_valor = iter(valores).__next__ if valores is not None else None
+
+        pilha = [0] * capacidade_pilha
+        pilha_valor = [None] * capacidade_pilha
+        capacidade = capacidade_pilha
+        topo = 0
+        estado = pilha[0] = 1
+
+        validos = tabela.validos
+        entrada = chain(tokens, (fim,))
+        posicao = 0
+        for token in entrada:
+            if token not in validos:   # não-terminal na entrada: as ações rodariam sobre uma análise que falha
+                esperados = [t for t in tabela.terminais if t in linhas[estado]]
+                return ResultadoAnalise(False, posicao, token, estado, esperados)
+            while True:
+                acao = padroes[estado]
+                if acao is None:
+                    acao = linhas[estado].get(token)
+                    if acao is None:
+                        esperados = [t for t in tabela.terminais if t in linhas[estado]]
+                        return ResultadoAnalise(False, posicao, token, estado, esperados)
+
+                if acao > 0:
+                    topo += 1
+                    if topo == capacidade:
+                        pilha.extend([0] * capacidade)
+                        pilha_valor.extend([None] * capacidade)
+                        capacidade *= 2
+                    pilha[topo] = estado = acao
+                    pilha_valor[topo] = proximo_valor() if proximo_valor else token
+                    break
+
+                if acao == 0:
+                    if next(entrada, None) is not None:   # fim de arquivo no meio da entrada
+                        return ResultadoAnalise(False, posicao, token, estado)
+                    return ResultadoAnalise(True, posicao, token, estado, valor=pilha_valor[topo])
+
+                k = tamanhos[-acao]
+                funcao = por_producao[-acao]
+                if funcao is not None:
+                    valor = funcao(pilha_valor[topo - k + 1:topo + 1])
+                else:
+                    valor = pilha_valor[topo - k + 1] if k else None
+                topo -= k
+                estado = linhas[pilha[topo]][esquerdos[-acao]]
+                topo += 1
+                if topo == capacidade:
+                    pilha.extend([0] * capacidade)
+                    pilha_valor.extend([None] * capacidade)
+                    capacidade *= 2
+                pilha[topo] = estado
+                pilha_valor[topo] = valor
+            posicao += 1
+
+        return ResultadoAnalise(False, posicao, fim, estado)
+
+    def analisar_ids(self, ids, terminais, capacidade_pilha=256): #analisar sobre IDs inteiros: terminais[id] é o nome do terminal de cada ID
+        #ids pode ser o memoryview de um FluxoTokens: nenhuma string é criada por token, a ação sai de uma lista indexada pelo ID
+        self.materializar_tudo()   # as listas por ID são montadas para todos os estados de uma vez
+        if self.tabela_decodificada is None:
+            self.decodificar_tabela()
+
+        tabela = self.tabela_decodificada
+        fim = self.gramatica.fim_arquivo
+        linhas_id, gotos_id, esquerdos_id = tabela.linhas_por_id(terminais, fim, self.gramatica.nao_terminais)
+        linhas = tabela.linhas
+        tamanhos = tabela.tamanhos
+        id_fim = len(terminais)
+
+        pilha = [0] * capacidade_pilha   # pilha de estados pré-alocada; topo aponta para o estado atual
+        capacidade = capacidade_pilha
+        topo = 0
+        estado = pilha[0] = 1
+
+        entrada = chain(ids, (id_fim,))
+        posicao = 0
+        try:
+            for token in entrada:
+                while True:
+                    acao = linhas_id[estado][token]
+                    if acao is None:
+                        nome = terminais[token] if token < id_fim else fim
+                        esperados = [t for t in tabela.terminais if t in linhas[estado]]
+                        return ResultadoAnalise(False, posicao, nome, estado, esperados)
+
+                    if acao > 0:   # shift: empilha e passa para o próximo token
+                        topo += 1
+                        if topo == capacidade:
+                            pilha.extend([0] * capacidade)
+                            capacidade *= 2
+                        pilha[topo] = estado = acao
+                        break
+
+                    if acao == 0:
+                        if next(entrada, None) is not None:   # ID do fim de arquivo no meio do fluxo
+                            return ResultadoAnalise(False, posicao, fim, estado)
+                        return ResultadoAnalise(True, posicao, fim, estado)
+
+                    topo -= tamanhos[-acao]   # reduce: desempilha o lado direito e segue o goto do lado esquerdo
+                    estado = gotos_id[pilha[topo]][esquerdos_id[-acao]]
+                    topo += 1
+                    if topo == capacidade:
+                        pilha.extend([0] * capacidade)
+                        capacidade *= 2
+                    pilha[topo] = estado
+                posicao += 1
+        except IndexError:   # ID além da tabela de terminais: a própria lista da linha acusa, sem um teste por token
+            raise ValueError(f"ID de terminal {token} na posição {posicao} fora da tabela de {id_fim} terminais")
+
+        return ResultadoAnalise(False, posicao, fim, estado)
+
+    def analisar_fluxo(self, fluxo): #fluxo binário de tokens (caminho ou FluxoTokens aberto), analisado direto do mmap
+        if isinstance(fluxo, FluxoTokens):
+            return self.analisar_ids(fluxo.ids, fluxo.terminais)
+        with ler_fluxo(fluxo) as aberto:
+            return self.analisar_ids(aberto.ids, aberto.terminais)
+
+    def gravar_fluxo(self, caminho, tokens, deslocamentos=False): #grava tokens (ou pares (token, deslocamento)) como fluxo binário com os terminais da gramática
+        if not self.gramatica:
+            raise ValueError("Gramática não inicializada.")
+        return gravar_fluxo(caminho, self.gramatica.terminais, tokens, deslocamentos)
+
+    def iniciar_perfil(self): #PerfilAnalise zerado para a tabela atual, acumulado pelas próximas chamadas de analisar_perfilado
+        self.materializar_tudo()
+        if self.tabela_decodificada is None:
+            self.decodificar_tabela()
+        self.perfil = PerfilAnalise(self.tabela_decodificada, self.otimizacao is not None)
+        return self.perfil
+
+    def analisar_perfilado(self, tokens, capacidade_pilha=256): #analisar contando visitas por estado, reduções por produção,
+        #shifts por terminal e a maior pilha em self.perfil; um laço à parte, para analisar não pagar pelos contadores
+        if self.tabela_decodificada is None:
+            self.decodificar_tabela()
+        if self.perfil is None or self.perfil.tabela is not self.tabela_decodificada:
+            self.iniciar_perfil()   # tabela nova (regenerada ou otimizada): os números antigos não se aplicam a ela
+        return ResultadoAnalise(*analisar_perfilado(tokens, self.gramatica.fim_arquivo, self.perfil, capacidade_pilha))
+
+    def analisar_lote(self, caminhos, processos=None, tamanho_bloco=None): #Analisa muitos arquivos de tokens em paralelo, com a tabela em memória compartilhada
+        self.materializar_tudo()   # os processos não têm como materializar estados na tabela compartilhada
+        if self.tabela_decodificada is None:
+            self.decodificar_tabela()
+
+        tabela = self.tabela_decodificada
+        vetor = empacotar_tabela(tabela.linhas, tabela.terminais, self.gramatica.nao_terminais, tabela.esquerdos, tabela.tamanhos)
+        resultados = analisar_arquivos(caminhos, vetor, tabela.terminais, self.gramatica.nao_terminais, processos, tamanho_bloco)
+        return [ResultadoAnalise(*resultado) for resultado in resultados]
+
+    def criar_lexico(self, definicoes=None, ignorar=(r'\s+',)): #Scanner para os terminais da gramática; definicoes: {terminal: regex}
+        if not self.gramatica:
+            raise ValueError("Gramática não inicializada.")
+        return AnalisadorLexico(self.gramatica.terminais, definicoes, ignorar)
+
+    def analisar_arquivo_fonte(self, caminho, lexico=None): #Texto-fonte cru: scanner sobre mmap alimentando o driver, sem lista de tokens intermediária
+        lexico = lexico or self.criar_lexico()
+        return self.analisar(lexico.tokens_arquivo(caminho))
+
+    def criar_incremental(self, ao_reduzir=None, ao_completar=None): #Parser push (feed/feed_many/finish) sobre a tabela atual
+        if self.tabela_decodificada is None:
+            self.decodificar_tabela()
+        return AnalisadorIncremental(self.tabela_decodificada, self.gramatica.fim_arquivo, ao_reduzir, ao_completar)
+
+    def emitir_python(self, caminho, origem='gramática'): #Gera um módulo Python independente com a tabela e o driver embutidos
+        self.materializar_tudo()
+        if not self.tabela:
+            raise ValueError("Tabela de parsing não inicializada.")
+        if self.tabela_decodificada is None:
+            self.decodificar_tabela()
+
+        g = self.gramatica
+        return emitir_modulo(caminho, origem, g.terminais + [g.fim_arquivo], g.nao_terminais, g.fim_arquivo,
+                             g.producoes, self.tabela_decodificada.linhas)
+
+    def imprimir_estados(self, saida=None): #monta cada estado com join e escreve um bloco por estado
         if not self.estados or not self.gramatica:
             raise ValueError("Autômato ou gramática não inicializados.")
+        saida = saida or sys.stdout
+        producoes = self.gramatica.producoes
             
-        print("Estados do autômato (LR(0) items):")
+        saida.write("Estados do autômato (LR(0) items):\n")
         
-        for idx, I in enumerate(self.estados):
-            num_estado = idx + 1
-            print(f"Estado {num_estado}:")
-            
-            itens_ordenados = sorted(I)
-            for (idx_prod, ponto) in itens_ordenados:
-                esquerdo, direito = self.gramatica.producoes[idx_prod]
-                
-                str_direito = ''
-                for i, sim in enumerate(direito):
-                    if i == ponto:
-                        str_direito += '.'
-                    str_direito += sim + ' '
-                if ponto == len(direito):
-                    str_direito += '.'
-                    
-                print(f"    [{esquerdo} -> {str_direito.strip()}]")
-            print()
+        for num_estado, I in enumerate(self.estados, 1):
+            linhas = [f"Estado {num_estado}:"]
+            for idx_prod, ponto in sorted(I):
+                linhas.append(f"    [{formatar_item(producoes, idx_prod, ponto)}]")
+            linhas.append("\n")
+            saida.write('\n'.join(linhas))
     
-    def imprimir_tabela(self):
+    def imprimir_tabela(self, saida=None):
         if not self.tabela:
             raise ValueError("Tabela de parsing não inicializada.")
+        saida = saida or sys.stdout
         
         ordem_terminais = []
         if '(' in self.gramatica.terminais:
@@ -512,58 +2080,587 @@ class AnalisadorSLR: #sequencia do analisador
         terminais = ordem_terminais
         nao_terminais = [nt for nt in self.gramatica.nao_terminais if nt != "S'"]
         
-        cabecalho = "   |"
-        for t in terminais[:-1]:
-            cabecalho += f"  {t}  "
-        cabecalho += f"  {terminais[-1]}  |"
-        for nt in nao_terminais:
-            cabecalho += f"  {nt}  |"
-        print(cabecalho)
-        
-        print("---|" + "-" * (5 * len(terminais)) + "|" + "-----|" * len(nao_terminais))
+        cabecalho = ["   |"] + [f"  {t}  " for t in terminais[:-1]] + [f"  {terminais[-1]}  |"] + [f"  {nt}  |" for nt in nao_terminais]
+        linhas = [''.join(cabecalho), "---|" + "-" * (5 * len(terminais)) + "|" + "-----|" * len(nao_terminais)]
         
+        celula = _CelulasFormatadas(" ").__getitem__   # cada ação distinta é formatada uma única vez
+        celula_barra = _CelulasFormatadas(" |").__getitem__
         for estado in sorted(self.tabela.keys()):
-            linha = f" {estado} |"
-            for i, t in enumerate(terminais):
-                acao = self.tabela[estado][t]
-                if i == len(terminais) - 1:
-                    linha += f" {acao if acao else '':^3} |"
+            acoes = self.tabela[estado].__getitem__
+            linhas.append(f" {estado} |" + ''.join(map(celula, map(acoes, terminais[:-1]))) + celula_barra(acoes(terminais[-1]))
+                          + ''.join(map(celula_barra, map(acoes, nao_terminais))))
+        saida.write('\n'.join(linhas) + '\n')
+        
+        linhas = ["\noutput_table = {"]
+        linhas += [f"  {idx}: {linha}," for idx, linha in sorted(self.tabela.items())]
+        linhas.append("}\n")
+        saida.write('\n'.join(linhas))
+
+    def exportar(self, caminho, formato=None): #grava estados e tabela em jsonl, csv ou bin (mesmo formato binário do cache); formato pela extensão
+        self.materializar_tudo()
+        if not self.estados or not self.tabela:
+            raise ValueError("Autômato ou tabela não inicializados.")
+        formato = formato or os.path.splitext(caminho)[1].lstrip('.').lower()
+        if formato == 'jsonl':
+            exportar_jsonl(caminho, self.gramatica, self.estados, self.transicoes, self.tabela, self.modo)
+        elif formato == 'csv':
+            exportar_csv(caminho, self.gramatica, self.estados, self.tabela)
+        elif formato in ('bin', 'slrc'):
+            gravar_tabelas(caminho, *self._dados_cache())
+            mascara = os.umask(0)   # gravar_tabelas usa mkstemp (0600); a exportação segue a umask como um open comum
+            os.umask(mascara)
+            os.chmod(caminho, 0o666 & ~mascara)
+        else:
+            raise ValueError(f"Formato de exportação desconhecido: {formato!r}. Use jsonl, csv ou bin")
+        return formato
+
+    def carregar_binario(self, caminho): #lê um arquivo gravado por exportar(..., 'bin') sem reconstruir nada
+        self._restaurar_cache(*ler_tabelas(caminho))
+        if self.tabela_compacta:
+            self.compactar_tabela()
+
+    def _dados_cache(self): #serializa gramática aumentada, autômato, tabela e FIRST/FOLLOW em vetores de inteiros
+        g = self.gramatica
+        terminais = g.terminais + [g.fim_arquivo]
+        simbolos = list(dict.fromkeys(terminais + g.nao_terminais + [''] +
+                                      [sim for _, direito in g.producoes for sim in direito]))
+        indice = {sim: i for i, sim in enumerate(simbolos)}
+
+        producoes = []
+        for esquerdo, direito in g.producoes:
+            producoes += [indice[esquerdo], len(direito)] + [indice[sim] for sim in direito]
+
+        estados = []
+        for I in self.estados:
+            estados.append(len(I))
+            for idx_prod, ponto in sorted(I):
+                estados += [idx_prod, ponto]
+
+        transicoes = []
+        tabela = []
+        for num_estado in range(1, len(self.estados) + 1):
+            saidas = self.transicoes.get(num_estado, {})
+            transicoes.append(len(saidas))
+            for sim, destino in saidas.items():
+                transicoes += [indice[sim], destino]
+            celulas = [(indice[sim], acao) for sim, acao in self.tabela[num_estado].items() if acao]
+            tabela.append(len(celulas))
+            for sim, acao in celulas:
+                tabela += [sim, 3 if acao == 'a' else int(acao[1:]) << 2 | (2 if acao[0] == 'r' else 1)]
+
+        conjuntos = []
+        for dicionario in (self.conjuntos_first or {}, self.conjuntos_follow or {}):
+            vetor = []
+            for sim, conjunto in dicionario.items():
+                vetor += [indice[sim], len(conjunto)] + [indice[t] for t in conjunto]
+            conjuntos.append(vetor)
+
+        vetores = [[indice[g.simbolo_inicial], indice[g.fim_arquivo]],
+                   [indice[t] for t in g.terminais], [indice[nt] for nt in g.nao_terminais],
+                   producoes, estados, transicoes, tabela] + conjuntos
+        return simbolos, vetores
+
+    def _restaurar_cache(self, simbolos, vetores): #inverso de _dados_cache: deixa o analisador como se gerar_analisador tivesse rodado
+        cabecalho, terminais, nao_terminais, v_producoes, v_estados, v_transicoes, v_tabela, v_first, v_follow = vetores
+
+        producoes = []
+        pos = 0
+        while pos < len(v_producoes):
+            tamanho = v_producoes[pos + 1]
+            producoes.append((simbolos[v_producoes[pos]], [simbolos[i] for i in v_producoes[pos + 2:pos + 2 + tamanho]]))
+            pos += 2 + tamanho
+
+        gramatica = Gramatica([simbolos[i] for i in terminais], [simbolos[i] for i in nao_terminais],
+                              simbolos[cabecalho[0]], simbolos[cabecalho[1]], producoes)
+
+        estados = []
+        pos = 0
+        while pos < len(v_estados):
+            tamanho = v_estados[pos]
+            itens = v_estados[pos + 1:pos + 1 + 2 * tamanho]
+            estados.append(frozenset(zip(itens[::2], itens[1::2])))
+            pos += 1 + 2 * tamanho
+
+        ordem_colunas = gramatica.terminais + [gramatica.fim_arquivo] + gramatica.nao_terminais
+        colunas_goto = set(gramatica.nao_terminais)
+        transicoes = {}
+        tabela = {}
+        pos_t = pos_a = 0
+        for num_estado in range(1, len(estados) + 1):
+            tamanho = v_transicoes[pos_t]
+            pares = v_transicoes[pos_t + 1:pos_t + 1 + 2 * tamanho]
+            transicoes[num_estado] = {simbolos[sim]: destino for sim, destino in zip(pares[::2], pares[1::2])}
+            pos_t += 1 + 2 * tamanho
+
+            acao = dict.fromkeys(ordem_colunas)
+            tamanho = v_tabela[pos_a]
+            pares = v_tabela[pos_a + 1:pos_a + 1 + 2 * tamanho]
+            for sim, codigo in zip(pares[::2], pares[1::2]):
+                simbolo = simbolos[sim]
+                if codigo == 3:
+                    acao[simbolo] = 'a'
+                elif codigo & 3 == 2:
+                    acao[simbolo] = f'r{codigo >> 2}'
+                elif simbolo in colunas_goto:
+                    acao[simbolo] = f'g{codigo >> 2}'
                 else:
-                    linha += f" {acao if acao else '':^3} "
-            for nt in nao_terminais:
-                acao = self.tabela[estado][nt]
-                linha += f" {acao if acao else '':^3} |"
-            print(linha)
-        
-        print("\noutput_table = {")
-        for idx, linha in sorted(self.tabela.items()):
-            print(f"  {idx}: {linha},")
-        print("}")
-    
+                    acao[simbolo] = f's{codigo >> 2}'
+            tabela[num_estado] = acao
+            pos_a += 1 + 2 * tamanho
+
+        conjuntos = []
+        for vetor in (v_first, v_follow):
+            dicionario = {}
+            pos = 0
+            while pos < len(vetor):
+                tamanho = vetor[pos + 1]
+                dicionario[simbolos[vetor[pos]]] = {simbolos[i] for i in vetor[pos + 2:pos + 2 + tamanho]}
+                pos += 2 + tamanho
+            conjuntos.append(dicionario)
+
+        self.gramatica = gramatica
+        self.conjuntos_first, self.conjuntos_follow = conjuntos
+        self.estados = estados
+        self.transicoes = transicoes
+        self.tabela = tabela
+        self.tabela_decodificada = None
+        self.tabela_glr = None
+        self.acoes_conflitantes = {}
+        self.conflitos_resolvidos = {}   # o cache guarda a tabela já resolvida, sem o registro das decisões
+
+    def _executar_fase(self, nome, funcao, *args):
+        if not self.medir:
+            return funcao(*args)
+        inicio = time.perf_counter()
+        resultado = funcao(*args)
+        decorrido = time.perf_counter() - inicio
+        self.estatisticas['fases'][nome] = self.estatisticas['fases'].get(nome, 0.0) + decorrido
+        if self.ao_fase is not None:
+            self.ao_fase(nome, decorrido)
+        return resultado
+
+    def _iniciar_estatisticas(self): #contadores de fechamento/ir_para por atributos de instância que envolvem os métodos; removidos no fim
+        chamadas = {'fechamento': 0, 'ir_para': 0}
+        fechamento, ir_para = AnalisadorSLR.fechamento.__get__(self), AnalisadorSLR.ir_para.__get__(self)
+
+        def fechamento_contado(itens):
+            chamadas['fechamento'] += 1
+            return fechamento(itens)
+
+        def ir_para_contado(itens, simbolo):
+            chamadas['ir_para'] += 1
+            return ir_para(itens, simbolo)
+
+        self.fechamento = fechamento_contado
+        self.ir_para = ir_para_contado
+        self.iteracoes_ponto_fixo = {}
+        self.estatisticas = {'fases': {}, 'chamadas': chamadas}
+
+    def _finalizar_estatisticas(self, conflitos):
+        del self.fechamento, self.ir_para
+        e = self.estatisticas
+        e['total_segundos'] = sum(e['fases'].values())
+        e['carregado_do_cache'] = self.carregado_do_cache
+        e['iteracoes_ponto_fixo'] = dict(self.iteracoes_ponto_fixo)
+        e['conflitos'] = len(conflitos)
+        if self.estados is not None:
+            itens = [len(I) for I in self.estados]
+            e['estados'] = len(itens)
+            e['itens_por_estado'] = {'minimo': min(itens), 'media': sum(itens) / len(itens), 'maximo': max(itens), 'total': sum(itens)}
+        if self.tabela is not None:
+            linhas = list(self.tabela.values()) if isinstance(self.tabela, dict) else [self.tabela[estado] for estado in self.tabela]
+            e['celulas_preenchidas'] = sum(1 for linha in linhas for acao in linha.values() if acao is not None)
+            e['celulas_total'] = sum(len(linha) for linha in linhas)
+        e['pico_rss_kb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss if resource else None
+
     def gerar_analisador(self, texto_entrada):
+        conflitos = []
+        if self.medir:
+            self._iniciar_estatisticas()
+        fase = self._executar_fase
         try:
-            self.analisar_gramatica(texto_entrada)
-            self.aumentar_gramatica()
-            self.calcular_conjuntos_first()
-            self.calcular_conjuntos_follow()
-            self.construir_automato_lr0()
-            tabela, conflitos = self.construir_tabela_slr()
+            self.carregado_do_cache = False
+            self.automato_preguicoso = None
+            chave = None
+            if self.cache is not None and not self.preguicoso:   # o cache guarda tabelas inteiras
+                chave = self.cache.chave(texto_entrada, VERSAO_GERADOR, self.modo + ('+reduzida' if self.gramatica_reduzida else ''))
+                dados = fase('carregar_cache', self.cache.carregar, chave)
+                if dados is not None:
+                    try:
+                        fase('restaurar_cache', self._restaurar_cache, *dados)
+                    except ERROS_CACHE:   # arquivo corrompido que passou pela leitura: _restaurar_cache não mexeu em nada, gera de novo
+                        dados = None
+                if dados is not None:   # partida quente: nenhuma fase de construção é executada
+                    self.carregado_do_cache = True
+                    if self.tabela_compacta:
+                        fase('compactar_tabela', self.compactar_tabela)
+                    return True
+
+            if self.leitor_linear:
+                fase('analisar_gramatica_linear', self.analisar_gramatica_linear, texto_entrada)
+            else:
+                fase('analisar_gramatica', self.analisar_gramatica, texto_entrada)
+            if self.gramatica_reduzida:
+                fase('reduzir_gramatica', self.reduzir_gramatica)
+            fase('aumentar_gramatica', self.aumentar_gramatica)
+            if self.conjuntos_bitset:
+                fase('calcular_conjuntos_bitset', self.calcular_conjuntos_bitset)
+            else:
+                fase('calcular_conjuntos_first', self.calcular_conjuntos_first)
+                fase('calcular_conjuntos_follow', self.calcular_conjuntos_follow)
+            if self.preguicoso:
+                fase('preparar_automato_preguicoso', self.preparar_automato_preguicoso)
+                return True
+            if self.automato_nucleo:
+                fase('construir_automato_lr0_nucleo', self.construir_automato_lr0_nucleo)
+            else:
+                fase('construir_automato_lr0', self.construir_automato_lr0)
+            if self.modo == 'lalr':
+                tabela, conflitos = fase('construir_tabela_lalr', self.construir_tabela_lalr)
+            else:
+                tabela, conflitos = fase('construir_tabela_slr', self.construir_tabela_slr)
             
-            if conflitos:
+            if conflitos and not self.glr:
                 self._imprimir_erro_slr(conflitos)
                 return False
+
+            if chave is not None and not conflitos:   # o cache não guarda as ações em disputa
+                fase('salvar_cache', lambda: self.cache.salvar(chave, *self._dados_cache()))
+
+            if self.tabela_compacta:
+                fase('compactar_tabela', self.compactar_tabela)
             
             return True
         except Exception as e:
             print(f"Erro ao gerar o parser: {str(e)}")
             return False
+        finally:
+            if self.medir:
+                self._finalizar_estatisticas(conflitos)
     
+    def regenerar(self, texto_entrada): #Regeneração incremental: compara as produções com a geração anterior e refaz só o que elas afetam
+        if self.gramatica is None or self.estados is None or self.tabela is None:
+            return self.gerar_analisador(texto_entrada)
+
+        inicio = time.perf_counter()
+        if self.preguicoso:   # gerar de novo já é barato: nenhum estado além do 1 é construído
+            sucesso = self.gerar_analisador(texto_entrada)
+            self.regeneracao = {'incremental': False, 'segundos': time.perf_counter() - inicio}
+            return sucesso
+        anterior = self.gramatica
+        self.regeneracao = None
+        try:
+            if self.leitor_linear:
+                self.analisar_gramatica_linear(texto_entrada)
+            else:
+                self.analisar_gramatica(texto_entrada)
+            if self.gramatica_reduzida:
+                self.reduzir_gramatica()
+            self.aumentar_gramatica()
+        except Exception as e:
+            self.gramatica = anterior   # gramática inválida: as tabelas anteriores continuam valendo
+            print(f"Erro ao gerar o parser: {str(e)}")
+            return False
+        nova = self.gramatica
+
+        if (nova.terminais != anterior.terminais or nova.nao_terminais != anterior.nao_terminais
+                or nova.simbolo_inicial != anterior.simbolo_inicial or nova.fim_arquivo != anterior.fim_arquivo):
+            sucesso = self.gerar_analisador(texto_entrada)   # colunas da tabela mudaram: geração completa
+            self.regeneracao = {'incremental': False, 'segundos': time.perf_counter() - inicio}
+            return sucesso
+
+        # produções que continuam existindo: índice antigo -> índice novo (repetidas casam na ordem em que aparecem)
+        livres = defaultdict(deque)
+        for idx, (esquerdo, direito) in enumerate(nova.producoes):
+            livres[(esquerdo, tuple(direito))].append(idx)
+        mapa_prod = {}
+        removidas = []
+        for idx, (esquerdo, direito) in enumerate(anterior.producoes):
+            fila = livres.get((esquerdo, tuple(direito)))
+            if fila:
+                mapa_prod[idx] = fila.popleft()
+            else:
+                removidas.append(idx)
+        adicionadas = [idx for fila in livres.values() for idx in fila]
+        if nova.precedencia != anterior.precedencia or any(
+                anterior.precedencia_producao(antigo) != nova.precedencia_producao(novo) for antigo, novo in mapa_prod.items()):
+            sucesso = self.gerar_analisador(texto_entrada)   # precedências mudaram: qualquer conflito resolvido pode mudar de lado
+            self.regeneracao = {'incremental': False, 'segundos': time.perf_counter() - inicio}
+            return sucesso
+        alterados = {anterior.producoes[idx][0] for idx in removidas} | {nova.producoes[idx][0] for idx in adicionadas}
+        simbolos_alterados = {sim for idx in removidas for sim in anterior.producoes[idx][1]}
+        simbolos_alterados.update(sim for idx in adicionadas for sim in nova.producoes[idx][1])
+
+        follow_anterior = self.conjuntos_follow
+        first_mudou = self._atualizar_first(alterados)
+        follow_mudou = self._atualizar_follow(simbolos_alterados, first_mudou)
+
+        if not isinstance(self.estados, list):
+            self.estados = list(self.estados)   # autômato por núcleos: passa a guardar os conjuntos de itens
+        refeitos, novos, removidos, renumerados = self._atualizar_automato(anterior, mapa_prod, alterados)
+
+        if self.modo == 'lalr' or not isinstance(self.tabela, dict):
+            tabela, conflitos = self.construir_tabela_lalr() if self.modo == 'lalr' else self.construir_tabela_slr()
+            linhas_refeitas = len(self.estados)
+        else:
+            # linhas a refazer: estados refeitos, novos ou renumerados, quem aponta para renumerados
+            # e quem reduz por produção que mudou de índice ou cujo FOLLOW mudou
+            sujas = refeitos | novos | renumerados
+            for num_estado, saidas in self.transicoes.items():
+                if any(destino in renumerados for destino in saidas.values()):
+                    sujas.add(num_estado)
+            competidores = self.acoes_conflitantes
+            sujas.update(estado for estado, _ in competidores if estado <= len(self.estados))   # linhas com conflito dependem da ordem de escrita
+            sujas.update(estado for estado, _ in self.conflitos_resolvidos if estado <= len(self.estados))   # e as resolvidas não são só FOLLOW
+            prod_movidas = {novo for antigo, novo in mapa_prod.items() if antigo != novo}
+            renumerar = {}   # estado -> produções que só mudaram de índice: basta reescrever as células de reduce
+            if prod_movidas or follow_mudou:
+                for num_estado, I in enumerate(self.estados, 1):
+                    if num_estado in sujas:
+                        continue
+                    for idx_prod, ponto in I:
+                        esquerdo, direito = nova.producoes[idx_prod]
+                        if ponto < len(direito):
+                            continue
+                        if esquerdo in follow_mudou:
+                            sujas.add(num_estado)
+                            renumerar.pop(num_estado, None)
+                            break
+                        if idx_prod in prod_movidas:
+                            renumerar.setdefault(num_estado, []).append(idx_prod)
+            for chave in [chave for chave in competidores if chave[0] in sujas or chave[0] > len(self.estados)]:
+                del competidores[chave]
+            for chave in [chave for chave in self.conflitos_resolvidos if chave[0] in sujas or chave[0] > len(self.estados)]:
+                del self.conflitos_resolvidos[chave]
+
+            def registrar(conflito):
+                estado, simbolo, _, antiga, nova_acao = conflito
+                acoes = competidores.setdefault((estado, simbolo), [antiga])
+                if nova_acao not in acoes:
+                    acoes.append(nova_acao)
+
+            for num_estado in range(len(self.estados) + 1, max(self.tabela) + 1):
+                del self.tabela[num_estado]
+            for num_estado in sujas:
+                self.tabela[num_estado] = self._preencher_linha(num_estado, self.estados[num_estado - 1], None, registrar)
+            for num_estado, prods in renumerar.items():   # linha sem conflito: cada célula de FOLLOW pertence a um único reduce
+                linha = self.tabela[num_estado]
+                for idx_prod in prods:
+                    acao_nova = f'r{idx_prod}'
+                    for t in self.conjuntos_follow[nova.producoes[idx_prod][0]]:
+                        linha[t] = acao_nova
+            self.tabela_decodificada = None
+            self.tabela_glr = None
+            conflitos = self.verificar_conflitos_slr()
+            linhas_refeitas = len(sujas) + len(renumerar)
+
+        self.regeneracao = {
+            'incremental': True,
+            'producoes_adicionadas': len(adicionadas),
+            'producoes_removidas': len(removidas),
+            'first_alterados': len(first_mudou),
+            'follow_alterados': len(follow_mudou),
+            'estados_refeitos': len(refeitos),
+            'estados_novos': len(novos),
+            'estados_removidos': removidos,
+            'linhas_refeitas': linhas_refeitas,
+            'segundos': time.perf_counter() - inicio,
+        }
+        if conflitos and not self.glr:
+            self._imprimir_erro_slr(conflitos)
+            return False
+        if self.tabela_compacta:
+            self.compactar_tabela()
+        return True
+
+    def _atualizar_first(self, alterados): #refaz FIRST só dos não-terminais que dependem (direta ou indiretamente) dos alterados
+        gramatica = self.gramatica
+        nao_terminais = set(gramatica.nao_terminais)
+        dependentes = defaultdict(set)   # B -> não-terminais com B em algum lado direito
+        for esquerdo, direito in gramatica.producoes:
+            for sim in direito:
+                if sim in nao_terminais:
+                    dependentes[sim].add(esquerdo)
+        afetados = set(alterados)
+        pendentes = list(alterados)
+        while pendentes:
+            for A in dependentes[pendentes.pop()]:
+                if A not in afetados:
+                    afetados.add(A)
+                    pendentes.append(A)
+
+        first = self.conjuntos_first
+        anterior = {A: first.get(A, set()) for A in afetados}
+        for A in afetados:
+            first[A] = set()
+        producoes = [(esquerdo, direito) for esquerdo, direito in gramatica.producoes if esquerdo in afetados]
+        mudou = True   # mesmo ponto fixo de calcular_conjuntos_first, restrito aos afetados; os demais já estão corretos
+        while mudou:
+            mudou = False
+            for esquerdo, direito in producoes:
+                tamanho = len(first[esquerdo])
+                for sim in direito:
+                    if sim in first:
+                        first[esquerdo] |= (first[sim] - {''})
+                        if '' not in first[sim]:
+                            break
+                    else:
+                        first[esquerdo].add(sim)
+                        break
+                else:
+                    first[esquerdo].add('')
+                if len(first[esquerdo]) != tamanho:
+                    mudou = True
+        return {A for A in afetados if first[A] != anterior[A]}
+
+    def _atualizar_follow(self, simbolos_alterados, first_mudou): #refaz FOLLOW só de quem pode ter mudado; devolve os que mudaram
+        gramatica = self.gramatica
+        nao_terminais = set(gramatica.nao_terminais)
+        ocorrencias = defaultdict(list)   # símbolo -> produções em que aparece do lado direito
+        for idx, (esquerdo, direito) in enumerate(gramatica.producoes):
+            for sim in set(direito):
+                ocorrencias[sim].append(idx)
+
+        # sementes: quem aparece numa produção alterada ou junto de um símbolo cujo FIRST mudou;
+        # depois, tudo o que está no lado direito de um afetado (FOLLOW(A) ⊆ FOLLOW(B) quando B termina A)
+        afetados = {sim for sim in simbolos_alterados if sim in nao_terminais}
+        for sim in first_mudou:
+            for idx in ocorrencias[sim]:
+                afetados.update(s for s in gramatica.producoes[idx][1] if s in nao_terminais)
+        pendentes = list(afetados)
+        while pendentes:
+            for idx, direito in gramatica.prod_por_esquerdo.get(pendentes.pop(), ()):
+                for sim in direito:
+                    if sim in nao_terminais and sim not in afetados:
+                        afetados.add(sim)
+                        pendentes.append(sim)
+
+        follow = self.conjuntos_follow
+        anterior = {B: follow.get(B, set()) for B in afetados}
+        for B in afetados:
+            follow[B] = set()
+        if gramatica.simbolo_inicial in afetados:
+            follow[gramatica.simbolo_inicial].add(gramatica.fim_arquivo)
+        producoes = sorted({idx for B in afetados for idx in ocorrencias[B]})
+
+        first = self.conjuntos_first
+        mudou = True   # mesmo laço de calcular_conjuntos_follow, escrevendo só nos afetados
+        while mudou:
+            mudou = False
+            for idx in producoes:
+                esquerdo, direito = gramatica.producoes[idx]
+                trailer = set(follow[esquerdo])
+                for sim in reversed(direito):
+                    if sim in afetados:
+                        tamanho = len(follow[sim])
+                        follow[sim] |= trailer
+                        if len(follow[sim]) != tamanho:
+                            mudou = True
+                    if sim in first and '' in first[sim] and sim in nao_terminais:
+                        trailer |= (first[sim] - {''})
+                    elif sim in first:
+                        trailer = set(first[sim])
+                    else:
+                        trailer = {sim}
+        return {B for B in afetados if follow[B] != anterior[B]}
+
+    def _atualizar_automato(self, anterior, mapa_prod, alterados):
+        #estados antigos mantêm o número; só os que têm item de produção removida ou ponto antes de um não-terminal
+        #alterado são fechados de novo. Estados que deixam de ser alcançáveis abrem buracos, preenchidos pelos de número mais alto
+        identidade = all(antigo == novo for antigo, novo in mapa_prod.items())
+        num_antigos = len(self.estados)
+        conjunto_de = {}
+        mapa_estado = {}
+        afetados = set()
+        for num_estado, I in enumerate(self.estados, 1):
+            afetado = False
+            for idx_prod, ponto in I:
+                if idx_prod not in mapa_prod:
+                    afetado = True
+                    break
+                direito = anterior.producoes[idx_prod][1]
+                if ponto < len(direito) and direito[ponto] in alterados:
+                    afetado = True
+                    break
+            if afetado:
+                afetados.add(num_estado)
+                nucleo = [(idx_prod, ponto) for idx_prod, ponto in I if ponto > 0 or idx_prod == 0]
+                if any(idx_prod not in mapa_prod for idx_prod, _ in nucleo):
+                    continue   # o núcleo não existe mais; se algo chegar aqui, será um estado novo
+                J = self.fechamento([(mapa_prod[idx_prod], ponto) for idx_prod, ponto in nucleo])
+            elif identidade:
+                J = I
+            else:
+                J = frozenset((mapa_prod[idx_prod], ponto) for idx_prod, ponto in I)
+            conjunto_de[num_estado] = J
+            mapa_estado[J] = num_estado
+
+        transicoes = {}
+        proximo = num_antigos + 1
+        fila = deque([1])
+        alcancados = {1}
+        refeitos = set()
+        while fila:
+            num_estado = fila.popleft()
+            if num_estado <= num_antigos and num_estado not in afetados:
+                saidas = dict(self.transicoes[num_estado])   # mesmos itens, mesmos núcleos sucessores
+            else:
+                refeitos.add(num_estado)
+                I = conjunto_de[num_estado]
+                simbolos = set()
+                for idx_prod, ponto in I:
+                    direito = self.gramatica.producoes[idx_prod][1]
+                    if ponto < len(direito):
+                        simbolos.add(direito[ponto])
+                saidas = {}
+                for X in self._ordenar_simbolos(simbolos, self.gramatica.terminais, self.gramatica.nao_terminais):
+                    J = self.ir_para(I, X)
+                    if not J:
+                        continue
+                    destino = mapa_estado.get(J)
+                    if destino is None:
+                        destino = proximo
+                        proximo += 1
+                        mapa_estado[J] = destino
+                        conjunto_de[destino] = J
+                    saidas[X] = destino
+            transicoes[num_estado] = saidas
+            for destino in saidas.values():
+                if destino not in alcancados:
+                    alcancados.add(destino)
+                    fila.append(destino)
+
+        total = len(alcancados)
+        novos = {num_estado for num_estado in alcancados if num_estado > num_antigos}
+        removidos = sum(1 for num_estado in range(1, num_antigos + 1) if num_estado not in alcancados)
+        buracos = [num_estado for num_estado in range(1, total + 1) if num_estado not in alcancados]
+        altos = sorted(num_estado for num_estado in alcancados if num_estado > total)   # tantos quanto os buracos
+        renomear = dict(zip(altos, buracos))
+        if renomear:
+            for num_estado in list(transicoes):
+                saidas = transicoes[num_estado]
+                for X, destino in saidas.items():
+                    if destino in renomear:
+                        saidas[X] = renomear[destino]
+            for antigo, novo in renomear.items():
+                transicoes[novo] = transicoes.pop(antigo)
+                conjunto_de[novo] = conjunto_de[antigo]
+
+        self.estados = [conjunto_de[num_estado] for num_estado in range(1, total + 1)]
+        self.transicoes = transicoes
+        renumerados = set(renomear.values())
+        refeitos = {renomear.get(num_estado, num_estado) for num_estado in refeitos}
+        novos = {renomear.get(num_estado, num_estado) for num_estado in novos}
+        return refeitos, novos, removidos, renumerados
+
     def _imprimir_erro_slr(self, conflitos):
         print("\n" + "=" * 70)
-        print("ERRO: GRAMÁTICA NÃO É SLR!")
+        print(f"ERRO: GRAMÁTICA NÃO É {self.modo.upper()}!")
         print("=" * 70)
-        print(f"A gramática fornecida não é SLR devido a {len(conflitos)} conflito(s):")
+        print(f"A gramática fornecida não é {self.modo.upper()} devido a {len(conflitos)} conflito(s):")
         print()
+
+        exemplos = self.contraexemplos(conflitos)
         
         conflitos_shift_reduce = []
         conflitos_reduce_reduce = []
@@ -582,6 +2679,7 @@ class AnalisadorSLR: #sequencia do analisador
             for estado, simbolo, acao1, acao2 in conflitos_shift_reduce:
                 print(f"   Estado {estado}, símbolo '{simbolo}': {acao1} vs {acao2}")
                 print(f"   -> O parser não sabe se deve fazer shift ou reduce")
+                self._imprimir_contraexemplo(estado, simbolo, exemplos)
             print()
         
         if conflitos_reduce_reduce:
@@ -596,73 +2694,300 @@ class AnalisadorSLR: #sequencia do analisador
                     print(f"   -> Produção {prod1}: {esquerdo1} -> {' '.join(direito1) if direito1 else 'vazio'}")
                     print(f"   -> Produção {prod2}: {esquerdo2} -> {' '.join(direito2) if direito2 else 'vazio'}")
                 print(f"   -> O parser não sabe qual produção usar para reduzir")
+                self._imprimir_contraexemplo(estado, simbolo, exemplos)
             print()
         
         if outros_conflitos:
             print("OUTROS CONFLITOS:")
             for estado, simbolo, tipo_conflito, acao1, acao2 in outros_conflitos:
                 print(f"   Estado {estado}, símbolo '{simbolo}' ({tipo_conflito}): {acao1} vs {acao2}")
+                self._imprimir_contraexemplo(estado, simbolo, exemplos)
             print()
         
         print()
         print("Geração do parser FALHOU devido aos conflitos acima.")
         print("=" * 70)
 
+    def _imprimir_contraexemplo(self, estado, simbolo, exemplos):
+        acoes = self.acoes_conflitantes.get((estado, simbolo), ())
+        if len(acoes) > 2:
+            print(f"   -> Ações em disputa na célula: {', '.join(acoes)}")
+        if estado not in exemplos:
+            print(f"   -> Prefixo viável não encontrado dentro do limite de {self.tempo_diagnostico} s")
+            return
+        prefixo, exemplo = exemplos[estado]
+        print(f"   -> Prefixo viável: {' '.join(prefixo) if prefixo else 'vazio'}")
+        continuacao = '' if simbolo == self.gramatica.fim_arquivo else ' ...'
+        print(f"   -> Exemplo: {' '.join(exemplo + ['•', simbolo])}{continuacao}")
+
+def observar_arquivo(analisador_slr, caminho, intervalo=0.3, ao_regenerar=None): #Modo watch: regenera incrementalmente a cada gravação do arquivo
+    print(f"\nObservando {caminho} (Ctrl+C para sair)...")
+    ultima = os.stat(caminho).st_mtime_ns
+    try:
+        while True:
+            time.sleep(intervalo)
+            try:
+                atual = os.stat(caminho).st_mtime_ns
+            except OSError:
+                continue   # editores que gravam por renomeação deixam o arquivo ausente por um instante
+            if atual == ultima:
+                continue
+            ultima = atual
+            with open(caminho, 'r') as f:
+                texto_entrada = f.read()
+            sucesso = analisador_slr.regenerar(texto_entrada)
+            resumo = analisador_slr.regeneracao
+            situacao = "OK" if sucesso else "FALHOU"
+            if resumo is None:   # gramática inválida: as tabelas anteriores foram mantidas
+                print(f"[{time.strftime('%H:%M:%S')}] {situacao}: gramática inválida, tabelas anteriores mantidas")
+            elif resumo['incremental']:
+                print(f"[{time.strftime('%H:%M:%S')}] {situacao}: regeneração incremental em {resumo['segundos'] * 1000:.1f} ms, "
+                      f"{resumo['estados_refeitos']} estados refeitos, {resumo['estados_novos']} novos, "
+                      f"{resumo['estados_removidos']} removidos, {resumo['linhas_refeitas']} linhas da tabela")
+            else:
+                print(f"[{time.strftime('%H:%M:%S')}] {situacao}: regeneração completa em {resumo['segundos'] * 1000:.1f} ms")
+            if sucesso and ao_regenerar is not None:
+                ao_regenerar()
+    except KeyboardInterrupt:
+        print("\nObservação encerrada.")
+
 def main(): #FUNÇÃO PARA LER O ARQUIVO TXT
     analisador = argparse.ArgumentParser(description='Gerador de Analisador SLR')  
+    analisador.add_argument('-m', '--modo', choices=['slr', 'lalr'], default='slr', help='Tipo de tabela: SLR (FOLLOW) ou LALR(1) (lookaheads de DeRemer–Pennello)')
     analisador.add_argument('-f', '--arquivo', help='Arquivo com a gramática', required=True)
     analisador.add_argument('-g', '--gramatica', help='Gramática como string')
+    analisador.add_argument('-e', '--entrada', help='Arquivo com tokens separados por espaço para analisar com a tabela gerada')
+    analisador.add_argument('--conjuntos-bitset', action='store_true', help='Calcula FIRST/FOLLOW com bitsets e propagação por grafo de dependências')
+    analisador.add_argument('--automato-nucleo', action='store_true', help='Constrói o autômato LR(0) por núcleos com itens inteiros e fechamentos pré-calculados')
+    analisador.add_argument('--leitor-linear', action='store_true', help='Lê a gramática em uma passada, sem eval, com linha e coluna nos erros')
+    analisador.add_argument('--cache', nargs='?', const=os.path.join(os.path.expanduser('~'), '.cache', 'analisador_slr'),
+                            help='Diretório de cache das tabelas geradas (padrão: ~/.cache/analisador_slr)')
+    analisador.add_argument('--cache-max-mb', type=int, default=64, help='Tamanho máximo do cache em MB antes de descartar as tabelas menos usadas')
+    analisador.add_argument('--emit-python', metavar='ARQUIVO', help='Grava um módulo Python independente com a tabela e o driver')
+    analisador.add_argument('--lote', metavar='DIRETORIO', help='Analisa todos os arquivos de tokens do diretório em paralelo')
+    analisador.add_argument('--processos', type=int, help='Número de processos do --lote (padrão: número de CPUs)')
+    analisador.add_argument('--lexico', metavar='ARQUIVO', help='Definições léxicas (terminal = regex, %%ignorar = regex) usadas com --fonte')
+    analisador.add_argument('--fonte', metavar='ARQUIVO', help='Arquivo de texto-fonte para varrer e analisar com a tabela gerada')
+    analisador.add_argument('--fluxo', metavar='ARQUIVO', help='Fluxo binário de tokens (.slrt) para analisar direto do mmap, por IDs inteiros')
+    analisador.add_argument('--gravar-fluxo', metavar='ARQUIVO',
+                            help='Grava os tokens do --fonte (ou do -e) como fluxo binário .slrt, com o deslocamento em bytes de cada token')
+    analisador.add_argument('--perfil', nargs='?', const='-', metavar='ARQUIVO',
+                            help='Conta estados, produções e terminais usados pelo driver no -e/--fonte (sem ARQUIVO: relatório na tela; com ARQUIVO: JSON)')
+    analisador.add_argument('--stats', nargs='?', const='-', metavar='ARQUIVO',
+                            help='Relatório JSON de tempo por fase, contadores e memória da geração (sem ARQUIVO: na saída padrão)')
+    analisador.add_argument('--tempo-diagnostico', type=float, default=0.5, metavar='SEGUNDOS',
+                            help='Limite de tempo da busca de contraexemplos para os conflitos')
+    analisador.add_argument('--observar', action='store_true', help='Fica observando o arquivo -f e regenera incrementalmente a cada gravação')
+    analisador.add_argument('--intervalo', type=float, default=0.3, metavar='SEGUNDOS', help='Intervalo entre verificações do --observar')
+    analisador.add_argument('--saida', metavar='ARQUIVO', help='Exporta estados e tabela para ARQUIVO (.jsonl, .csv ou .bin)')
+    analisador.add_argument('--formato', choices=['jsonl', 'csv', 'bin'], help='Formato do --saida quando a extensão não indica')
+    analisador.add_argument('-q', '--quiet', action='store_true', help='Não mostra gramática, estados nem tabela na tela')
+    analisador.add_argument('--preguicoso', action='store_true',
+                            help='Só SLR: constrói cada estado e linha da tabela quando a análise chega neles, em vez de tudo antes')
+    analisador.add_argument('--estados-materializados', metavar='ARQUIVO',
+                            help='Com --preguicoso: carrega os estados já construídos de ARQUIVO, se existir, e grava de volta no fim')
+    analisador.add_argument('--reduzir', action='store_true',
+                            help='Remove não-terminais improdutivos e inalcançáveis (e suas produções) antes de construir o autômato')
+    analisador.add_argument('--otimizar', action='store_true',
+                            help='Otimiza a tabela do driver: reduções padrão, eliminação de produções unitárias e fusão de linhas')
+    analisador.add_argument('--glr', action='store_true',
+                            help='Aceita gramáticas com conflitos: -e passa a usar o driver GLR e mostra quantas árvores a entrada tem')
+    analisador.add_argument('--servidor', metavar='SOCKET',
+                            help="Fica no ar respondendo requisições JSON em linhas num socket Unix ('-' para stdin/stdout); -f vira a gramática padrão")
+    analisador.add_argument('--max-gramaticas', type=int, default=32, help='Analisadores compilados mantidos no LRU do --servidor')
+    analisador.add_argument('--tabela-compacta', action='store_true', help='Guarda a tabela em arrays comprimidos e mostra a memória economizada')
     args = analisador.parse_args()
+    args.quiet = args.quiet or args.servidor is not None   # no --servidor a saída padrão pode ser o próprio protocolo
     
     if args.arquivo:
         try:
             with open(args.arquivo, 'r') as f:
                 texto_entrada = f.read()
-            print(f"Gramática carregada do arquivo: {args.arquivo}")
+            if not args.quiet:
+                print(f"Gramática carregada do arquivo: {args.arquivo}")
         except Exception as e:
             print(f"Erro ao ler o arquivo: {str(e)}")
             return
     elif args.gramatica:
         texto_entrada = args.gramatica
-        print("Gramática fornecida via argumento:")
+        if not args.quiet:
+            print("Gramática fornecida via argumento:")
     else:
         print("Erro: É necessário fornecer um arquivo com a gramática usando -f ou --arquivo")
         return
     
-    print("-" * 40)
-    print(texto_entrada)
-    print("-" * 40)
+    if not args.quiet:
+        print("-" * 40)
+        print(texto_entrada)
+        print("-" * 40)
+
+    if args.servidor:
+        fabrica = lambda modo, glr: AnalisadorSLR(modo=modo, glr=glr, conjuntos_bitset=args.conjuntos_bitset,
+                                                  automato_nucleo=args.automato_nucleo, leitor_linear=args.leitor_linear)
+        try:
+            servir(ServidorAnalise(fabrica, VERSAO_GERADOR, args.max_gramaticas), args.servidor, texto_entrada, args.modo, args.glr)
+        except Exception as e:
+            print(f"❌ Erro: {str(e)}", file=sys.stderr)
+        return
     
     try:
-        analisador_slr = AnalisadorSLR()
+        cache = CacheTabelas(args.cache, args.cache_max_mb * 1024 * 1024) if args.cache else None
+        analisador_slr = AnalisadorSLR(modo=args.modo, tabela_compacta=args.tabela_compacta, conjuntos_bitset=args.conjuntos_bitset,
+                                       automato_nucleo=args.automato_nucleo, cache=cache,
+                                       leitor_linear=args.leitor_linear, estatisticas=bool(args.stats),
+                                       tempo_diagnostico=args.tempo_diagnostico, glr=args.glr, perfilar=bool(args.perfil),
+                                       gramatica_reduzida=args.reduzir, preguicoso=args.preguicoso)
         sucesso = analisador_slr.gerar_analisador(texto_entrada)
+        if sucesso and args.estados_materializados and os.path.exists(args.estados_materializados):
+            linhas = analisador_slr.carregar_estados_materializados(args.estados_materializados)
+            print(f"\n{linhas} linha(s) materializada(s) carregada(s) de {args.estados_materializados}")
+        if args.stats:
+            relatorio = json.dumps(analisador_slr.estatisticas, indent=2, ensure_ascii=False)
+            if args.stats == '-':
+                print(f"\nEstatísticas da geração:\n{relatorio}")
+            else:
+                with open(args.stats, 'w', encoding='utf-8') as f:
+                    f.write(relatorio + '\n')
+                print(f"\nEstatísticas gravadas em {args.stats}")
         
+        def analisar_entrada(): #-e: driver LR, ou GLR com o tamanho da floresta
+            with open(args.entrada, 'r') as f:
+                tokens = f.read().split()
+            if not args.glr:
+                return str(analisador_slr.analisar(tokens))
+            resultado = analisador_slr.analisar_glr(tokens)
+            if not resultado:
+                return str(resultado)
+            floresta = resultado.arvore
+            arvores = floresta.contar_arvores()
+            arvores = 'infinitas' if math.isinf(arvores) else arvores   # ciclo A =>+ A na floresta
+            return f"{resultado} {arvores} árvore(s), {len(floresta.ambiguos())} nó(s) ambíguo(s) na floresta"
+
+        def ao_regenerar(): #saídas que dependem da tabela são refeitas a cada regeneração do --observar
+            if args.emit_python:
+                tamanho = analisador_slr.emitir_python(args.emit_python, origem=args.arquivo)
+                print(f"Módulo Python gerado em {args.emit_python} ({tamanho} bytes)")
+            if args.entrada:
+                print(f"Análise de {args.entrada}: {analisar_entrada()}")
+
         if not sucesso:
+            if args.observar:
+                observar_arquivo(analisador_slr, args.arquivo, args.intervalo, ao_regenerar)
             return
+        if analisador_slr.carregado_do_cache:
+            print(f"\nTabelas carregadas do cache: {args.cache}")
+        elif analisador_slr.relatorio_reducao is not None:
+            print(f"\n{formatar_relatorio(analisador_slr.relatorio_reducao)}")
         
-        print("\nDetalhes da gramática:")
-        print(f"Terminais: {analisador_slr.gramatica.terminais}")
+        if not args.quiet:
+            print("\nDetalhes da gramática:")
+            print(f"Terminais: {analisador_slr.gramatica.terminais}")
         
-        nao_terminais_originais = [nt for nt in analisador_slr.gramatica.nao_terminais if nt != "S'"]
-        print(f"Não-terminais: {nao_terminais_originais}")
+            nao_terminais_originais = [nt for nt in analisador_slr.gramatica.nao_terminais if nt != "S'"]
+            print(f"Não-terminais: {nao_terminais_originais}")
         
-        simbolo_inicial_original = nao_terminais_originais[0] if nao_terminais_originais else "S"
-        print(f"Símbolo inicial: {simbolo_inicial_original}")
+            simbolo_inicial_original = nao_terminais_originais[0] if nao_terminais_originais else "S"
+            print(f"Símbolo inicial: {simbolo_inicial_original}")
         
-        print(f"Produções:")
-        for i, (esquerdo, direito) in enumerate(analisador_slr.gramatica.producoes):
-            if esquerdo != "S'": 
-                str_direito = ' '.join(direito) if direito else "vazio"
-                print(f"  {i}: {esquerdo} -> {str_direito}")
-        print()
+            print(f"Produções:")
+            for i, (esquerdo, direito) in enumerate(analisador_slr.gramatica.producoes):
+                if esquerdo != "S'": 
+                    str_direito = ' '.join(direito) if direito else "vazio"
+                    print(f"  {i}: {esquerdo} -> {str_direito}")
+            print()
         
-        analisador_slr.imprimir_estados()
-        analisador_slr.imprimir_tabela()
+            if not args.preguicoso:
+                analisador_slr.imprimir_estados()
+                analisador_slr.imprimir_tabela()
+            if args.tabela_compacta:
+                print(f"\n{analisador_slr.relatorio_memoria()}")
         
-        print(f"\n{'='*60}")
-        print("ANALISADOR SLR GERADO COM SUCESSO!")
-        print("Esta gramática é SLR")
-        print(f"{'='*60}")
+            print(f"\n{'='*60}")
+            if args.preguicoso:
+                print("ANALISADOR SLR PREGUIÇOSO PRONTO!")
+                print("Estados e tabela são construídos durante a análise; conflitos só aparecem nos estados alcançados")
+            elif analisador_slr.acoes_conflitantes:
+                print(f"ANALISADOR GLR GERADO COM SUCESSO!")
+                print(f"A gramática não é {args.modo.upper()}: {len(analisador_slr.acoes_conflitantes)} célula(s) em conflito ficam para o GLR")
+            else:
+                print(f"ANALISADOR {args.modo.upper()} GERADO COM SUCESSO!")
+                print(f"Esta gramática é {args.modo.upper()}")
+            if analisador_slr.conflitos_resolvidos:
+                print(f"{len(analisador_slr.conflitos_resolvidos)} conflito(s) shift/reduce resolvido(s) por precedência")
+            print(f"{'='*60}")
+
+        if args.otimizar:
+            relatorio = analisador_slr.otimizar_tabela()
+            print(f"\nTabela otimizada: {relatorio['estados_antes']} -> {relatorio['estados_depois']} estados, "
+                  f"{relatorio['linhas_antes']} -> {relatorio['linhas_depois']} linhas distintas, "
+                  f"{relatorio['celulas_antes']} -> {relatorio['celulas_depois']} células; "
+                  f"{relatorio['gotos_desviados']} gotos desviados de produções unitárias, {relatorio['reducoes_padrao']} reduções padrão")
+
+        if args.saida:
+            formato = analisador_slr.exportar(args.saida, args.formato)
+            print(f"\nEstados e tabela exportados em {args.saida} ({formato})")
+
+        if args.emit_python:
+            tamanho = analisador_slr.emitir_python(args.emit_python, origem=args.arquivo)
+            print(f"\nMódulo Python gerado em {args.emit_python} ({tamanho} bytes)")
+
+        if args.entrada:
+            print(f"\nAnálise de {args.entrada}: {analisar_entrada()}")
+
+        if args.fonte:
+            definicoes, ignorar = None, (r'\s+',)
+            if args.lexico:
+                with open(args.lexico, 'r') as f:
+                    definicoes, ignorar = ler_definicoes(f.read())
+            lexico = analisador_slr.criar_lexico(definicoes, ignorar)
+            resultado = analisador_slr.analisar_arquivo_fonte(args.fonte, lexico)
+            print(f"\nAnálise de {args.fonte}: {resultado}")
+            if args.gravar_fluxo:
+                pares = ((terminal, posicao) for terminal, _, posicao in lexico.tokens_arquivo(args.fonte, com_lexema=True))
+                total = analisador_slr.gravar_fluxo(args.gravar_fluxo, pares, deslocamentos=True)
+                print(f"Fluxo binário gravado em {args.gravar_fluxo} ({total} tokens)")
+        elif args.gravar_fluxo and args.entrada:
+            total = converter_texto(args.entrada, args.gravar_fluxo, analisador_slr.gramatica.terminais, deslocamentos=True)
+            print(f"\nFluxo binário gravado em {args.gravar_fluxo} ({total} tokens)")
+        elif args.gravar_fluxo:
+            print("\n--gravar-fluxo precisa de --fonte ou -e")
+
+        if args.fluxo:
+            with ler_fluxo(args.fluxo) as fluxo:
+                resultado = analisador_slr.analisar_ids(fluxo.ids, fluxo.terminais)
+                onde = ''
+                if not resultado and fluxo.deslocamentos is not None and resultado.posicao < len(fluxo):
+                    onde = f" (byte {fluxo.deslocamentos[resultado.posicao]} do fonte)"
+            print(f"\nAnálise de {args.fluxo}: {resultado}{onde}")
+
+        if args.lote:
+            caminhos = sorted(os.path.join(args.lote, nome) for nome in os.listdir(args.lote)
+                              if os.path.isfile(os.path.join(args.lote, nome)))
+            resultados = analisador_slr.analisar_lote(caminhos, args.processos)
+            rejeitados = [(caminho, resultado) for caminho, resultado in zip(caminhos, resultados) if not resultado]
+            print(f"\nLote {args.lote}: {len(caminhos) - len(rejeitados)} aceitos, {len(rejeitados)} rejeitados")
+            for caminho, resultado in rejeitados:
+                print(f"  {caminho}: {resultado}")
+
+        if args.preguicoso and analisador_slr.automato_preguicoso is not None:
+            print(f"\nEstados materializados: {len(analisador_slr.tabela)} de {len(analisador_slr.estados)} descobertos"
+                  + (" (autômato completo)" if analisador_slr.automato_preguicoso.completo else ""))
+            if args.estados_materializados:
+                analisador_slr.salvar_estados_materializados(args.estados_materializados)
+                print(f"Estados materializados gravados em {args.estados_materializados}")
+
+        if args.perfil:
+            if analisador_slr.perfil is None:
+                print("\n--perfil: nenhuma análise pelo driver LR (use -e ou --fonte, sem --glr)")
+            elif args.perfil == '-':
+                print(f"\n{analisador_slr.perfil.relatorio(analisador_slr)}")
+            else:
+                with open(args.perfil, 'w', encoding='utf-8') as f:
+                    f.write(json.dumps(analisador_slr.perfil.como_dict(analisador_slr), indent=2, ensure_ascii=False) + '\n')
+                print(f"\nPerfil gravado em {args.perfil}")
+
+        if args.observar:
+            observar_arquivo(analisador_slr, args.arquivo, args.intervalo, ao_regenerar)
             
     except Exception as e:
         print(f"❌ Erro: {str(e)}")
@@ -0,0 +1,213 @@
+import re
+import ast
+import sys
+
+_ALTERNATIVA = re.compile(r"'[^']*'|\"[^\"]*\"|\|")   # separadores '|' fora de aspas
+_COM_ESPACOS = re.compile(r"'[^']*'|\"[^\"]*\"|\S+")
+
+def _erro(linha, coluna, mensagem):
+    return ValueError(f"Linha {linha}, coluna {coluna}: {mensagem}")
+
+def _montar_trie(simbolos):
+    trie = {}
+    for simbolo in simbolos:
+        no = trie
+        for char in simbolo:
+            no = no.setdefault(char, {})
+        no[''] = simbolo   # chave vazia marca o fim de um símbolo
+    return trie
+
+def _segmentar(texto, trie): #divide um trecho colado em símbolos conhecidos pelo maior prefixo; None se não conseguir
+    partes = []
+    i = 0
+    while i < len(texto):
+        no = trie
+        maior = None
+        j = i
+        while j < len(texto) and texto[j] in no:
+            no = no[texto[j]]
+            j += 1
+            if '' in no:
+                maior = (no[''], j)
+        if maior is None:
+            return None
+        partes.append(maior[0])
+        i = maior[1]
+    return partes
+
+def ler_precedencia(linha): #'%left + -' -> ('left', ['+', '-']); aspas permitem símbolos com espaço ou '|'
+    partes = linha.split(None, 1)
+    diretiva = partes[0]
+    if diretiva not in ('%left', '%right', '%nonassoc'):
+        raise ValueError(f"Diretiva desconhecida: {diretiva}. Use %left, %right ou %nonassoc")
+    simbolos = []
+    for token in _COM_ESPACOS.findall(partes[1] if len(partes) > 1 else ''):
+        if len(token) >= 2 and token[0] == token[-1] and token[0] in '\'"':
+            token = token[1:-1]
+        simbolos.append(sys.intern(token))
+    if not simbolos:
+        raise ValueError(f"{diretiva} sem nenhum símbolo")
+    return diretiva[1:], simbolos
+
+def separar_prec(alternativa): #'E - E %prec NEG' -> ('E - E', 'NEG'); sem %prec, (alternativa, None)
+    if '%prec' not in alternativa:
+        return alternativa, None
+    corpo, _, simbolo = alternativa.rpartition('%prec')
+    simbolo = simbolo.strip()
+    if not simbolo or len(simbolo.split()) != 1:
+        raise ValueError(f"%prec deve ser seguido de um único símbolo: {alternativa.strip()}")
+    if len(simbolo) >= 2 and simbolo[0] == simbolo[-1] and simbolo[0] in '\'"':
+        simbolo = simbolo[1:-1]
+    return corpo, sys.intern(simbolo)
+
+def montar_precedencia(declaracoes): #[(associatividade, símbolos)] na ordem do arquivo -> {símbolo: (nível, associatividade)}
+    precedencia = {}   # como no yacc: cada linha é um nível acima da anterior
+    for nivel, (associatividade, simbolos) in enumerate(declaracoes, 1):
+        for simbolo in simbolos:
+            if simbolo in precedencia:
+                raise ValueError(f"Precedência de '{simbolo}' declarada mais de uma vez")
+            precedencia[simbolo] = (nivel, associatividade)
+    return precedencia
+
+def erros_precedencia(precedencia, prec_producoes, producoes, nao_terminais): #mensagens para não-terminais com precedência e %prec sem nível
+    erros = [f"Não-terminal '{simbolo}' não pode ter precedência" for simbolo in precedencia if simbolo in nao_terminais]
+    for idx, simbolo in prec_producoes.items():
+        if simbolo not in precedencia:
+            esquerdo, direito = producoes[idx]
+            erros.append(f"%prec {simbolo} em '{esquerdo} -> {' '.join(direito) or 'vazio'}' sem precedência declarada")
+    return erros
+
+def _cabecalho(linha, numero, nome, formato):
+    if '=' not in linha:
+        raise _erro(numero, 1, f"Linha {nome} deve ter formato: {formato}")
+    return linha.split('=', 1)[1].strip()
+
+def ler_gramatica(texto_entrada):
+    #leitor de uma passada: devolve (terminais, não-terminais, inicial, eof, produções, precedência, %prec por produção)
+    #como analisar_gramatica, sem eval, com símbolos internados e erros com linha e coluna
+    linhas = []
+    for numero, linha in enumerate(texto_entrada.split('\n'), 1):
+        conteudo = linha.strip()
+        if conteudo and not conteudo.startswith('#'):
+            linhas.append((numero, conteudo, len(linha) - len(linha.lstrip())))
+
+    if len(linhas) < 4:
+        raise ValueError("Gramática deve ter pelo menos 4 linhas: terminais, não-terminais, símbolo inicial, EOF e pelo menos uma produção")
+
+    numero, linha, _ = linhas[0]
+    try:
+        term = ast.literal_eval(_cabecalho(linha, numero, "de terminais", "term = [...]"))
+    except (SyntaxError, ValueError) as e:
+        raise _erro(numero, linha.find('=') + 2, f"Lista de terminais inválida: {e}")
+    if not isinstance(term, list):
+        raise _erro(numero, linha.find('=') + 2, "Terminais devem ser uma lista")
+    term = [sys.intern(t) if isinstance(t, str) else t for t in term]
+
+    numero, linha, _ = linhas[1]
+    nao_term = [sys.intern(nt) for nt in re.findall(r'\w+', _cabecalho(linha, numero, "de não-terminais", "non_term = [...]"))]
+    if not nao_term:
+        raise _erro(numero, linha.find('=') + 2, "Lista de não-terminais não pode estar vazia")
+
+    numero_inicial, linha, _ = linhas[2]
+    inicial = sys.intern(_cabecalho(linha, numero_inicial, "do símbolo inicial", "init = ..."))
+    numero, linha, _ = linhas[3]
+    eof = sys.intern(_cabecalho(linha, numero, "do EOF", "eof = ..."))
+
+    conjunto_term = set(term)
+    conjunto_nao_term = set(nao_term)
+    conhecidos = conjunto_term | conjunto_nao_term
+    internados = {s: s for s in conhecidos if isinstance(s, str)}
+    trie = None   # só é montada se algum trecho colado não for um símbolo conhecido
+
+    de_um_char = sorted(t for t in conjunto_term if isinstance(t, str) and len(t) == 1)
+    if de_um_char:
+        classe = ''.join(re.escape(c) for c in de_um_char)
+        colado = re.compile(f"[{classe}]|[^{classe}]+")
+    else:
+        colado = re.compile(r".+")
+
+    prods = []
+    indefinidos = []
+    declaracoes = []
+    prec_producoes = {}   # índice da produção -> símbolo do %prec
+    for numero, linha, recuo in linhas[4:]:
+        if linha.startswith('%'):
+            try:
+                declaracoes.append(ler_precedencia(linha))
+            except ValueError as e:
+                raise _erro(numero, recuo + 1, str(e))
+            continue
+        seta = linha.find('->')
+        if seta < 0:
+            raise _erro(numero, recuo + 1, f"Produção deve conter '->': {linha}")
+        esquerdo = linha[:seta].strip()
+        if not esquerdo:
+            raise _erro(numero, recuo + 1, "Lado esquerdo da produção não pode estar vazio")
+        esquerdo = internados.setdefault(esquerdo, sys.intern(esquerdo))
+
+        direito = linha[seta + 2:]
+        if '|' in direito and ('"' in direito or "'" in direito):
+            alternativas = []
+            anterior = 0
+            for m in _ALTERNATIVA.finditer(direito):
+                if m.group() == '|':
+                    alternativas.append(direito[anterior:m.start()])
+                    anterior = m.end()
+            alternativas.append(direito[anterior:])
+        else:
+            alternativas = direito.split('|')
+
+        inicio = recuo + seta + 2   # coluna (base 0) onde a alternativa atual começa na linha original
+        for alt in alternativas:
+            deslocamento = inicio + len(alt) - len(alt.lstrip())
+            inicio += len(alt) + 1
+            try:
+                alt, simbolo_prec = separar_prec(alt)
+            except ValueError as e:
+                raise _erro(numero, deslocamento + 1, str(e))
+            if simbolo_prec is not None:
+                prec_producoes[len(prods)] = simbolo_prec
+            alt = alt.strip()
+            if not alt or alt == 'vazio' or alt == 'epsilon':
+                prods.append((esquerdo, []))
+                continue
+
+            padrao = _COM_ESPACOS if ' ' in alt else colado
+            lado_direito = []
+            for m in padrao.finditer(alt):
+                token = m.group()
+                if len(token) >= 2 and token[0] == token[-1] and token[0] in '\'"':
+                    token = token[1:-1]
+                elif token not in conhecidos:
+                    if trie is None:
+                        trie = _montar_trie(s for s in conhecidos if isinstance(s, str) and s)
+                    partes = _segmentar(token, trie)
+                    if partes is not None:
+                        lado_direito.extend(partes)
+                        continue
+                if token not in conhecidos:
+                    indefinidos.append((numero, deslocamento + m.start() + 1, token, esquerdo, alt))
+                lado_direito.append(internados.setdefault(token, sys.intern(token)))
+            prods.append((esquerdo, lado_direito))
+
+    if not prods:
+        raise ValueError("Gramática deve ter pelo menos uma produção")
+
+    erros = []
+    if inicial not in {esquerdo for esquerdo, _ in prods}:
+        erros.append(f"Linha {numero_inicial}: Não há produções para o símbolo inicial '{inicial}'")
+    for numero, coluna, token, esquerdo, alt in indefinidos:
+        erros.append(f"Linha {numero}, coluna {coluna}: Símbolo '{token}' na produção '{esquerdo} -> {alt}' não está definido")
+    intersecao = conjunto_term & conjunto_nao_term
+    if intersecao:
+        erros.append(f"Símbolos aparecem tanto como terminais quanto não-terminais: {intersecao}")
+    try:
+        precedencia = montar_precedencia(declaracoes)
+    except ValueError as e:
+        erros.append(str(e))
+        precedencia = {}
+    erros.extend(erros_precedencia(precedencia, prec_producoes, prods, conjunto_nao_term))
+    if erros:
+        raise ValueError("Erros na gramática:\n" + "\n".join(f"  - {erro}" for erro in erros))
+
+    return term, nao_term, inicial, eof, prods, precedencia, prec_producoes
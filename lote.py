@@ -0,0 +1,123 @@
+import os
+from array import array
+from itertools import chain
+from multiprocessing import Pool, shared_memory
+
+SHIFT, REDUCE, ACEITA = 1, 2, 3   # 2 bits baixos de cada célula de ação, como na TabelaCompacta
+
+# estado de cada processo trabalhador, preenchido uma única vez por _iniciar_trabalhador
+_memoria = None
+_tabela = None
+
+def empacotar_tabela(linhas, terminais, nao_terminais, esquerdos, tamanhos):
+    #linhas: forma decodificada (>0 shift/goto, <0 reduce, 0 aceita). Devolve um único vetor int32:
+    #[estados, terminais, não-terminais, produções] + ações densas + gotos densos + lado esquerdo + tamanho das produções
+    num_estados = len(linhas) - 1
+    T = len(terminais)
+    N = len(nao_terminais)
+    indice_t = {t: i for i, t in enumerate(terminais)}
+    indice_nt = {nt: i for i, nt in enumerate(nao_terminais)}
+
+    acoes = array('i', bytes(4 * (num_estados + 1) * T))
+    gotos = array('i', bytes(4 * (num_estados + 1) * N))
+    for estado in range(1, num_estados + 1):
+        for simbolo, acao in linhas[estado].items():
+            if simbolo in indice_nt:
+                gotos[estado * N + indice_nt[simbolo]] = acao
+            elif acao > 0:
+                acoes[estado * T + indice_t[simbolo]] = acao << 2 | SHIFT
+            elif acao < 0:
+                acoes[estado * T + indice_t[simbolo]] = -acao << 2 | REDUCE
+            else:
+                acoes[estado * T + indice_t[simbolo]] = ACEITA
+
+    vetor = array('i', [num_estados, T, N, len(esquerdos)])
+    vetor.extend(acoes)
+    vetor.extend(gotos)
+    vetor.extend(indice_nt[esquerdo] for esquerdo in esquerdos)
+    vetor.extend(tamanhos)
+    return vetor
+
+def _iniciar_trabalhador(nome, terminais, nao_terminais):
+    #roda uma vez por processo: só o nome do bloco compartilhado atravessa o pickle, nunca a tabela
+    global _memoria, _tabela
+    _memoria = shared_memory.SharedMemory(name=nome)   # trabalhadores do Pool usam o resource_tracker do processo pai, que faz o unlink
+    vetor = _memoria.buf.cast('i')
+    num_estados, T, N, P = vetor[0], vetor[1], vetor[2], vetor[3]
+    inicio_acoes = 4
+    inicio_gotos = inicio_acoes + (num_estados + 1) * T
+    inicio_esquerdos = inicio_gotos + (num_estados + 1) * N
+    inicio_tamanhos = inicio_esquerdos + P
+
+    # a partir do bloco compartilhado, cada processo monta uma vez as linhas usadas pelo driver: ACTION por terminal e
+    # GOTO por índice de não-terminal ficam separadas, para que um não-terminal na entrada não caia num goto
+    acoes = [None]
+    gotos = [None]
+    for estado in range(1, num_estados + 1):
+        linha = {}
+        base = inicio_acoes + estado * T
+        for i in range(T):
+            codigo = vetor[base + i]
+            tipo = codigo & 3
+            if tipo == SHIFT:
+                linha[terminais[i]] = codigo >> 2
+            elif tipo == REDUCE:
+                linha[terminais[i]] = -(codigo >> 2)
+            elif tipo == ACEITA:
+                linha[terminais[i]] = 0
+        acoes.append(linha)
+        base = inicio_gotos + estado * N
+        gotos.append(vetor[base:base + N].tolist())
+
+    esquerdos = vetor[inicio_esquerdos:inicio_tamanhos].tolist()
+    tamanhos = vetor[inicio_tamanhos:inicio_tamanhos + P].tolist()
+    _tabela = (acoes, gotos, esquerdos, tamanhos, terminais)
+
+def analisar_tokens(tokens, tabela):
+    #mesmo laço de AnalisadorSLR.analisar; devolve (aceito, posição, token, estado, esperados)
+    acoes, gotos, esquerdos, tamanhos, terminais = tabela
+    fim = terminais[-1]
+    pilha = [1]
+    estado = 1
+    posicao = 0
+    entrada = chain(tokens, (fim,))
+    for token in entrada:
+        while True:
+            acao = acoes[estado].get(token)
+            if acao is None:
+                return (False, posicao, token, estado, [t for t in terminais if t in acoes[estado]])
+            if acao > 0:
+                estado = acao
+                pilha.append(estado)
+                break
+            if acao == 0:
+                if next(entrada, None) is not None:   # fim de arquivo no meio da entrada: o resto nunca seria lido
+                    return (False, posicao, token, estado, [])
+                return (True, posicao, token, estado, [])
+            tamanho = tamanhos[-acao]
+            if tamanho:
+                del pilha[-tamanho:]
+            estado = gotos[pilha[-1]][esquerdos[-acao]]
+            pilha.append(estado)
+        posicao += 1
+    return (False, posicao, fim, estado, [])
+
+def _analisar_arquivo(caminho):
+    with open(caminho, 'r') as f:
+        return analisar_tokens(f.read().split(), _tabela)
+
+def analisar_arquivos(caminhos, vetor_tabela, terminais, nao_terminais, processos=None, tamanho_bloco=None):
+    #distribui os arquivos entre processos; os resultados voltam na mesma ordem da entrada
+    caminhos = list(caminhos)
+    processos = processos or os.cpu_count() or 1
+    if tamanho_bloco is None:
+        tamanho_bloco = max(1, len(caminhos) // (processos * 4))
+
+    memoria = shared_memory.SharedMemory(create=True, size=max(1, len(vetor_tabela) * vetor_tabela.itemsize))
+    try:
+        memoria.buf[:len(vetor_tabela) * vetor_tabela.itemsize] = vetor_tabela.tobytes()
+        with Pool(processos, initializer=_iniciar_trabalhador, initargs=(memoria.name, list(terminais), list(nao_terminais))) as pool:
+            return list(pool.imap(_analisar_arquivo, caminhos, chunksize=tamanho_bloco))
+    finally:
+        memoria.close()
+        memoria.unlink()
@@ -0,0 +1,146 @@
+#Passada de otimização sobre a tabela decodificada (>0 shift/goto, <0 reduce, 0 aceita), aplicada depois de construir_tabela_*.
+#Não toca na tabela em strings: imprimir_tabela e o cache continuam mostrando a tabela LR original.
+
+def _unitarias(producoes, nao_terminais, preservar): #{produção: lado esquerdo} das produções A -> B elimináveis
+    return {idx: esquerdo for idx, (esquerdo, direito) in enumerate(producoes)
+            if len(direito) == 1 and direito[0] in nao_terminais and idx not in preservar}
+
+def _acao_unica(linha, terminais): #a redução comum a todas as células de terminal da linha, ou None
+    acoes = {acao for simbolo, acao in linha.items() if simbolo in terminais}
+    if len(acoes) == 1:
+        acao = acoes.pop()
+        if acao < 0:
+            return acao
+    return None
+
+def eliminar_unitarias(linhas, producoes, terminais, nao_terminais, preservar=()):
+    #eliminação de produções unitárias à Pager: para cada goto(s, B) = t em que t reduz por alguma A -> B, cria t' = t com
+    #essas reduções trocadas pela ação que goto(s, A) teria no mesmo token (seguindo cadeias A -> B, C -> A, ...) e com os
+    #gotos de t e dos goto(s, A) usados. As ações de goto(s, A) estão contidas no lookahead de A -> B em t, então nenhuma
+    #entrada inválida passa a ser aceita; só somem os passos de redução unitária. Se dois gotos colidirem, goto(s, B) fica como está.
+    #Acrescenta os t' ao fim de `linhas` (sem repetir linhas iguais) e devolve quantos gotos foram desviados
+    unitarias = _unitarias(producoes, nao_terminais, set(preservar))
+    if not unitarias:
+        return 0
+    numero_linha = {}   # conteúdo de cada t' já criado -> estado
+    desviados = 0
+    pendentes = [estado for estado in range(1, len(linhas)) if linhas[estado] is not None]
+    while pendentes:
+        linha_s = linhas[pendentes.pop()]
+        for simbolo, t in list(linha_s.items()):
+            if simbolo not in nao_terminais:
+                continue
+            nova = _desviar(linha_s, linhas[t], linhas, unitarias, terminais, nao_terminais)
+            if nova is None:
+                continue
+            chave = tuple(sorted(nova.items()))
+            estado = numero_linha.get(chave)
+            if estado is None:
+                estado = numero_linha[chave] = len(linhas)
+                linhas.append(nova)
+                pendentes.append(estado)   # os gotos de t' também podem levar a estados com reduções unitárias
+            linha_s[simbolo] = estado
+            desviados += 1
+    return desviados
+
+def _desviar(linha_s, linha_t, linhas, unitarias, terminais, nao_terminais): #linha de t' para goto(s, B) = t, ou None se não há o que desviar
+    nova = {}
+    gotos = {simbolo: acao for simbolo, acao in linha_t.items() if simbolo in nao_terminais}
+    for simbolo, acao in linha_t.items():
+        if simbolo in nao_terminais:
+            continue
+        origem = linha_t
+        passos = 0
+        while acao is not None and acao < 0 and -acao in unitarias and passos <= len(unitarias):   # o limite corta ciclos A -> B -> A
+            u = linha_s.get(unitarias[-acao])
+            if u is None:
+                break
+            origem = linhas[u]
+            acao = origem.get(simbolo)
+            passos += 1
+        if origem is not linha_t:
+            for nt, alvo in origem.items():
+                if nt in nao_terminais:
+                    if gotos.setdefault(nt, alvo) != alvo:
+                        return None
+        if acao is not None:
+            nova[simbolo] = acao
+    if all(nova.get(simbolo) == acao for simbolo, acao in linha_t.items() if simbolo in terminais):
+        return None
+    nova.update(gotos)
+    return nova
+
+def remover_inalcancaveis(linhas): #None nas linhas que nenhum shift/goto alcança a partir do estado 1
+    vistos = {1}
+    pendentes = [1]
+    while pendentes:
+        for acao in linhas[pendentes.pop()].values():
+            if acao > 0 and acao not in vistos:
+                vistos.add(acao)
+                pendentes.append(acao)
+    removidos = 0
+    for estado in range(1, len(linhas)):
+        if linhas[estado] is not None and estado not in vistos:
+            linhas[estado] = None
+            removidos += 1
+    return removidos
+
+def mesclar_linhas(linhas, padroes): #minimização à Moore: estados com as mesmas ações e destinos equivalentes viram um só
+    estados = [estado for estado in range(1, len(linhas)) if linhas[estado] is not None]
+    assinatura = {estado: (padroes[estado], tuple(sorted((simbolo, acao if acao <= 0 else None) for simbolo, acao in linhas[estado].items())))
+                  for estado in estados}
+    classe = _numerar(assinatura)
+    while True:
+        refinada = _numerar({estado: (classe[estado], tuple(sorted((simbolo, classe[acao]) for simbolo, acao in linhas[estado].items() if acao > 0)))
+                             for estado in estados})
+        if len(set(refinada.values())) == len(set(classe.values())):
+            break
+        classe = refinada
+
+    novo_numero = {}
+    for estado in estados:   # em ordem crescente: o estado 1 continua sendo o 1 e a ordem relativa se mantém
+        novo_numero.setdefault(classe[estado], len(novo_numero) + 1)
+    novas_linhas = [None] * (len(novo_numero) + 1)
+    novos_padroes = [None] * (len(novo_numero) + 1)
+    for estado in estados:
+        numero = novo_numero[classe[estado]]
+        if novas_linhas[numero] is None:
+            novas_linhas[numero] = {simbolo: novo_numero[classe[acao]] if acao > 0 else acao for simbolo, acao in linhas[estado].items()}
+            novos_padroes[numero] = padroes[estado]
+    return novas_linhas, novos_padroes
+
+def _numerar(assinaturas): #troca cada assinatura distinta por um inteiro
+    numeros = {}
+    return {estado: numeros.setdefault(assinatura, len(numeros)) for estado, assinatura in assinaturas.items()}
+
+def otimizar_tabela(linhas, producoes, terminais, nao_terminais,
+                    reducoes_padrao=True, unitarias=True, mesclar=True, preservar=()):
+    #devolve (linhas, padroes, relatório); padroes[estado] é a redução feita sem consultar o token nos estados consistentes
+    #(todas as células de terminal reduzem pela mesma produção), como as default reductions do Bison. As linhas continuam
+    #completas, então lote, emissor e AnalisadorIncremental usam a tabela otimizada sem conhecer os padrões
+    terminais = set(terminais)
+    nao_terminais = set(nao_terminais)
+    linhas = [dict(linha) if linha is not None else None for linha in linhas]
+    relatorio = {
+        'estados_antes': sum(linha is not None for linha in linhas),
+        'linhas_antes': len({tuple(sorted(linha.items())) for linha in linhas if linha is not None}),
+        'celulas_antes': sum(len(linha) for linha in linhas if linha is not None),
+    }
+
+    relatorio['gotos_desviados'] = eliminar_unitarias(linhas, producoes, terminais, nao_terminais, preservar) if unitarias else 0
+    relatorio['estados_removidos'] = remover_inalcancaveis(linhas)
+
+    padroes = [None] * len(linhas)
+    if reducoes_padrao:
+        for estado in range(1, len(linhas)):
+            if linhas[estado] is not None:
+                padroes[estado] = _acao_unica(linhas[estado], terminais)
+
+    if mesclar:
+        linhas, padroes = mesclar_linhas(linhas, padroes)
+    relatorio['estados_depois'] = sum(linha is not None for linha in linhas)
+    linhas[1:] = [linha if linha is not None else {} for linha in linhas[1:]]   # sem mesclar, os removidos ficam como linhas vazias
+    relatorio['linhas_depois'] = len({tuple(sorted(linha.items())) for linha in linhas[1:] if linha})
+    relatorio['celulas_depois'] = sum(len(linha) for linha in linhas[1:])
+    relatorio['reducoes_padrao'] = sum(padrao is not None for padrao in padroes)
+    return linhas, padroes, relatorio
@@ -0,0 +1,155 @@
+from itertools import chain
+
+from exportador import formatar_item
+
+#Perfil de execução do driver LR: quantas vezes cada estado foi visitado, cada produção reduzida e cada terminal empilhado.
+#Só o laço de analisar_perfilado mexe nos contadores; analisar continua sem nenhum teste a mais por passo.
+
+class PerfilAnalise: #Contadores acumulados ao longo de várias análises com a mesma tabela
+    def __init__(self, tabela, otimizada=False):
+        self.tabela = tabela         # TabelaDecodificada a que os números se referem
+        self.otimizada = otimizada   # tabela de otimizar_tabela: os estados não são mais os do autômato
+        self.visitas = [0] * len(tabela.linhas)     # estado empilhado por shift ou goto (o 1 conta uma vez por análise)
+        self.reducoes = [0] * len(tabela.tamanhos)  # índice em gramatica.producoes
+        self.shifts = {}                            # terminal -> shifts
+        self.profundidade_maxima = 0                # maior número de estados na pilha
+        self.analises = 0
+        self.aceitas = 0
+        self.tokens = 0
+
+    def zerar(self):
+        self.__init__(self.tabela, self.otimizada)
+
+    def como_dict(self, analisador):
+        #mesmo conteúdo do relatório, completo e ordenado por contagem; itens só quando os números de estado são os do autômato
+        producoes = analisador.gramatica.producoes
+        estados = analisador.estados if not self.otimizada else None
+        passos = sum(self.reducoes) + sum(self.shifts.values())
+        return {
+            'analises': self.analises,
+            'aceitas': self.aceitas,
+            'tokens': self.tokens,
+            'passos': passos,
+            'profundidade_maxima': self.profundidade_maxima,
+            'estados': [{'estado': estado, 'visitas': visitas,
+                         'itens': [formatar_item(producoes, idx_prod, ponto) for idx_prod, ponto in sorted(estados[estado - 1])]
+                         if estados is not None and estado <= len(estados) else None}
+                        for estado, visitas in _ordenados(enumerate(self.visitas)) if estado],
+            'producoes': [{'producao': idx, 'texto': _texto_producao(producoes, idx), 'reducoes': reducoes}
+                          for idx, reducoes in _ordenados(enumerate(self.reducoes))],
+            'terminais': [{'terminal': terminal, 'shifts': shifts} for terminal, shifts in _ordenados(self.shifts.items())],
+        }
+
+    def relatorio(self, analisador, limite=10): #texto com os mais usados de cada contador e os nunca usados
+        dados = self.como_dict(analisador)
+        total_visitas = sum(self.visitas) or 1
+        total_reducoes = sum(self.reducoes) or 1
+        total_shifts = sum(self.shifts.values()) or 1
+        linhas = [f"Perfil: {dados['analises']} análise(s), {dados['aceitas']} aceita(s), {dados['tokens']} tokens, "
+                  f"{dados['passos']} passos, pilha com até {dados['profundidade_maxima']} estados"]
+
+        linhas.append(f"\nEstados mais visitados (de {len(self.visitas) - 1}):")
+        for registro in dados['estados'][:limite]:
+            linhas.append(f"  Estado {registro['estado']}: {registro['visitas']} ({100 * registro['visitas'] / total_visitas:.1f}%)")
+            for item in registro['itens'] or ():
+                linhas.append(f"    [{item}]")   # como em imprimir_estados
+        if self.otimizada:
+            linhas.append("  (tabela otimizada: os números de estado não são os de imprimir_estados)")
+
+        linhas.append("\nProduções mais reduzidas:")
+        for registro in dados['producoes'][:limite]:
+            linhas.append(f"  r{registro['producao']} {registro['texto']}: {registro['reducoes']} "
+                          f"({100 * registro['reducoes'] / total_reducoes:.1f}%)")
+
+        linhas.append("\nTerminais mais empilhados:")
+        for registro in dados['terminais'][:limite]:
+            linhas.append(f"  {registro['terminal']}: {registro['shifts']} ({100 * registro['shifts'] / total_shifts:.1f}%)")
+
+        nunca_estados = [estado for estado, visitas in enumerate(self.visitas) if estado and not visitas]
+        nunca_producoes = [idx for idx, reducoes in enumerate(self.reducoes) if idx and not reducoes]   # a 0 (S' -> S $) só aceita
+        linhas.append(f"\nNunca visitados: {len(nunca_estados)} estado(s) {_resumo(nunca_estados)}")
+        linhas.append(f"Nunca reduzidas: {len(nunca_producoes)} produção(ões) {_resumo(nunca_producoes, 'r')}")
+        return '\n'.join(linhas)
+
+def _ordenados(pares): #(chave, contagem) com contagem > 0, da maior para a menor
+    return sorted(((chave, contagem) for chave, contagem in pares if contagem), key=lambda par: -par[1])
+
+def _texto_producao(producoes, idx):
+    esquerdo, direito = producoes[idx]
+    return f"{esquerdo} -> {' '.join(direito) if direito else 'vazio'}"
+
+def _resumo(numeros, prefixo='', maximo=20):
+    if not numeros:
+        return ''
+    texto = ', '.join(f"{prefixo}{n}" for n in numeros[:maximo])
+    return f"({texto}{', ...' if len(numeros) > maximo else ''})"
+
+def analisar_perfilado(tokens, fim, perfil, capacidade_pilha=256):
+    #o laço de analisar sobre perfil.tabela (com reduções padrão, se houver) contando cada passo.
+    #Devolve (aceito, posição, token, estado, esperados)
+    tabela = perfil.tabela
+    linhas, esquerdos, tamanhos = tabela.linhas, tabela.esquerdos, tabela.tamanhos
+    padroes = tabela.padroes or tabela.sem_padroes
+    visitas, reducoes, shifts = perfil.visitas, perfil.reducoes, perfil.shifts
+    perfil.analises += 1
+
+    pilha = [0] * capacidade_pilha
+    capacidade = capacidade_pilha
+    topo = 0
+    maior = 0
+    estado = pilha[0] = 1
+    visitas[1] += 1
+
+    validos = tabela.validos
+    entrada = chain(tokens, (fim,))
+    posicao = 0
+    resultado = None
+    for token in entrada:
+        if token not in validos:   # não-terminal na entrada: o goto dele seria tomado como shift
+            resultado = (False, posicao, token, estado, [t for t in tabela.terminais if t in linhas[estado]])
+            break
+        while True:
+            acao = padroes[estado]
+            if acao is None:
+                acao = linhas[estado].get(token)
+                if acao is None:
+                    resultado = (False, posicao, token, estado, [t for t in tabela.terminais if t in linhas[estado]])
+                    break
+
+            if acao > 0:
+                shifts[token] = shifts.get(token, 0) + 1
+                topo += 1
+                if topo == capacidade:
+                    pilha.extend([0] * capacidade)
+                    capacidade *= 2
+                if topo > maior:
+                    maior = topo
+                pilha[topo] = estado = acao
+                visitas[acao] += 1
+                break
+
+            if acao == 0:
+                resultado = (next(entrada, None) is None, posicao, token, estado, [])   # fim de arquivo no meio da entrada rejeita
+                break
+
+            reducoes[-acao] += 1
+            topo -= tamanhos[-acao]
+            estado = linhas[pilha[topo]][esquerdos[-acao]]
+            topo += 1
+            if topo == capacidade:
+                pilha.extend([0] * capacidade)
+                capacidade *= 2
+            if topo > maior:   # produção vazia: o goto pode subir a pilha
+                maior = topo
+            pilha[topo] = estado
+            visitas[estado] += 1
+        if resultado is not None:
+            break
+        posicao += 1
+
+    if resultado is None:
+        resultado = (False, posicao, fim, estado, [])
+    perfil.aceitas += resultado[0]
+    perfil.tokens += resultado[1]
+    perfil.profundidade_maxima = max(perfil.profundidade_maxima, maior + 1)
+    return resultado
@@ -0,0 +1,96 @@
+from collections import defaultdict, deque
+
+#Redução da gramática antes de aumentar_gramatica: não-terminais que não geram nenhuma cadeia de terminais (improdutivos)
+#ou que o símbolo inicial nunca alcança (inalcançáveis) saem, junto com toda produção que os usa, antes de ganharem
+#FIRST/FOLLOW, itens, estados e colunas na tabela. Os três conjuntos saem de worklists lineares no tamanho da gramática.
+
+def _fechar(producoes, restantes, ocorrencias): #worklist: o lado esquerdo entra quando restantes[idx] chega a 0
+    marcados = set()
+    fila = deque()
+    for idx, (esquerdo, _) in enumerate(producoes):
+        if restantes[idx] == 0 and esquerdo not in marcados:
+            marcados.add(esquerdo)
+            fila.append(esquerdo)
+    while fila:
+        nt = fila.popleft()
+        for idx in ocorrencias[nt]:   # uma entrada por ocorrência: A -> B B desconta duas vezes
+            restantes[idx] -= 1
+            esquerdo = producoes[idx][0]
+            if restantes[idx] == 0 and esquerdo not in marcados:
+                marcados.add(esquerdo)
+                fila.append(esquerdo)
+    return marcados
+
+def anulaveis_e_produtivos(producoes, nao_terminais): #(anuláveis, produtivos): não-terminais que derivam vazio / alguma cadeia de terminais
+    ocorrencias = defaultdict(list)
+    faltam_anulavel = []
+    faltam_produtivo = []
+    for idx, (esquerdo, direito) in enumerate(producoes):
+        nts = [sim for sim in direito if sim in nao_terminais]
+        for sim in nts:
+            ocorrencias[sim].append(idx)
+        faltam_produtivo.append(len(nts))
+        faltam_anulavel.append(len(nts) if len(nts) == len(direito) else -1)   # com terminal: nunca anulável
+    return _fechar(producoes, faltam_anulavel, ocorrencias), _fechar(producoes, faltam_produtivo, ocorrencias)
+
+def alcancaveis(producoes, inicial, nao_terminais, usar=None): #não-terminais alcançados a partir de `inicial` pelas produções em `usar`
+    por_esquerdo = defaultdict(list)
+    for idx, (esquerdo, direito) in enumerate(producoes):
+        if usar is None or idx in usar:
+            por_esquerdo[esquerdo].append(direito)
+    vistos = {inicial}
+    fila = deque([inicial])
+    while fila:
+        for direito in por_esquerdo[fila.popleft()]:
+            for sim in direito:
+                if sim in nao_terminais and sim not in vistos:
+                    vistos.add(sim)
+                    fila.append(sim)
+    return vistos
+
+def reduzir(gramatica): #(índices das produções mantidas, relatório); a ordem das produções mantidas não muda
+    nao_terminais = set(gramatica.nao_terminais)
+    producoes = gramatica.producoes
+    anulaveis, produtivos = anulaveis_e_produtivos(producoes, nao_terminais)
+    if gramatica.simbolo_inicial not in produtivos:
+        raise ValueError(f"O símbolo inicial '{gramatica.simbolo_inicial}' não gera nenhuma cadeia de terminais: a linguagem é vazia")
+
+    # primeiro os improdutivos, depois a alcançabilidade só pelas produções que sobraram (na outra ordem sobram inúteis)
+    produtivas = {idx for idx, (esquerdo, direito) in enumerate(producoes)
+                  if esquerdo in produtivos and all(sim in produtivos for sim in direito if sim in nao_terminais)}
+    alcancados = alcancaveis(producoes, gramatica.simbolo_inicial, nao_terminais, produtivas)
+    manter = [idx for idx in sorted(produtivas) if producoes[idx][0] in alcancados]
+
+    usados = {sim for idx in manter for sim in producoes[idx][1]}
+    relatorio = {
+        'anulaveis': [nt for nt in gramatica.nao_terminais if nt in anulaveis],
+        'improdutivos': [nt for nt in gramatica.nao_terminais if nt not in produtivos],
+        'inalcancaveis': [nt for nt in gramatica.nao_terminais if nt in produtivos and nt not in alcancados],
+        'producoes_removidas': [_texto(*producoes[idx]) for idx in sorted(set(range(len(producoes))) - set(manter))],
+        'terminais_sem_uso': [t for t in gramatica.terminais if t not in usados],   # continuam na gramática: o léxico ainda os reconhece
+        'producoes_antes': len(producoes),
+        'producoes_depois': len(manter),
+    }
+    return manter, relatorio
+
+def formatar_relatorio(relatorio, limite=20): #avisos de texto do relatório
+    if not relatorio['producoes_removidas'] and not relatorio['terminais_sem_uso']:
+        return "Gramática reduzida: nenhum símbolo inútil"
+    linhas = [f"Gramática reduzida: {relatorio['producoes_antes']} -> {relatorio['producoes_depois']} produções"]
+    for chave, texto in (('improdutivos', "não gera(m) cadeia de terminais"), ('inalcancaveis', "inalcançável(is) do símbolo inicial")):
+        if relatorio[chave]:
+            linhas.append(f"  Aviso: {len(relatorio[chave])} não-terminal(is) {texto}: {_lista(relatorio[chave], limite)}")
+    removidas = relatorio['producoes_removidas']
+    for texto in removidas[:limite]:
+        linhas.append(f"  Removida: {texto}")
+    if len(removidas) > limite:
+        linhas.append(f"  ... e mais {len(removidas) - limite} produção(ões)")
+    if relatorio['terminais_sem_uso']:
+        linhas.append(f"  Aviso: terminal(is) sem uso nas produções restantes: {_lista(relatorio['terminais_sem_uso'], limite)}")
+    return '\n'.join(linhas)
+
+def _texto(esquerdo, direito):
+    return f"{esquerdo} -> {' '.join(direito) if direito else 'vazio'}"
+
+def _lista(simbolos, limite):
+    return ', '.join(simbolos[:limite]) + (', ...' if len(simbolos) > limite else '')
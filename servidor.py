@@ -0,0 +1,246 @@
+import io
+import os
+import sys
+import json
+import math
+import stat
+import time
+import asyncio
+import hashlib
+from contextlib import redirect_stdout
+from collections import OrderedDict, defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+from cache_tabelas import normalizar_texto
+
+#Protocolo: uma requisição JSON por linha, uma resposta JSON por linha, na ordem em que ficam prontas (o campo "id" da
+#requisição volta na resposta). Operações:
+#  {"op": "analisar", "gramatica": "...", "tokens": ["id", "+", "id"]}  -> aceito, posicao, token, estado, esperados, chave
+#  {"op": "analisar", "chave": "<sha256>", "tokens": "id + id"}         -> mesma gramática sem reenviar o texto
+#  com "glr" e conflitos na tabela, "analisar" também devolve "arvores": um número, ou "infinitas" se a floresta tem ciclo
+#  {"op": "validar", "gramatica": "..."}                                -> valida, estados, producoes, conflitos (ou erro)
+#  {"op": "estatisticas"}                                               -> ocupação do LRU, acertos e percentis de latência
+#"modo" ("slr"/"lalr") e "glr" escolhem a tabela; sem gramática nem chave vale a gramática padrão do servidor (-f)
+
+LIMITE_LINHA = 64 * 1024 * 1024   # gramáticas grandes e listas longas de tokens cabem numa linha só
+AMOSTRAS_LATENCIA = 10000   # últimas latências guardadas por operação
+
+def chave_gramatica(texto_entrada, versao_gerador, modo='slr', glr=False): #mesmo hash do CacheTabelas, com o glr junto
+    conteudo = f"{versao_gerador}\n{modo}\n{int(glr)}\n{normalizar_texto(texto_entrada)}"
+    return hashlib.sha256(conteudo.encode('utf-8')).hexdigest()
+
+def percentis(amostras, pontos=(50, 90, 99)): #{'n', 'p50', 'p90', 'p99', 'max'} em milissegundos (vizinho mais próximo)
+    if not amostras:
+        return {'n': 0}
+    ordenadas = sorted(amostras)
+    resultado = {'n': len(ordenadas)}
+    for ponto in pontos:
+        resultado[f'p{ponto}'] = ordenadas[max(0, math.ceil(ponto / 100 * len(ordenadas)) - 1)] * 1000
+    resultado['max'] = ordenadas[-1] * 1000
+    return resultado
+
+class ServidorAnalise: #Analisadores compilados num LRU por hash da gramática, atendendo requisições JSON em linhas
+    def __init__(self, fabrica, versao_gerador, max_gramaticas=32):
+        self.fabrica = fabrica   # fabrica(modo, glr) -> AnalisadorSLR novo
+        self.versao_gerador = versao_gerador
+        self.max_gramaticas = max_gramaticas
+        self.gramaticas = OrderedDict()   # chave -> analisador compilado, do usado há mais tempo ao mais recente
+        self.compilando = {}   # chave -> future de uma compilação em andamento: pedidos iguais esperam a mesma
+        self.padrao = None   # chave da gramática do -f, nunca descartada
+        self.compilador = ThreadPoolExecutor(max_workers=1)   # redirect_stdout é global: uma compilação por vez
+        self.analises = ThreadPoolExecutor(max_workers=1)   # fora do laço de eventos; a tabela preguiçosa cresce durante a análise
+        self.latencias = defaultdict(lambda: deque(maxlen=AMOSTRAS_LATENCIA))
+        self.contadores = {'requisicoes': 0, 'erros': 0, 'acertos': 0, 'faltas': 0, 'descartes': 0}
+        self.operacoes = {'analisar': self._analisar, 'validar': self._validar, 'estatisticas': self._estatisticas}
+
+    def _compilar(self, texto_entrada, modo, glr): #roda no compilador; as mensagens de gerar_analisador viram o texto do erro
+        analisador = self.fabrica(modo, glr)
+        with redirect_stdout(io.StringIO()) as saida:
+            sucesso = analisador.gerar_analisador(texto_entrada)
+        if not sucesso:
+            raise ValueError(saida.getvalue().strip() or "Falha ao gerar o analisador")
+        analisador.decodificar_tabela()   # fora do caminho das requisições de análise
+        if glr:
+            analisador.decodificar_tabela_glr()
+        return analisador
+
+    async def obter(self, texto_entrada, modo='slr', glr=False): #(chave, analisador), compilando só na primeira vez
+        chave = chave_gramatica(texto_entrada, self.versao_gerador, modo, glr)
+        analisador = self.gramaticas.get(chave)
+        if analisador is not None:
+            self.gramaticas.move_to_end(chave)
+            self.contadores['acertos'] += 1
+            return chave, analisador
+
+        pendente = self.compilando.get(chave)
+        if pendente is None:
+            self.contadores['faltas'] += 1
+            pendente = asyncio.get_running_loop().run_in_executor(self.compilador, self._compilar, texto_entrada, modo, glr)
+            self.compilando[chave] = pendente
+            try:
+                analisador = await pendente
+            finally:
+                del self.compilando[chave]
+            self.gramaticas[chave] = analisador
+            self._descartar_excesso()
+            return chave, analisador
+        return chave, await pendente
+
+    async def preparar(self, texto_entrada, modo='slr', glr=False): #compila a gramática padrão, usada por requisições sem gramática
+        self.padrao, _ = await self.obter(texto_entrada, modo, glr)
+        return self.padrao
+
+    def _descartar_excesso(self):
+        for chave in list(self.gramaticas):
+            if len(self.gramaticas) <= self.max_gramaticas:
+                break
+            if chave != self.padrao:
+                del self.gramaticas[chave]
+                self.contadores['descartes'] += 1
+
+    async def _gramatica(self, requisicao): #(chave, analisador) pedido pela requisição: texto, chave ou o padrão
+        texto_entrada = requisicao.get('gramatica')
+        if texto_entrada is not None:
+            return await self.obter(texto_entrada, requisicao.get('modo', 'slr'), bool(requisicao.get('glr', False)))
+        chave = requisicao.get('chave', self.padrao)
+        if chave is None:
+            raise ValueError("Requisição sem gramática: envie 'gramatica' ou 'chave'")
+        analisador = self.gramaticas.get(chave)
+        if analisador is None:
+            raise ValueError(f"Gramática {chave} não está carregada: envie o texto em 'gramatica'")
+        self.gramaticas.move_to_end(chave)
+        self.contadores['acertos'] += 1
+        return chave, analisador
+
+    async def _analisar(self, requisicao):
+        chave, analisador = await self._gramatica(requisicao)
+        tokens = requisicao.get('tokens')
+        if isinstance(tokens, str):
+            tokens = tokens.split()
+        if not isinstance(tokens, list):
+            raise ValueError("'tokens' deve ser uma lista ou uma string separada por espaços")
+        resposta = await asyncio.get_running_loop().run_in_executor(self.analises, self._executar_analise, analisador, tokens)
+        return {'chave': chave, **resposta}
+
+    def _executar_analise(self, analisador, tokens): #roda em self.analises: uma entrada longa não segura as outras conexões
+        resposta = {}
+        if analisador.glr and analisador.acoes_conflitantes:
+            resultado = analisador.analisar_glr(tokens)
+            arvores = resultado.arvore.contar_arvores() if resultado else 0
+            resposta['arvores'] = 'infinitas' if math.isinf(arvores) else arvores   # JSON não tem infinito
+        else:
+            resultado = analisador.analisar(tokens)
+        resposta.update(aceito=resultado.aceito, posicao=resultado.posicao, token=resultado.token, estado=resultado.estado,
+                        esperados=resultado.esperados, mensagem=str(resultado))
+        return resposta
+
+    async def _validar(self, requisicao):
+        try:
+            chave, analisador = await self._gramatica(requisicao)
+        except ValueError as e:
+            return {'valida': False, 'mensagem': str(e)}
+        return {'chave': chave, 'valida': True, 'estados': len(analisador.estados),
+                'producoes': len(analisador.gramatica.producoes), 'conflitos': len(analisador.acoes_conflitantes)}
+
+    async def _estatisticas(self, requisicao):
+        return {'gramaticas': len(self.gramaticas), 'max_gramaticas': self.max_gramaticas, **self.contadores,
+                'latencias_ms': {op: percentis(amostras) for op, amostras in self.latencias.items()}}
+
+    async def responder(self, linha): #dict de resposta para uma linha de requisição; erros viram {"ok": false, "erro": ...}
+        inicio = time.perf_counter()
+        self.contadores['requisicoes'] += 1
+        requisicao = None
+        op = 'invalida'
+        try:
+            requisicao = json.loads(linha)
+            if not isinstance(requisicao, dict):
+                raise ValueError("A requisição deve ser um objeto JSON")
+            op = requisicao.get('op', 'analisar')
+            operacao = self.operacoes.get(op)
+            if operacao is None:
+                raise ValueError(f"Operação desconhecida: {op}. Use {', '.join(self.operacoes)}")
+            resposta = {'ok': True, **await operacao(requisicao)}
+        except Exception as e:   # uma requisição ruim não derruba a conexão nem o servidor
+            self.contadores['erros'] += 1
+            resposta = {'ok': False, 'erro': str(e)}
+        if isinstance(requisicao, dict) and 'id' in requisicao:
+            resposta['id'] = requisicao['id']
+        self.latencias[op if op in self.operacoes else 'invalida'].append(time.perf_counter() - inicio)
+        return resposta
+
+    async def atender(self, leitor, escritor): #uma conexão: lê as requisições sem esperar as respostas anteriores (pipelining)
+        tarefas = set()
+
+        async def responder_e_escrever(linha):
+            resposta = await self.responder(linha)
+            escritor.write(json.dumps(resposta, ensure_ascii=False).encode('utf-8') + b'\n')
+            await escritor.drain()
+
+        try:
+            while True:
+                try:
+                    linha = await leitor.readline()
+                except ValueError:   # linha acima de LIMITE_LINHA: não há como achar o começo da próxima
+                    escritor.write(json.dumps({'ok': False, 'erro': f"Requisição maior que {LIMITE_LINHA} bytes"}).encode('utf-8') + b'\n')
+                    break
+                if not linha:
+                    break
+                if not linha.strip():
+                    continue
+                tarefa = asyncio.ensure_future(responder_e_escrever(linha))
+                tarefas.add(tarefa)
+                tarefa.add_done_callback(tarefas.discard)
+            if tarefas:
+                await asyncio.gather(*tarefas, return_exceptions=True)
+        finally:
+            escritor.close()
+
+class _EntradaPadrao: #readline assíncrono sobre stdin numa thread: vale para pipe, terminal ou arquivo redirecionado
+    def __init__(self):
+        self.entrada = sys.stdin.buffer
+
+    async def readline(self):
+        return await asyncio.get_running_loop().run_in_executor(None, self.entrada.readline)
+
+class _SaidaPadrao: #a mesma interface de StreamWriter usada por atender, escrevendo direto em stdout
+    def __init__(self):
+        self.saida = sys.stdout.buffer   # guardado antes de qualquer redirect_stdout das compilações
+
+    def write(self, dados):
+        self.saida.write(dados)
+
+    async def drain(self):
+        self.saida.flush()
+
+    def close(self):
+        self.saida.flush()
+
+async def _servir(servidor, caminho, texto_entrada, modo, glr):
+    if texto_entrada is not None:
+        await servidor.preparar(texto_entrada, modo, glr)
+    if caminho == '-':
+        await servidor.atender(_EntradaPadrao(), _SaidaPadrao())
+        return
+    try:
+        if stat.S_ISSOCK(os.stat(caminho).st_mode):
+            os.unlink(caminho)   # socket deixado por uma execução anterior; outros arquivos não são apagados
+    except FileNotFoundError:
+        pass
+    servico = await asyncio.start_unix_server(servidor.atender, path=caminho, limit=LIMITE_LINHA)
+    print(f"Servidor ouvindo em {caminho} (Ctrl+C para sair)", file=sys.stderr, flush=True)
+    try:
+        async with servico:
+            await servico.serve_forever()
+    finally:
+        os.unlink(caminho)
+
+def servir(servidor, caminho, texto_entrada=None, modo='slr', glr=False):
+    #caminho: socket Unix, ou '-' para JSON em linhas por stdin/stdout.
+    #texto_entrada, se dado, vira a gramática padrão. Roda até Ctrl+C ou o fim da entrada padrão
+    try:
+        asyncio.run(_servir(servidor, caminho, texto_entrada, modo, glr))
+    except KeyboardInterrupt:
+        print("\nServidor encerrado.", file=sys.stderr)
+    finally:
+        servidor.compilador.shutdown(wait=False)
+        servidor.analises.shutdown(wait=False)